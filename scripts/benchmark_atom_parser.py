@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Atom源解析性能对比脚本
+对比 arxiv 库（feedparser + arxiv.Result）与内置 iterparse 解析器的耗时和峰值内存
+
+用法:
+    uv run python scripts/benchmark_atom_parser.py                       # 使用合成的1000条Atom源
+    uv run python scripts/benchmark_atom_parser.py --entries 5000
+    uv run python scripts/benchmark_atom_parser.py --fixture page1.xml --fixture page2.xml   # 使用录制的API响应
+"""
+
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import arxiv
+import feedparser
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.atom_feed import iter_atom_entries  # noqa: E402
+
+
+ENTRY_TEMPLATE = """  <entry>
+    <id>http://arxiv.org/abs/2410.{num:05d}v1</id>
+    <updated>2024-10-01T12:{minute:02d}:00Z</updated>
+    <published>2024-10-01T12:{minute:02d}:00Z</published>
+    <title>A Synthetic Paper Title Number {num} About
+      Large Language Models and Reasoning</title>
+    <summary>  {summary}
+    </summary>
+    <author>
+      <name>Alice Example</name>
+    </author>
+    <author>
+      <name>Bob Example</name>
+      <arxiv:affiliation xmlns:arxiv="http://arxiv.org/schemas/atom">Example University</arxiv:affiliation>
+    </author>
+    <author>
+      <name>Carol Example</name>
+    </author>
+    <arxiv:comment xmlns:arxiv="http://arxiv.org/schemas/atom">12 pages, 4 figures</arxiv:comment>
+    <link href="http://arxiv.org/abs/2410.{num:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2410.{num:05d}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CL" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+"""
+
+SUMMARY = (
+    "We study the problem of efficient reasoning in large language models. "
+    "Our method combines retrieval with structured decoding and improves accuracy "
+    "on several benchmarks while reducing inference cost. "
+) * 6
+
+
+def build_synthetic_feed(entries: int) -> bytes:
+    """生成与arXiv export API结构一致的Atom源"""
+    head = f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>
+  <title type="html">ArXiv Query: synthetic</title>
+  <id>http://arxiv.org/api/synthetic</id>
+  <updated>2024-10-01T00:00:00-04:00</updated>
+  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{entries}</opensearch:totalResults>
+  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">0</opensearch:startIndex>
+  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{entries}</opensearch:itemsPerPage>
+"""
+    body = "".join(
+        ENTRY_TEMPLATE.format(num=i, minute=i % 60, summary=SUMMARY) for i in range(entries)
+    )
+    return (head + body + "</feed>\n").encode("utf-8")
+
+
+def parse_with_arxiv(data: bytes) -> list:
+    feed = feedparser.parse(data)
+    return [arxiv.Result._from_feed_entry(entry) for entry in feed.entries]
+
+
+def parse_with_iterparse(data: bytes) -> list:
+    return list(iter_atom_entries(io.BytesIO(data)))
+
+
+def stream_with_iterparse(data: bytes) -> list:
+    # 流式消费：逐条处理后不保留记录，对应分页/流式抓取时的实际内存占用
+    count = 0
+    for _ in iter_atom_entries(io.BytesIO(data)):
+        count += 1
+    return [None] * count
+
+
+def measure(parse, data: bytes, repeat: int):
+    """返回 (最短耗时秒数, 峰值内存字节数, 条目数)"""
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(parse(data))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    records = parse(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return best, peak, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比arXiv Atom源解析耗时与内存")
+    parser.add_argument("--fixture", action="append", type=Path, help="录制的API响应XML文件，可多次指定")
+    parser.add_argument("--entries", type=int, default=1000, help="未提供fixture时合成的条目数")
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数（取最短）")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixtures = [(path.name, path.read_bytes()) for path in args.fixture]
+    else:
+        fixtures = [(f"synthetic-{args.entries}", build_synthetic_feed(args.entries))]
+
+    for name, data in fixtures:
+        old_time, old_peak, old_count = measure(parse_with_arxiv, data, args.repeat)
+        new_time, new_peak, new_count = measure(parse_with_iterparse, data, args.repeat)
+        stream_time, stream_peak, _ = measure(stream_with_iterparse, data, args.repeat)
+        if old_count != new_count:
+            print(f"⚠️  {name}: 条目数不一致 (feedparser={old_count}, iterparse={new_count})")
+
+        per_k = 1000 / max(new_count, 1)
+        print(f"📄 {name}: {new_count} 条, {len(data) / 1024:.0f} KiB")
+        print(f"   feedparser + arxiv.Result: {old_time * per_k * 1000:8.1f} ms/千条, 峰值内存 {old_peak * per_k / 1024 / 1024:6.2f} MiB/千条")
+        print(f"   iterparse + AtomEntry:     {new_time * per_k * 1000:8.1f} ms/千条, 峰值内存 {new_peak * per_k / 1024 / 1024:6.2f} MiB/千条")
+        print(f"   iterparse 流式消费:        {stream_time * per_k * 1000:8.1f} ms/千条, 峰值内存 {stream_peak * per_k / 1024 / 1024:6.2f} MiB/千条")
+        print(f"   保留全部记录: 加速 {old_time / new_time:.1f}x, 内存降低 {old_peak / new_peak:.1f}x")
+        print(f"   流式消费:     加速 {old_time / stream_time:.1f}x, 内存降低 {old_peak / stream_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+关键词过滤性能对比脚本
+在合成的摘要语料上对比原有的逐关键词子串查找与 KeywordFilter（编译后的多模式匹配）的耗时
+
+用法:
+    uv run python scripts/benchmark_keyword_filter.py                      # 50000 篇摘要 x 500 个检索词
+    uv run python scripts/benchmark_keyword_filter.py --papers 10000 --terms 2000
+"""
+
+import argparse
+import datetime
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.keyword_filter import KeywordFilter  # noqa: E402
+from src.data.paper import Paper  # noqa: E402
+
+
+SYLLABLES = ["ra", "ne", "to", "li", "mo", "de", "ka", "ver", "sen", "tri", "pol", "gra", "fu", "zer", "qua"]
+
+
+def build_vocabulary(size: int, rng: random.Random) -> list:
+    """生成互不相同的合成单词"""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def build_corpus(count: int, vocabulary: list, rng: random.Random) -> list:
+    """生成标题约10词、摘要约180词的合成论文"""
+    published = datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)
+    return [
+        Paper(
+            paper_id=f"2401.{i:05d}v1",
+            entry_id=f"http://arxiv.org/abs/2401.{i:05d}v1",
+            title=" ".join(rng.choices(vocabulary, k=10)).capitalize(),
+            authors=("A. Author", "B. Author"),
+            abstract=" ".join(rng.choices(vocabulary, k=180)).capitalize() + ".",
+            categories=("cs.AI",),
+            primary_category="cs.AI",
+            published=published,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_filter(papers: list, keywords: list) -> list:
+    """原有实现：每篇论文对每个关键词在标题和摘要上各做一次子串查找"""
+    keywords_lower = [kw.lower() for kw in keywords]
+    filtered = []
+    for paper in papers:
+        title_lower = paper.title.lower()
+        abstract_lower = paper.abstract.lower()
+        if any(kw in title_lower or kw in abstract_lower for kw in keywords_lower):
+            filtered.append(paper)
+    return filtered
+
+
+def run(name: str, fn) -> float:
+    start = time.perf_counter()
+    kept = len(fn())
+    elapsed = time.perf_counter() - start
+    print(f"   {name:<32} {elapsed:7.2f}s  (保留 {kept} 篇)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比关键词过滤耗时")
+    parser.add_argument("--papers", type=int, default=50000, help="合成论文数量")
+    parser.add_argument("--terms", type=int, default=500, help="检索词数量（约五分之一为两词短语）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = build_vocabulary(20000, rng)
+    # 检索词带有语料中不存在的音节，不会作为子串出现在语料中：大多数论文不命中，
+    # 原实现需要把每个检索词都查找一遍（最坏情况），两种实现的结果也应当一致
+    term_words = ["xq" + word for word in rng.sample(vocabulary, args.terms * 2)]
+    keywords = [
+        f"{term_words[i]} {term_words[-i - 1]}" if i % 5 == 0 else term_words[i]
+        for i in range(args.terms)
+    ]
+    # 少量论文中植入检索词，保证两种实现都有命中
+    papers = build_corpus(args.papers, vocabulary, rng)
+    for paper in rng.sample(papers, min(len(papers), 100)):
+        paper.abstract += " " + rng.choice(keywords)
+    print(f"📄 {args.papers} 篇合成论文 x {args.terms} 个检索词")
+
+    start = time.perf_counter()
+    keyword_filter = KeywordFilter.any_of(keywords)
+    print(f"   编译检索式                       {time.perf_counter() - start:7.2f}s")
+
+    legacy_ids = {paper.paper_id for paper in legacy_filter(papers, keywords)}
+    compiled_ids = {paper.paper_id for paper in keyword_filter.filter(papers)}
+    if legacy_ids != compiled_ids:
+        print(f"⚠️  过滤结果不一致: {len(legacy_ids ^ compiled_ids)} 篇")
+
+    legacy_time = run("逐关键词子串查找 (原实现)", lambda: legacy_filter(papers, keywords))
+    compiled_time = run("KeywordFilter 编译匹配", lambda: list(keyword_filter.filter(papers)))
+
+    print(f"   加速 {legacy_time / compiled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+PDF全文提取性能对比脚本
+在合成的多页PDF语料上对比原有的逐页 += 拼接提取与 PdfTextExtractor（线程内 / 进程池按页并行）的耗时
+
+用法:
+    uv run python scripts/benchmark_pdf_extraction.py                      # 5篇 300 页的合成PDF
+    uv run python scripts/benchmark_pdf_extraction.py --docs 10 --pages 500 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data.pdf_extractor import PdfTextExtractor  # noqa: E402
+
+
+PARAGRAPH = (
+    "We propose a scalable method for reasoning with large language models. "
+    "Experiments on standard benchmarks show consistent improvements over strong baselines, "
+    "while the ablation study confirms the contribution of each component. "
+)
+
+
+def build_synthetic_pdf(path: Path, pages: int) -> None:
+    """生成每页约50行正文的合成论文PDF"""
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        text = f"Section {page_no // 10 + 1}.{page_no % 10}\n" + "\n".join(
+            f"{line:02d} {PARAGRAPH[(line * 7) % 60:(line * 7) % 60 + 90]}" for line in range(50)
+        )
+        page.insert_textbox(fitz.Rect(50, 50, 560, 790), text, fontsize=8)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_extract(path: Path) -> str:
+    """原有实现：逐页 += 拼接后再整体 split/join"""
+    full_text = ""
+    with fitz.open(path) as doc:
+        for page in doc:
+            full_text += page.get_text()
+    return " ".join(full_text.split())
+
+
+def run(name: str, extract, corpus) -> float:
+    start = time.perf_counter()
+    total_chars = sum(len(extract(path)) for path in corpus)
+    elapsed = time.perf_counter() - start
+    print(f"   {name:<32} {elapsed:7.2f}s  ({total_chars / 1e6:.1f}M 字符)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比PDF全文提取耗时")
+    parser.add_argument("--docs", type=int, default=5, help="合成PDF数量")
+    parser.add_argument("--pages", type=int, default=300, help="每篇PDF的页数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="进程池大小")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = []
+        for i in range(args.docs):
+            path = Path(tmp_dir) / f"synthetic-{i}.pdf"
+            build_synthetic_pdf(path, args.pages)
+            corpus.append(path)
+        print(f"📄 {args.docs} 篇 x {args.pages} 页合成PDF，进程池 {args.workers} 个进程 (CPU: {os.cpu_count()})")
+
+        inline = PdfTextExtractor(max_workers=0)
+        pooled = PdfTextExtractor(max_workers=args.workers)
+        # 预热进程池，启动开销不计入对比
+        pooled.extract(corpus[0])
+
+        if legacy_extract(corpus[0]) != inline.extract(corpus[0]).text or inline.extract(corpus[0]).text != pooled.extract(corpus[0]).text:
+            print("⚠️  提取结果不一致")
+
+        legacy_time = run("逐页 += 拼接 (原实现)", legacy_extract, corpus)
+        inline_time = run("线性拼接 (线程内)", lambda path: inline.extract(path).text, corpus)
+        pooled_time = run("线性拼接 + 进程池按页并行", lambda path: pooled.extract(path).text, corpus)
+        pooled.shutdown()
+
+        print(f"   线程内: 加速 {legacy_time / inline_time:.2f}x; 进程池: 加速 {legacy_time / pooled_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,91 +4,217 @@ AI 分析器模块
 支持多种AI模型：智谱GLM、DeepSeek等
 """
 
+import contextlib
 import logging
 import time
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-import openai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 
 from ..config import Config
+from .concurrency import AdaptiveConcurrencyLimiter
 from .prompts import PromptManager
+from .providers import LLMProvider, ProviderPool
+from .response_cache import LLMResponseCache
+from .usage import BudgetExceededError, UsageMeter
+from ..data.paper import Paper
+from ..data.sections import DEFAULT_DROPPED_KINDS
 
 logger = logging.getLogger(__name__)
 
-
 class DeepSeekAnalyzer:
     """
     AI论文分析器，支持多种AI模型。
     支持完整的两阶段分析流程。
     """
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, response_cache: Optional[LLMResponseCache] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 usage_meter: Optional[UsageMeter] = None):
         """
         初始化分析器，从配置中加载设置。
+
+        Args:
+            config: 配置
+            response_cache: LLM响应缓存，完全相同的请求直接返回缓存的输出；None 表示不缓存
+            concurrency_limiter: 所有模型调用共享的自适应并发控制器；None 表示只受线程池大小限制
+            usage_meter: 记录每次调用token用量和费用的计量器；None 表示不统计
         """
         self.config = config
         self.timeout = config.API_TIMEOUT
+        self.response_cache = response_cache
+        self.concurrency_limiter = concurrency_limiter
+        self.usage_meter = usage_meter
 
-        # 自动检测使用哪个API
-        if config.QWEN_API_KEY:
-            # 优先使用Qwen
-            logger.info("使用Qwen模型进行分析")
-            self.model = config.QWEN_MODEL or "qwen3-max"
-            self.provider = "qwen"
-            self.client = openai.OpenAI(
-                api_key=config.QWEN_API_KEY,
-                base_url="https://dashscope.aliyuncs.com/compatible-mode/v1"
-            )
-        elif config.GLM_API_KEY:
-            # 使用智谱GLM（次优选择）
-            from zhipuai import ZhipuAI
-            logger.info("使用智谱GLM模型进行分析")
-            self.model = config.GLM_MODEL or "glm-4.6"
-            self.provider = "glm"
-            self.client = ZhipuAI(api_key=config.GLM_API_KEY)
-        elif config.DEEPSEEK_API_KEY:
-            # 使用DeepSeek
-            logger.info("使用DeepSeek模型进行分析")
-            self.model = config.DEEPSEEK_MODEL or "deepseek-chat"
-            self.provider = "deepseek"
-            self.client = openai.OpenAI(
-                api_key=config.DEEPSEEK_API_KEY,
-                base_url="https://api.deepseek.com/v1"
-            )
-        else:
-            raise ValueError("未找到有效的API密钥。请配置 QWEN_API_KEY、GLM_API_KEY 或 DEEPSEEK_API_KEY")
+        # 自动检测使用哪个API：未配置 LLM_PROVIDERS 时按 Qwen、智谱GLM、DeepSeek 的优先级只用一个，
+        # 配置后按权重在多个服务商之间分摊请求并故障转移
+        self.provider_pool = ProviderPool.from_config(config)
+        self.provider = self.provider_pool.name
+        for provider in self.provider_pool.providers:
+            logger.info(f"使用 {provider.name} 模型进行分析: {provider.model} (权重 {provider.weight:g})")
 
-    def _create_completion(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, **kwargs) -> str:
+    def _create_completion(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                           budgeted: bool = False, **kwargs) -> str:
         """
-        统一的API调用接口，处理不同provider的差异
+        统一的API调用接口，处理不同provider的差异；启用响应缓存时先查缓存
+
+        有多个服务商时，调用失败或超时后换下一个服务商重试同一请求。
+        budgeted 为True且设置了运行预算时，每次实际发出的调用（含故障转移和重试）都先按该服务商的价格预留，
+        记录实际用量后再释放
+
+        Raises:
+            BudgetExceededError: 预算不足，调用未发出
         """
-        try:
-            if self.provider == "glm":
-                # 智谱GLM不支持response_format和timeout参数
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-            else:
-                # Qwen和DeepSeek都支持完整的OpenAI参数
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"API调用失败: {e}", exc_info=True)
-            raise
+        cached = self._lookup_cached_response(messages, max_tokens, temperature, **kwargs)
+        if cached is not None:
+            return cached
+
+        prompt_tokens = self._budgeted_prompt_tokens(messages) if budgeted else None
+        last_error = None
+        for provider in self.provider_pool.candidates():
+            reserved = self._reserve_call(provider, prompt_tokens, max_tokens)
+            try:
+                try:
+                    with self._concurrency_slot(provider, max_tokens):
+                        response = provider.client.chat.completions.create(
+                            model=provider.model,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            **provider.request_kwargs(kwargs)
+                        )
+                    content = response.choices[0].message.content
+                except Exception as e:
+                    last_error = e
+                    self._record_failure(provider, e)
+                    continue
+                self._record_success(provider, response, content, messages, max_tokens, temperature, **kwargs)
+                return content
+            finally:
+                self._release_call(reserved)
+        raise self._no_provider_succeeded(last_error)
+
+    def _budgeted_prompt_tokens(self, messages: List[Dict[str, str]]) -> Optional[int]:
+        """设置了运行预算时返回请求的输入token数，用于预留；未设置时返回None"""
+        if not self.usage_meter or not self.usage_meter.budget:
+            return None
+        return sum(PromptManager.count_tokens(m["content"]) for m in messages)
+
+    def _call_estimate(self, provider: LLMProvider, prompt_tokens: int, max_tokens: int) -> float:
+        """一次调用的最高费用：实际输入token数加上输出上限，按该服务商的价格计算"""
+        return self.usage_meter.price(provider.model, prompt_tokens, max_tokens)
+
+    def _reserve_call(self, provider: LLMProvider, prompt_tokens: Optional[int], max_tokens: int) -> float:
+        """
+        为一次调用预留预算，其他调用的预留尚未结算时阻塞等待
+
+        Returns:
+            预留的金额，不需要预留时为0
+
+        Raises:
+            BudgetExceededError: 预算不足
+        """
+        if prompt_tokens is None:
+            return 0.0
+        estimate = self._call_estimate(provider, prompt_tokens, max_tokens)
+        if not self.usage_meter.reserve(estimate):
+            raise self._budget_exceeded(estimate)
+        return estimate
+
+    def _budget_exceeded(self, estimate: float) -> BudgetExceededError:
+        meter = self.usage_meter
+        return BudgetExceededError(
+            f"LLM费用预算不足（已用 ¥{meter.spent:.4f} / ¥{meter.budget:.4f}，本次调用最高约 ¥{estimate:.4f}）"
+        )
+
+    def _release_call(self, reserved: float) -> None:
+        """调用结束、实际费用已记录后释放预留"""
+        if reserved:
+            self.usage_meter.release(reserved)
+
+    def _record_success(self, provider: LLMProvider, response: Any, content: Optional[str],
+                        messages: List[Dict[str, str]], max_tokens: int, temperature: float, **kwargs) -> None:
+        """记录一次成功的调用及其token用量，并把输出写入响应缓存（同步和异步分析器共用）"""
+        self.provider_pool.record_success(provider)
+        if self.usage_meter:
+            self.usage_meter.record(provider.name, provider.model, getattr(response, "usage", None))
+        if self.response_cache and content:
+            cache_key = self.response_cache.make_key(provider.name, provider.model, messages, max_tokens, temperature, **kwargs)
+            self.response_cache.put(cache_key, provider.name, provider.model, content)
+
+    def _record_failure(self, provider: LLMProvider, error: Exception) -> None:
+        """记录一次失败的调用（同步和异步分析器共用）"""
+        logger.error(f"API调用失败 ({provider.name}): {error}", exc_info=True)
+        self.provider_pool.record_failure(provider, error)
+
+    @staticmethod
+    def _no_provider_succeeded(last_error: Optional[Exception]) -> Exception:
+        """所有服务商都失败或都在熔断中时抛出的异常"""
+        if last_error is not None:
+            return last_error
+        return RuntimeError("所有LLM服务商都处于熔断状态，暂时没有可用的服务商")
+
+    def _usage_scope(self, stage: str, papers: List[Paper]):
+        """把上下文内的模型调用用量记入指定阶段和论文（未启用统计时为空上下文）"""
+        if not self.usage_meter:
+            return contextlib.nullcontext()
+        return self.usage_meter.scope(stage, [p.paper_id for p in papers])
+
+    def min_paper_analysis_cost(self, paper: Paper) -> float:
+        """
+        估算单篇论文深度分析费用的下限（元）
+
+        只计输入token、按最便宜的服务商计算；在附加全文之前调用时只含摘要，实际调用不会低于该值
+        """
+        request = self._paper_analysis_request(paper)
+        prompt_tokens = sum(PromptManager.count_tokens(m["content"]) for m in request["messages"])
+        return min(self.usage_meter.price(p.model, prompt_tokens, 0) for p in self.provider_pool.providers)
+
+    def _concurrency_slot(self, provider: LLMProvider, max_tokens: int, asynchronous: bool = False):
+        """
+        返回包裹一次模型调用的并发控制上下文（未启用并发控制时为空上下文）
+
+        请求按服务商和 max_tokens 区分类型：不同服务商、排名和单篇分析的延迟不可直接比较
+        """
+        if not self.concurrency_limiter:
+            return contextlib.nullcontext()
+        kind = (provider.name, max_tokens)
+        if asynchronous:
+            return self.concurrency_limiter.async_slot(kind)
+        return self.concurrency_limiter.slot(kind)
+
+    def _cache_keys(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, **kwargs) -> List[str]:
+        """同一请求在各服务商下的缓存键"""
+        return [
+            self.response_cache.make_key(p.name, p.model, messages, max_tokens, temperature, **kwargs)
+            for p in self.provider_pool.providers
+        ]
+
+    def _lookup_cached_response(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                                **kwargs) -> Optional[str]:
+        """
+        查询响应缓存，任一服务商对同一请求的缓存输出都可以使用
+
+        Returns:
+            缓存的输出；未启用缓存或未命中时返回None
+        """
+        if not self.response_cache:
+            return None
+        cached = self.response_cache.get_first(self._cache_keys(messages, max_tokens, temperature, **kwargs))
+        if cached is not None:
+            logger.debug("LLM响应缓存命中")
+        return cached
+
+    def _discard_cached_response(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                                 **kwargs) -> None:
+        """丢弃一条无法使用的缓存输出，使下次相同的请求重新调用模型"""
+        if self.response_cache:
+            for cache_key in self._cache_keys(messages, max_tokens, temperature, **kwargs):
+                self.response_cache.discard(cache_key)
 
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def rank_papers_in_batch(self, papers: list[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def rank_papers_in_batch(self, papers: List[Paper]) -> List[Dict[str, Any]]:
         """
         对一小批论文进行强制排名和评分 (Stage 1).
         返回一个包含评分结果的列表。
@@ -97,56 +223,63 @@ class DeepSeekAnalyzer:
         if not papers:
             return []
 
-        response_text = ""
         try:
-            system_prompt = PromptManager.get_stage1_ranking_system_prompt()
-            user_prompt = PromptManager.format_stage1_ranking_prompt(papers)
-
-            # 根据provider选择合适的参数
-            if self.provider == "glm":
-                response_text = self._create_completion(
-                    messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                    max_tokens=2048,
-                    temperature=0.2
-                )
-            else:
-                response_text = self._create_completion(
-                    messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                    max_tokens=2048,
-                    temperature=0.2,
-                    response_format={"type": "json_object"},
-                    timeout=self.timeout
-                )
-            logger.debug(f"Raw Stage 1 ranking response from AI: {response_text}")
-            
-            parsed_json = json.loads(response_text)
-            
-            if isinstance(parsed_json, dict):
-                ranking_list = next((v for v in parsed_json.values() if isinstance(v, list)), None)
-                if ranking_list is None:
-                    logger.error("AI returned a JSON object for ranking, but no list was found inside.")
-                    return []
-            elif isinstance(parsed_json, list):
-                ranking_list = parsed_json
-            else:
-                logger.error(f"AI ranking response was not a JSON list or a dict containing a list. Type: {type(parsed_json)}")
-                return []
+            request = self._ranking_request(papers)
+            with self._usage_scope("stage1", papers):
+                response_text = self._create_completion(**request)
+            return self._parse_ranking(response_text, request)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during paper ranking: {e}", exc_info=True)
+            return []
 
-            if not all('paper_id' in item and 'score' in item for item in ranking_list):
-                logger.error("AI ranking response list has malformed items.")
-                return []
-                
-            return ranking_list
+    def _ranking_request(self, papers: List[Paper]) -> Dict[str, Any]:
+        """构造第一阶段排名请求的参数（同步和异步分析器共用）"""
+        system_prompt = PromptManager.get_stage1_ranking_system_prompt()
+        user_prompt = PromptManager.format_stage1_ranking_prompt(papers)
+
+        # 智谱GLM不支持的参数在发送时按服务商去掉
+        return dict(
+            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            max_tokens=2048,
+            temperature=0.2,
+            response_format={"type": "json_object"},
+            timeout=self.timeout
+        )
 
-        except json.JSONDecodeError as e:
+    def _parse_ranking(self, response_text: str, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        解析第一阶段排名的输出；无法解析时丢弃对应的缓存并返回空列表
+        """
+        logger.debug(f"Raw Stage 1 ranking response from AI: {response_text}")
+        try:
+            parsed_json = json.loads(response_text)
+        except (json.JSONDecodeError, TypeError) as e:
             logger.error(f"Failed to decode JSON from AI ranking response: {e}\nProblematic text: {response_text}")
+            self._discard_cached_response(**request)
             return []
-        except Exception as e:
-            logger.error(f"An unexpected error occurred during paper ranking: {e}", exc_info=True)
+
+        if isinstance(parsed_json, dict):
+            ranking_list = next((v for v in parsed_json.values() if isinstance(v, list)), None)
+            if ranking_list is None:
+                logger.error("AI returned a JSON object for ranking, but no list was found inside.")
+                self._discard_cached_response(**request)
+                return []
+        elif isinstance(parsed_json, list):
+            ranking_list = parsed_json
+        else:
+            logger.error(f"AI ranking response was not a JSON list or a dict containing a list. Type: {type(parsed_json)}")
+            self._discard_cached_response(**request)
+            return []
+
+        if not all('paper_id' in item and 'score' in item for item in ranking_list):
+            logger.error("AI ranking response list has malformed items.")
+            self._discard_cached_response(**request)
             return []
 
+        return ranking_list
+
     @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def analyze_papers_batch(self, papers: list[Dict[str, Any]]) -> str:
+    def analyze_papers_batch(self, papers: List[Paper]) -> str:
         """
         对一批论文进行深入的批量分析 (Stage 2).
         返回一个包含所有分析的长字符串。
@@ -156,15 +289,9 @@ class DeepSeekAnalyzer:
             return ""
 
         system_prompt = PromptManager.get_system_prompt()
-        user_prompt = PromptManager.format_batch_analysis_prompt(papers)
+        user_prompt = PromptManager.format_batch_analysis_prompt(papers, dropped_kinds=self._dropped_section_kinds())
 
-        if self.provider == "glm":
-            analysis_text = self._create_completion(
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                max_tokens=8000,
-                temperature=0.5
-            )
-        else:
+        with self._usage_scope("batch", papers):
             analysis_text = self._create_completion(
                 messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
                 max_tokens=8000,
@@ -175,60 +302,57 @@ class DeepSeekAnalyzer:
         logger.info(f"Successfully completed deep analysis for {len(papers)} papers.")
         return analysis_text
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def analyze_paper(self, paper: Dict[str, Any]) -> str:
+    def _dropped_section_kinds(self) -> tuple:
+        """按章节提取的全文中不送入LLM的章节类型"""
+        return () if self.config.SECTION_KEEP_BACKMATTER else DEFAULT_DROPPED_KINDS
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10),
+           retry=retry_if_not_exception_type(BudgetExceededError))
+    def analyze_paper(self, paper: Paper) -> str:
         """
         对单篇论文进行深入分析 (用于后备或单次运行).
-        返回包含分析结果的字符串。
+        返回包含分析结果的字符串。每次尝试都受运行预算约束，预算不足时抛出 BudgetExceededError
         """
-        from .prompts import PromptManager  # 局部导入以避免作用域问题
-        
-        logger.info(f"Performing single paper analysis for: {paper.get('title', 'N/A')} using {self.provider}.")
+        logger.info(f"Performing single paper analysis for: {paper.title} using {self.provider}.")
+        with self._usage_scope("stage2", [paper]):
+            return self._create_completion(**self._paper_analysis_request(paper), budgeted=True)
+
+    def _paper_analysis_request(self, paper: Paper) -> Dict[str, Any]:
+        """构造单篇论文深度分析请求的参数（同步和异步分析器共用）"""
         system_prompt = PromptManager.get_system_prompt()
 
         # 检查是否提供了全文，如果是，则优先使用全文进行分析
-        content_to_analyze = paper.get('full_text') or paper.get('abstract', '摘要不可用')
+        content_to_analyze = paper.full_text or paper.abstract or '摘要不可用'
         
         # 为内容设定一个安全的最大token数，为其他提示词部分留出余量
         # 根据不同模型的上下文窗口适当调整
         MAX_CONTENT_TOKENS = 20000  # 增加到20000 tokens，为系统提示词和输出留出充足空间
-        tokenizer = PromptManager._get_tokenizer()
+        if self.config.SECTION_AWARE_EXTRACTION:
+            # 按章节提取时去掉了参考文献和附录，并按章节分配预算，用更少的token覆盖关键内容
+            MAX_CONTENT_TOKENS = self.config.SECTION_TOKEN_BUDGET
 
-        # 使用tokenizer进行精确截断
-        if tokenizer and content_to_analyze:
-            tokens = tokenizer.encode(content_to_analyze)
-            if len(tokens) > MAX_CONTENT_TOKENS:
-                truncated_tokens = tokens[:MAX_CONTENT_TOKENS]
-                content_to_analyze = tokenizer.decode(truncated_tokens, errors='ignore') + "\n... (内容已截断)"
-        elif content_to_analyze and len(content_to_analyze) > 80000:  # 如果tokenizer加载失败，回退到基于字符的截断
-            content_to_analyze = content_to_analyze[:80000] + "\n... (内容已截断)"
+        content_to_analyze = PromptManager.fit_content_to_budget(
+            content_to_analyze, MAX_CONTENT_TOKENS, max_chars=80000, dropped_kinds=self._dropped_section_kinds()
+        )
 
         # 构建用户提示词，优先使用全文内容
         user_prompt = f"""请分析以下ArXiv论文：
-📄 **论文标题**：{paper.get('title', '未知标题')}
-👥 **作者信息**：{paper.get('authors', '未知作者')}
-🏷️ **研究领域**：{paper.get('categories', '未知领域')}
-📅 **发布时间**：{paper.get('published_date', '未知日期')}
-📝 **论文摘要**：{paper.get('abstract', '摘要不可用')}
-🔗 **论文链接**：https://arxiv.org/abs/{paper.get('paper_id', '')}
+📄 **论文标题**：{paper.title}
+👥 **作者信息**：{', '.join(paper.authors) or '未知作者'}
+🏷️ **研究领域**：{', '.join(paper.categories) or '未知领域'}
+📅 **发布时间**：{paper.published.strftime('%Y-%m-%d') if paper.published else '未知日期'}
+📝 **论文摘要**：{paper.abstract or '摘要不可用'}
+🔗 **论文链接**：{paper.abs_url}
 ---
 📄 **论文内容**：{content_to_analyze}
 ---
 请基于以上信息，按照系统提示的结构进行深度分析。"""
 
-        if self.provider == "glm":
-            # 智谱GLM不支持response_format参数
-            return self._create_completion(
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                max_tokens=2000,
-                temperature=0.7
-            )
-        else:
-            # Qwen和DeepSeek支持response_format参数，以获得更结构化的输出
-            return self._create_completion(
-                messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
-                max_tokens=2000,
-                temperature=0.7,
-                response_format={"type": "text"},  # 使用text格式以保持现有格式，如需严格JSON可改为{"type": "json_object"}
-                timeout=self.timeout
-            ) 
\ No newline at end of file
+        # 智谱GLM不支持response_format参数（发送时按服务商去掉）；Qwen和DeepSeek使用text格式以保持现有格式，如需严格JSON可改为{"type": "json_object"}
+        return dict(
+            messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+            max_tokens=2000,
+            temperature=0.7,
+            response_format={"type": "text"},
+            timeout=self.timeout
+        )
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+异步AI分析器模块
+使用 AsyncOpenAI 在事件循环中发出请求，不再为每个进行中的请求占用一个线程；
+智谱GLM通过其OpenAI兼容接口使用同一个异步客户端
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import openai
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
+
+from .analyzer import DeepSeekAnalyzer
+from .providers import LLMProvider
+from .usage import BudgetExceededError
+from ..data.paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPaperAnalyzer:
+    """
+    DeepSeekAnalyzer 的异步版本
+
+    提示词构造、输出解析、服务商选择和响应缓存都复用同步分析器的实现，只有模型调用改为 await；
+    异步客户端绑定创建它的事件循环，需要在 ``async with`` 中使用
+    """
+
+    def __init__(self, analyzer: DeepSeekAnalyzer):
+        """
+        Args:
+            analyzer: 已初始化的同步分析器，提供服务商池、响应缓存和并发控制器
+        """
+        self.analyzer = analyzer
+        self.provider = analyzer.provider
+        # 服务商名称 -> 异步客户端
+        self.clients: Dict[str, openai.AsyncOpenAI] = {}
+
+    async def __aenter__(self) -> "AsyncPaperAnalyzer":
+        self.clients = {
+            p.name: openai.AsyncOpenAI(api_key=p.api_key, base_url=p.base_url)
+            for p in self.analyzer.provider_pool.providers
+        }
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for client in self.clients.values():
+            await client.close()
+        self.clients = {}
+
+    async def _create_completion(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float,
+                                 budgeted: bool = False, **kwargs) -> str:
+        """
+        异步的统一API调用接口，服务商选择、故障转移和缓存与同步分析器相同
+
+        响应缓存的读写是阻塞的SQLite操作，放到线程中执行，不阻塞事件循环上进行中的请求
+        """
+        cached = await asyncio.to_thread(
+            self.analyzer._lookup_cached_response, messages, max_tokens, temperature, **kwargs
+        )
+        if cached is not None:
+            return cached
+
+        prompt_tokens = None
+        if budgeted:
+            prompt_tokens = await asyncio.to_thread(self.analyzer._budgeted_prompt_tokens, messages)
+        last_error = None
+        for provider in self.analyzer.provider_pool.candidates():
+            reserved = await self._reserve_call(provider, prompt_tokens, max_tokens)
+            try:
+                try:
+                    # 与同步调用共享同一个并发控制器
+                    async with self.analyzer._concurrency_slot(provider, max_tokens, asynchronous=True):
+                        response = await self.clients[provider.name].chat.completions.create(
+                            model=provider.model,
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            **provider.request_kwargs(kwargs)
+                        )
+                    content = response.choices[0].message.content
+                except Exception as e:
+                    last_error = e
+                    self.analyzer._record_failure(provider, e)
+                    continue
+                await asyncio.to_thread(
+                    self.analyzer._record_success, provider, response, content, messages, max_tokens, temperature, **kwargs
+                )
+                return content
+            finally:
+                self.analyzer._release_call(reserved)
+        raise self.analyzer._no_provider_succeeded(last_error)
+
+    async def _reserve_call(self, provider: LLMProvider, prompt_tokens: Optional[int], max_tokens: int) -> float:
+        """DeepSeekAnalyzer._reserve_call 的 asyncio 版本，等待其他调用结算时不占用线程"""
+        if prompt_tokens is None:
+            return 0.0
+        estimate = self.analyzer._call_estimate(provider, prompt_tokens, max_tokens)
+        if not await self.analyzer.usage_meter.reserve_async(estimate):
+            raise self.analyzer._budget_exceeded(estimate)
+        return estimate
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    async def rank_papers_in_batch(self, papers: List[Paper]) -> List[Dict[str, Any]]:
+        """对一小批论文进行排名和评分 (Stage 1)，失败时返回空列表"""
+        logger.info(f"Executing Stage 1: Ranking a batch of {len(papers)} papers using {self.provider} (async).")
+        if not papers:
+            return []
+
+        try:
+            request = self.analyzer._ranking_request(papers)
+            with self.analyzer._usage_scope("stage1", papers):
+                response_text = await self._create_completion(**request)
+            return self.analyzer._parse_ranking(response_text, request)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during paper ranking: {e}", exc_info=True)
+            return []
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10),
+           retry=retry_if_not_exception_type(BudgetExceededError))
+    async def analyze_paper(self, paper: Paper) -> str:
+        """对单篇论文进行深入分析 (Stage 2)，每次尝试都受运行预算约束"""
+        logger.info(f"Performing single paper analysis for: {paper.title} using {self.provider} (async).")
+        with self.analyzer._usage_scope("stage2", [paper]):
+            return await self._create_completion(**self.analyzer._paper_analysis_request(paper), budgeted=True)
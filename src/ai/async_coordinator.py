@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+异步批量分析协调器
+两阶段流程的LLM调用改在 asyncio 事件循环中并发执行，进行中的请求数由信号量限制，
+不再为每个请求占用一个线程，也不需要调整线程池大小
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from .analyzer import DeepSeekAnalyzer
+from .async_analyzer import AsyncPaperAnalyzer
+from .batch_coordinator import BatchCoordinator
+from .usage import BudgetExceededError
+from ..config import Config
+from ..data.arxiv_client import ArxivClient
+from ..data.paper import Paper
+from ..data.paper_registry import PaperRegistry
+from ..data.paper_store import PaperStore
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatchCoordinator(BatchCoordinator):
+    """
+    使用异步分析器的批量分析协调器
+
+    窗口切分、分数聚合、晋级筛选和结果持久化与 BatchCoordinator 相同；
+    论文流的迭代、PDF下载和全文提取仍是阻塞操作，放到线程中执行，不阻塞进行中的请求
+    """
+
+    def __init__(self, config: Config, analyzer: DeepSeekAnalyzer, arxiv_client: ArxivClient, paper_store: Optional[PaperStore] = None):
+        super().__init__(config, analyzer, arxiv_client, paper_store)
+        self.async_analyzer = AsyncPaperAnalyzer(analyzer)
+        # 启用自适应并发时实际并发由控制器决定，信号量只需不低于其上限（与同步模式的线程池大小一致）；
+        # LLM_MAX_CONCURRENCY 仅在关闭自适应并发时生效
+        limiter = analyzer.concurrency_limiter
+        self.max_concurrency = limiter.max_limit if limiter else max(1, config.LLM_MAX_CONCURRENCY)
+
+    def _run_stage1_ranking(self, papers: Iterable[Paper], registry: PaperRegistry) -> List[Paper]:
+        return asyncio.run(self._rank_async(papers, registry))
+
+    def _run_stage2_deep_analysis(self, papers_with_scores: List[Paper]) -> List[Paper]:
+        top_papers_to_analyze = self._select_for_stage2(papers_with_scores)
+        if not top_papers_to_analyze:
+            return []
+        return asyncio.run(self._analyze_async(top_papers_to_analyze))
+
+    async def _rank_async(self, papers: Iterable[Paper], registry: PaperRegistry) -> List[Paper]:
+        all_papers: List[Paper] = []
+        stage1_scores = defaultdict(list)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def rank(chunk: List[Paper], chunk_index: int) -> None:
+            async with semaphore:
+                try:
+                    ranking_results = await self.async_analyzer.rank_papers_in_batch(chunk)
+                except Exception as e:
+                    logger.error(f"Error ranking chunk {chunk_index + 1}: {e}", exc_info=True)
+                    return
+            self._record_ranking(ranking_results, registry, stage1_scores)
+
+        logger.info(f"Ranking chunks asynchronously with up to {self.max_concurrency} requests in flight as papers arrive...")
+        async with self.async_analyzer:
+            windows = self._sliding_windows(papers, registry, all_papers)
+            tasks = []
+            # 论文流可能边抓取边产出，在线程中推进，事件循环照常处理已分派的请求
+            while (chunk := await asyncio.to_thread(next, windows, None)) is not None:
+                tasks.append(asyncio.create_task(rank(chunk, len(tasks))))
+                logger.debug(f"Stage 1: Dispatched chunk {len(tasks)} ({len(chunk)} papers).")
+
+            logger.info(f"Stage 1: Dispatched {len(tasks)} chunks for {len(all_papers)} papers.")
+            await asyncio.gather(*tasks)
+
+        return await asyncio.to_thread(self._finish_stage1, all_papers, stage1_scores)
+
+    async def _analyze_async(self, papers: List[Paper]) -> List[Paper]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyze(paper: Paper, pdf_bytes: Optional[bytes]) -> Optional[Paper]:
+            # 预算检查需要计算提示词token数，放到线程中执行
+            if not await asyncio.to_thread(self._budget_allows, paper):
+                return None
+            await asyncio.to_thread(self._attach_full_text, paper, pdf_bytes)
+            async with semaphore:
+                try:
+                    analysis_text = await self.async_analyzer.analyze_paper(paper)
+                except BudgetExceededError as e:
+                    logger.warning(f"{e}，论文 {paper.paper_id} 不再进行深度分析")
+                    return None
+                except Exception as e:
+                    logger.error(f"Error analyzing paper {paper.paper_id}: {e}", exc_info=True)
+                    return None
+            # 结果写入论文存储（SQLite，与其他线程共用一把锁），放到线程中执行
+            await asyncio.to_thread(self._attach_analysis, paper, analysis_text)
+            logger.info(f"Successfully analyzed paper {paper.paper_id}")
+            return paper
+
+        logger.info(f"Extracting full text and analyzing {len(papers)} papers asynchronously with up to {self.max_concurrency} requests in flight...")
+        async with self.async_analyzer:
+            sources = self._iter_pdf_sources(papers)
+            tasks = []
+            # 启用异步下载时PDF下载完成一篇就开始一篇的提取和分析
+            while (source := await asyncio.to_thread(next, sources, None)) is not None:
+                tasks.append(asyncio.create_task(analyze(*source)))
+            results = await asyncio.gather(*tasks)
+
+        analyzed_papers = [paper for paper in results if paper]
+        logger.info(f"Stage 2 completed: {len(analyzed_papers)}/{len(papers)} papers successfully analyzed")
+        return analyzed_papers
@@ -7,14 +7,19 @@
 import logging
 import re
 from collections import defaultdict
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import concurrent.futures
 
-import arxiv
 from .analyzer import DeepSeekAnalyzer
 from ..config import Config
 from .prompts import PromptManager
+from .usage import BudgetExceededError
 from ..data.arxiv_client import ArxivClient
+from ..data.async_pdf_fetcher import AsyncPdfFetcher
+from ..data.paper import Paper
+from ..data.paper_registry import PaperRegistry
+from ..data.pdf_downloader import PdfDownloader
+from ..data.paper_store import PaperStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,184 +27,333 @@ logger = logging.getLogger(__name__)
 class BatchCoordinator:
     """批量分析协调器，负责编排整个分析流程。"""
 
-    def __init__(self, config: Config, analyzer: DeepSeekAnalyzer, arxiv_client: ArxivClient):
+    def __init__(self, config: Config, analyzer: DeepSeekAnalyzer, arxiv_client: ArxivClient, paper_store: Optional[PaperStore] = None):
         self.config = config
         self.analyzer = analyzer
         self.arxiv_client = arxiv_client
+        self.paper_store = paper_store
+        # 最近一次运行中是否有阶段收到了论文却因错误没有产出任何结果，此时调用方不应推进增量抓取水位线
+        self.analysis_failed = False
+
+        # 第二阶段的PDF可以改由单独的事件循环线程批量并发下载，分析线程只负责提取和调用LLM
+        self.pdf_fetcher = None
+        if config.ASYNC_PDF_FETCH:
+            self.pdf_fetcher = AsyncPdfFetcher(
+                per_host_limit=config.PDF_FETCH_PER_HOST,
+                num_retries=config.ARXIV_CLIENT_NUM_RETRIES,
+                max_bytes=config.PDF_MAX_MB * 1024 * 1024,
+                limiter=arxiv_client.rate_limiter
+            )
+
+    @property
+    def promotion_threshold(self) -> Optional[float]:
+        """第二阶段的晋级分数线；未启用两阶段分析时为None"""
+        if not self.config.STAGE_ANALYSIS.get('ENABLED', False):
+            return None
+        return self.config.STAGE_ANALYSIS.get('STAGE1', {}).get('PROMOTION_SCORE_THRESHOLD', 3.5)
 
-    def run_batch_analysis(self, papers_to_process: List[Tuple[arxiv.Result, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    def run_batch_analysis(self, papers_to_process: Iterable[Paper], registry: Optional[PaperRegistry] = None,
+                           ranked_papers: Iterable[Paper] = ()) -> List[Paper]:
         """
         运行批量分析。如果启用了两阶段分析，则执行新流程，否则执行旧的直接分析流程。
+
+        papers_to_process 可以是列表，也可以是边抓取边产出的生成器；
+        两阶段流程会在论文到达的同时分派第一阶段排名窗口。
+        到达的论文登记到 registry（本次运行的论文索引），排名结果按ID从中查找论文。
+        ranked_papers 是之前运行中已完成第一阶段排名、但深度分析未完成的论文（已带 stage1_score），
+        不再重新排名，与本次排名的结果一起参与第二阶段筛选；流式模式下可以是抓取过程中逐步填充的列表
         """
+        if registry is None:
+            registry = PaperRegistry()
+        self.analysis_failed = False
         use_stage_analysis = self.config.STAGE_ANALYSIS.get('ENABLED', False)
 
         if not use_stage_analysis:
             logger.info("Two-stage analysis is disabled. Running legacy direct batch analysis.")
-            return self._run_legacy_batch_analysis(papers_to_process)
+            papers = list(papers_to_process) + list(ranked_papers)
+            registry.extend(papers)
+            results = self._run_legacy_batch_analysis(papers, registry)
+            self.analysis_failed = bool(papers) and not results
+            return results
 
         logger.info("Starting two-stage analysis pipeline.")
 
         # Stage 1: Sliding Window Ranking
-        paper_dictionaries = [p_dict for _, p_dict in papers_to_process]
-        papers_with_scores = self._run_stage1_ranking(paper_dictionaries)
+        papers_with_scores = self._run_stage1_ranking(papers_to_process, registry)
+        ranked_papers = list(ranked_papers)
+        if ranked_papers:
+            logger.info(f"Stage 1: {len(ranked_papers)} papers ranked in a previous run go straight to Stage 2 with their stored scores.")
+            registry.extend(ranked_papers)
+            papers_with_scores = sorted(papers_with_scores + ranked_papers, key=lambda p: p.stage1_score, reverse=True)
         if not papers_with_scores:
             logger.warning("Stage 1 ranking resulted in no papers. Aborting.")
             return []
 
         # Stage 2: Filtering and Deep Analysis
-        final_results = self._run_stage2_deep_analysis(papers_with_scores, papers_to_process)
-        
+        final_results = self._run_stage2_deep_analysis(papers_with_scores)
+        if not final_results and any(p.stage1_score >= self.promotion_threshold for p in papers_with_scores):
+            logger.warning("Stage 2 analyzed none of the promoted papers.")
+            self.analysis_failed = True
+
         logger.info("Two-stage analysis pipeline finished.")
         return final_results
 
-    def _run_stage1_ranking(self, all_paper_dicts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _run_stage1_ranking(self, papers: Iterable[Paper], registry: PaperRegistry) -> List[Paper]:
         """
         执行第一阶段：滑动窗口排名。返回带有聚合分数的论文列表。
-        """
-        stage1_config = self.config.STAGE_ANALYSIS.get('STAGE1', {})
-        window_size = stage1_config.get('WINDOW_SIZE', 10)
-        step_size = stage1_config.get('STEP_SIZE', 5)
-        
-        if step_size <= 0:
-            logger.error("Sliding window step_size must be positive. Defaulting to 1.")
-            step_size = 1
-
-        logger.info(f"Stage 1: Creating sliding window batches (size: {window_size}, step: {step_size}).")
-        
-        paper_chunks = []
-        for i in range(0, len(all_paper_dicts), step_size):
-            chunk = all_paper_dicts[i : i + window_size]
-            if chunk:
-                # 避免最后产生一个过小的批次
-                if len(paper_chunks) > 0 and len(chunk) < window_size / 2:
-                    paper_chunks[-1].extend(chunk)
-                    break
-                paper_chunks.append(chunk)
 
+        输入可以是流：每当到达的论文凑满一个窗口就立即提交排名，抓取延迟与LLM延迟相互重叠。
+        """
+        all_papers: List[Paper] = []
         stage1_scores = defaultdict(list)
+        future_to_chunk_index = {}
         
         # 并行执行所有批次的排名
-        max_workers = self.config.MAX_WORKERS if self.config.MAX_WORKERS > 0 else None
-        logger.info(f"Ranking {len(paper_chunks)} chunks in parallel using up to {max_workers or 'default'} workers...")
+        max_workers = self._max_workers()
+        logger.info(f"Ranking chunks in parallel using up to {max_workers or 'default'} workers as papers arrive...")
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_chunk_index = {
-                executor.submit(self.analyzer.rank_papers_in_batch, chunk): i
-                for i, chunk in enumerate(paper_chunks)
-            }
+            for chunk in self._sliding_windows(papers, registry, all_papers):
+                chunk_index = len(future_to_chunk_index)
+                future = executor.submit(self.analyzer.rank_papers_in_batch, chunk)
+                future_to_chunk_index[future] = chunk_index
+                logger.debug(f"Stage 1: Dispatched chunk {chunk_index + 1} ({len(chunk)} papers).")
+
+            logger.info(f"Stage 1: Dispatched {len(future_to_chunk_index)} chunks for {len(all_papers)} papers.")
 
             for future in concurrent.futures.as_completed(future_to_chunk_index):
                 chunk_index = future_to_chunk_index[future]
                 try:
-                    ranking_results = future.result()
-                    for result in ranking_results:
-                        paper_id = result.get('paper_id')
-                        score = result.get('score')
-                        if paper_id and isinstance(score, (int, float)):
-                            stage1_scores[paper_id].append(float(score))
+                    self._record_ranking(future.result(), registry, stage1_scores)
                 except Exception as e:
                     logger.error(f"Error ranking chunk {chunk_index + 1}: {e}", exc_info=True)
 
-        final_scores = {paper_id: max(scores) for paper_id, scores in stage1_scores.items() if scores}
-        
-        # 将分数附加回原始字典列表
-        for paper_dict in all_paper_dicts:
-            paper_id = paper_dict.get('paper_id')
-            score = final_scores.get(paper_id)
-            paper_dict['stage1_score'] = score if score is not None else 0.0
+        return self._finish_stage1(all_papers, stage1_scores)
 
-        all_paper_dicts.sort(key=lambda p: p.get('stage1_score', 0.0), reverse=True)
-        
-        logger.info(f"Stage 1: Completed ranking for {len(final_scores)} papers.")
-        return all_paper_dicts
+    def _max_workers(self) -> Optional[int]:
+        """
+        分析线程池的大小
 
-    def _run_stage2_deep_analysis(self, papers_with_scores: List[Dict[str, Any]], all_papers_tuples: List[Tuple[arxiv.Result, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        启用自适应并发时线程数取并发上限的最大值，超出当前上限的线程在控制器中等待，实际并发由控制器决定
         """
-        执行第二阶段：筛选、并行提取全文，并对顶尖论文进行深度分析。
+        limiter = self.analyzer.concurrency_limiter
+        if limiter:
+            return limiter.max_limit
+        return self.config.MAX_WORKERS if self.config.MAX_WORKERS > 0 else None
+
+    def _sliding_windows(self, papers: Iterable[Paper], registry: PaperRegistry, all_papers: List[Paper]) -> Iterator[List[Paper]]:
         """
-        stage1_config = self.config.STAGE_ANALYSIS.get('STAGE1', {})
-        stage2_config = self.config.STAGE_ANALYSIS.get('STAGE2', {})
-        promotion_threshold = stage1_config.get('PROMOTION_SCORE_THRESHOLD', 3.5)
-        max_to_analyze = stage2_config.get('MAX_PAPERS_TO_ANALYZE', 20)
+        按到达顺序切分第一阶段的滑动窗口，窗口凑满即产出
 
-        promoted_paper_ids = {p['paper_id'] for p in papers_with_scores if p.get('stage1_score', 0.0) >= promotion_threshold}
+        到达的论文登记到 registry 并追加到 all_papers
+        """
+        stage1_config = self.config.STAGE_ANALYSIS.get('STAGE1', {})
+        window_size = stage1_config.get('WINDOW_SIZE', 10)
+        step_size = stage1_config.get('STEP_SIZE', 5)
         
-        # 从原始元组列表中筛选出优胜者
-        all_papers_map = {p_dict['paper_id']: (p_res, p_dict) for p_res, p_dict in all_papers_tuples}
-        promoted_papers_tuples = [all_papers_map[pid] for pid in promoted_paper_ids if pid in all_papers_map]
+        if step_size <= 0:
+            logger.error("Sliding window step_size must be positive. Defaulting to 1.")
+            step_size = 1
+
+        logger.info(f"Stage 1: Creating sliding window batches (size: {window_size}, step: {step_size}).")
+
+        next_start = 0
+        dispatched = 0
+        for paper in papers:
+            registry.add(paper)
+            all_papers.append(paper)
+            # 窗口凑满即分派
+            if len(all_papers) - next_start >= window_size:
+                yield all_papers[next_start : next_start + window_size]
+                dispatched += 1
+                next_start += step_size
+
+        # 流结束后处理尾部：仍有论文未被任何窗口覆盖时，用最后 window_size 篇补一个窗口，避免产生过小的批次
+        covered_end = next_start - step_size + window_size if dispatched else 0
+        if len(all_papers) > covered_end:
+            yield all_papers[max(0, len(all_papers) - window_size):]
+
+    @staticmethod
+    def _record_ranking(ranking_results: List[Dict], registry: PaperRegistry, stage1_scores: Dict[str, List[float]]) -> None:
+        """把一个窗口的排名结果按论文ID记入 stage1_scores"""
+        for result in ranking_results:
+            paper_id = result.get('paper_id')
+            score = result.get('score')
+            if not paper_id or not isinstance(score, (int, float)):
+                continue
+            # 统一为带版本号的ID，LLM省略版本号时也能对应到论文
+            paper = registry.get(str(paper_id))
+            if paper is None:
+                logger.warning(f"Stage 1: Ignoring score for unknown paper id {paper_id!r}.")
+                continue
+            stage1_scores[paper.paper_id].append(float(score))
+
+    def _finish_stage1(self, all_papers: List[Paper], stage1_scores: Dict[str, List[float]]) -> List[Paper]:
+        """聚合各窗口的分数、持久化并按分数降序排列"""
+        final_scores = {paper_id: max(scores) for paper_id, scores in stage1_scores.items() if scores}
+        if all_papers and not final_scores:
+            logger.warning(f"Stage 1: None of the {len(all_papers)} papers received a score.")
+            self.analysis_failed = True
+
+        # 只持久化确实拿到评分的论文，失败的批次在下次运行时会重新排名
+        if self.paper_store:
+            self.paper_store.save_stage1_scores(final_scores)
         
-        # 按分数排序并截取
-        promoted_papers_tuples.sort(key=lambda x: x[1]['stage1_score'], reverse=True)
-        top_papers_to_analyze_tuples = promoted_papers_tuples[:max_to_analyze]
+        # 将分数附加到论文上
+        for paper in all_papers:
+            score = final_scores.get(paper.paper_id)
+            paper.stage1_score = score if score is not None else 0.0
 
-        logger.info(f"Stage 2: {len(top_papers_to_analyze_tuples)} papers promoted for deep analysis (threshold: >={promotion_threshold}, max: {max_to_analyze}).")
+        all_papers.sort(key=lambda p: p.stage1_score, reverse=True)
+        
+        logger.info(f"Stage 1: Completed ranking for {len(final_scores)} papers.")
+        return all_papers
 
-        if not top_papers_to_analyze_tuples:
-            logger.info("No papers met the threshold for deep analysis.")
+    def _run_stage2_deep_analysis(self, papers_with_scores: List[Paper]) -> List[Paper]:
+        """
+        执行第二阶段：筛选、并行提取全文，并对顶尖论文进行深度分析。
+        """
+        top_papers_to_analyze = self._select_for_stage2(papers_with_scores)
+        if not top_papers_to_analyze:
             return []
 
         # 并行提取全文并进行分析（逐篇并行）
-        max_workers = self.config.MAX_WORKERS if self.config.MAX_WORKERS > 0 else None
-        logger.info(f"Extracting full text and analyzing {len(top_papers_to_analyze_tuples)} papers in parallel using up to {max_workers or 'default'} workers...")
+        max_workers = self._max_workers()
+        logger.info(f"Extracting full text and analyzing {len(top_papers_to_analyze)} papers in parallel using up to {max_workers or 'default'} workers...")
 
         analyzed_papers_with_details = []
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 为每篇论文提交一个完整的任务（提取全文 + 分析）
+            # 为每篇论文提交一个完整的任务（提取全文 + 分析）；启用异步下载时PDF下载完成一篇就提交一篇
             future_to_paper = {
-                executor.submit(self._analyze_single_paper, arxiv_res, paper_dict): paper_dict
-                for arxiv_res, paper_dict in top_papers_to_analyze_tuples
+                executor.submit(self._analyze_single_paper, paper, pdf_bytes): paper
+                for paper, pdf_bytes in self._iter_pdf_sources(top_papers_to_analyze)
             }
 
             for future in concurrent.futures.as_completed(future_to_paper):
-                paper_dict = future_to_paper[future]
+                paper = future_to_paper[future]
                 try:
                     analyzed_paper = future.result()
                     if analyzed_paper:
                         analyzed_papers_with_details.append(analyzed_paper)
-                        logger.info(f"Successfully analyzed paper {analyzed_paper['paper_id']}")
+                        logger.info(f"Successfully analyzed paper {analyzed_paper.paper_id}")
                 except Exception as e:
-                    logger.error(f"Failed to analyze paper {paper_dict['paper_id']}: {e}", exc_info=True)
+                    logger.error(f"Failed to analyze paper {paper.paper_id}: {e}", exc_info=True)
 
-        logger.info(f"Stage 2 completed: {len(analyzed_papers_with_details)}/{len(top_papers_to_analyze_tuples)} papers successfully analyzed")
+        logger.info(f"Stage 2 completed: {len(analyzed_papers_with_details)}/{len(top_papers_to_analyze)} papers successfully analyzed")
         return analyzed_papers_with_details
 
-    def _analyze_single_paper(self, arxiv_res: arxiv.Result, paper_dict: Dict[str, Any]) -> Dict[str, Any]:
+    def _select_for_stage2(self, papers_with_scores: List[Paper]) -> List[Paper]:
+        """按晋级分数线和数量上限筛选进入第二阶段的论文"""
+        stage2_config = self.config.STAGE_ANALYSIS.get('STAGE2', {})
+        promotion_threshold = self.promotion_threshold
+        max_to_analyze = stage2_config.get('MAX_PAPERS_TO_ANALYZE', 20)
+
+        # 第一阶段的结果已按分数降序排列，筛选出优胜者后直接截取
+        promoted_papers = [p for p in papers_with_scores if p.stage1_score >= promotion_threshold]
+        top_papers_to_analyze = promoted_papers[:max_to_analyze]
+
+        logger.info(f"Stage 2: {len(top_papers_to_analyze)} papers promoted for deep analysis (threshold: >={promotion_threshold}, max: {max_to_analyze}).")
+
+        if not top_papers_to_analyze:
+            logger.info("No papers met the threshold for deep analysis.")
+        return top_papers_to_analyze
+
+    def _iter_pdf_sources(self, papers: List[Paper]) -> Iterator[Tuple[Paper, Optional[bytes]]]:
+        """
+        按可以开始提取的顺序产出 (论文, PDF内容)
+
+        未启用异步下载时 PDF 内容为None，由提取步骤同步下载；启用时全文或PDF已缓存的论文先产出，
+        其余论文的PDF并发下载，每下载完成一篇就产出一篇（异步下载失败的论文产出None，回退到同步下载器重试）
+        """
+        if not self.pdf_fetcher:
+            for paper in papers:
+                yield paper, None
+            return
+
+        to_fetch = []
+        pdf_cache = self.arxiv_client.pdf_cache
+        cached_count = 0
+
+        for paper in papers:
+            pdf_url = PdfDownloader.pdf_url_for(paper)
+            cached = self.arxiv_client.has_cached_text(paper) or (
+                pdf_cache and pdf_cache.path_for(paper.paper_id).exists()
+            )
+            if not pdf_url or cached:
+                cached_count += 1
+                yield paper, None
+            else:
+                to_fetch.append((paper, pdf_url))
+
+        logger.info(f"Fetching {len(to_fetch)} PDFs asynchronously ({cached_count} already cached)...")
+        yield from self.pdf_fetcher.fetch(to_fetch)
+
+    def _analyze_single_paper(self, paper: Paper, pdf_bytes: Optional[bytes] = None) -> Optional[Paper]:
         """
         分析单篇论文（提取全文 + AI分析）
         这个方法在 ThreadPoolExecutor 中并行运行
+
+        pdf_bytes 为已异步下载好的PDF内容；为None时由 arxiv_client 同步下载
         """
-        paper_id = paper_dict.get('paper_id', 'unknown')
+        # 步骤1：提取全文（按摘要估算的费用下限已超出预算时不再提取）
+        if not self._budget_allows(paper):
+            return None
+        self._attach_full_text(paper, pdf_bytes)
+
+        # 步骤2：AI 分析（设置了运行预算时每次调用前由分析器预留该次调用的最高费用）
+        try:
+            return self._attach_analysis(paper, self.analyzer.analyze_paper(paper))
+        except BudgetExceededError as e:
+            logger.warning(f"{e}，论文 {paper.paper_id} 不再进行深度分析")
+            return None
+        except Exception as e:
+            logger.error(f"Error analyzing paper {paper.paper_id}: {e}", exc_info=True)
+            return None
 
-        # 步骤1：提取全文
+    def _budget_allows(self, paper: Paper) -> bool:
+        """
+        提取全文之前检查预算：附加全文前按摘要估算的费用是这篇论文的下限，
+        已用费用加上下限超出预算时，后续的提取和分析都不必进行
+        """
+        meter = self.analyzer.usage_meter
+        if not meter or not meter.budget:
+            return True
+        lower_bound = self.analyzer.min_paper_analysis_cost(paper)
+        if meter.affordable(lower_bound):
+            return True
+        logger.warning(
+            f"LLM费用预算不足（已用 ¥{meter.spent:.4f} / ¥{meter.budget:.4f}，本篇至少约 ¥{lower_bound:.4f}），"
+            f"论文 {paper.paper_id} 不再提取全文和深度分析"
+        )
+        return False
+
+    def _attach_full_text(self, paper: Paper, pdf_bytes: Optional[bytes] = None) -> None:
+        """提取全文并附加到论文上，失败时仅使用摘要"""
+        paper_id = paper.paper_id
         try:
-            full_text = self.arxiv_client.get_full_text(arxiv_res, self.config.PAPERS_DIR)
+            if pdf_bytes is not None:
+                full_text = self.arxiv_client.get_full_text_from_bytes(paper, pdf_bytes)
+            else:
+                full_text = self.arxiv_client.get_full_text(paper, self.config.PAPERS_DIR)
             if full_text:
-                paper_dict['full_text'] = full_text
+                paper.full_text = full_text
                 logger.debug(f"Extracted full text for {paper_id}")
             else:
                 logger.warning(f"Could not extract full text for {paper_id}, using abstract only")
         except Exception as e:
             logger.error(f"Error extracting full text for {paper_id}: {e}", exc_info=True)
 
-        # 步骤2：AI 分析
-        try:
-            analysis_text = self.analyzer.analyze_paper(paper_dict)
+    def _attach_analysis(self, paper: Paper, analysis_text: str) -> Paper:
+        """附加分析结果（含HTML格式）并持久化"""
+        paper.analysis = analysis_text
+        paper.html_analysis = PromptManager.format_analysis_for_html(analysis_text)
 
-            # 格式化为 HTML
-            from .prompts import PromptManager
-            html_analysis = PromptManager.format_analysis_for_html(analysis_text)
+        if self.paper_store:
+            self.paper_store.save_analysis(paper)
 
-            # 附加分析结果
-            paper_dict['analysis'] = analysis_text
-            paper_dict['html_analysis'] = html_analysis
-
-            return paper_dict
-
-        except Exception as e:
-            logger.error(f"Error analyzing paper {paper_id}: {e}", exc_info=True)
-            return None
+        return paper
 
-    def _run_legacy_batch_analysis(self, papers_to_process: List[Tuple[arxiv.Result, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    def _run_legacy_batch_analysis(self, papers_to_process: List[Paper], registry: PaperRegistry) -> List[Paper]:
         """
         原始的、直接的批量分析方法。
         """
@@ -208,28 +362,29 @@ class BatchCoordinator:
         
         all_analyzed_papers = []
         for chunk in paper_chunks:
-            # 准备仅包含字典的列表以供分析
-            chunk_dicts = [p_dict for _, p_dict in chunk]
             try:
-                logger.info(f"Analyzing a legacy batch of {len(chunk_dicts)} papers.")
-                analysis_text = self.analyzer.analyze_papers_batch(chunk_dicts)
-                parsed_results = self._parse_batch_analysis(analysis_text, chunk_dicts)
+                logger.info(f"Analyzing a legacy batch of {len(chunk)} papers.")
+                analysis_text = self.analyzer.analyze_papers_batch(chunk)
+                parsed_results = self._parse_batch_analysis(analysis_text, chunk)
                 
-                for _, paper_dict in chunk:
-                    paper_id = paper_dict['paper_id']
-                    if paper_id in parsed_results:
-                        # 将分析结果直接附加到论文数据字典中
-                        paper_dict.update(parsed_results[paper_id])
-                        all_analyzed_papers.append(paper_dict)
+                for paper_id, (analysis, html_analysis) in parsed_results.items():
+                    paper = registry.get(paper_id)
+                    if paper is None:
+                        continue
+                    # 将分析结果直接附加到论文上
+                    paper.analysis, paper.html_analysis = analysis, html_analysis
+                    all_analyzed_papers.append(paper)
+                    if self.paper_store:
+                        self.paper_store.save_analysis(paper)
             except Exception as e:
                 logger.error(f"Error processing legacy batch: {e}", exc_info=True)
         return all_analyzed_papers
 
-    def _parse_batch_analysis(self, batch_text: str, papers_in_batch: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    def _parse_batch_analysis(self, batch_text: str, papers_in_batch: List[Paper]) -> Dict[str, Tuple[str, str]]:
         """
-        解析批量分析文本，返回一个包含每个论文分析结果的字典。
+        解析批量分析文本，返回 论文ID -> (分析文本, HTML分析) 的字典。
         """
-        paper_ids = [p['paper_id'] for p in papers_in_batch]
+        paper_ids = [p.paper_id for p in papers_in_batch]
         results = {}
         
         if not batch_text or not paper_ids:
@@ -251,7 +406,7 @@ class BatchCoordinator:
             raw_content = content_parts[-1].strip()
             
             html_analysis = PromptManager.format_analysis_for_html(raw_content)
-            results[paper_id] = {'raw': raw_content, 'html': html_analysis}
+            results[paper_id] = (raw_content, html_analysis)
             logger.info(f"Successfully parsed analysis for paper {paper_id}.")
 
         return results 
\ No newline at end of file
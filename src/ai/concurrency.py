@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+LLM调用并发控制模块
+按 AIMD（加性增、乘性减）自适应调整同时进行中的模型请求数：
+请求成功时逐步提高上限，遇到限流(429)、超时或延迟p95明显升高时成倍降低上限
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Hashable, List, Tuple
+
+import httpx
+import openai
+
+# 服务端过载时返回的状态码
+_OVERLOAD_STATUS_CODES = (429, 503)
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """判断异常是否表示服务端限流或过载（429/503、请求超时）"""
+    if isinstance(exc, (openai.RateLimitError, openai.APITimeoutError, httpx.TimeoutException, TimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return status in _OVERLOAD_STATUS_CODES
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    线程和协程共用的自适应并发上限
+
+    每次成功的请求使上限增加 1/上限（即大约每一轮请求加1）；限流、超时或某类请求最近一个窗口的
+    延迟p95超过基线的 latency_tolerance 倍时，上限乘以 decrease_factor。
+    在上一次降低之前就已发出的请求不再触发降低，避免同一波限流把上限连续砍到底
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32, decrease_factor: float = 0.5,
+                 latency_tolerance: float = 1.5, latency_window: int = 20):
+        """
+        初始化并发控制器
+
+        Args:
+            initial: 初始并发上限
+            min_limit: 并发上限的下限
+            max_limit: 并发上限的上限
+            decrease_factor: 遇到过载信号时上限的缩小倍数
+            latency_tolerance: 延迟p95超过基线的倍数时视为过载
+            latency_window: 计算一次延迟p95所用的请求数
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_window = max(1, latency_window)
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+
+        # 不同类型的请求（排名、单篇分析）输出长度不同，延迟分别统计
+        self._latencies: Dict[Hashable, List[float]] = defaultdict(list)
+        self._baseline_p95: Dict[Hashable, float] = {}
+
+        self._peak_limit = int(self._limit)
+        self._overloads = 0
+        self._latency_decreases = 0
+        self._decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """当前的并发上限"""
+        return int(self._limit)
+
+    def _try_acquire(self) -> bool:
+        """调用方需持有锁"""
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> float:
+        """
+        占用一个并发名额，必要时阻塞等待
+
+        Returns:
+            占用名额的时间，释放时传回 release
+        """
+        with self._condition:
+            while not self._try_acquire():
+                self._condition.wait()
+        return time.monotonic()
+
+    async def acquire_async(self) -> float:
+        """acquire 的 asyncio 版本，等待期间不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    return time.monotonic()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    try:
+                        self._async_waiters.remove((loop, waiter))
+                    except ValueError:
+                        # 已被唤醒，把空出的名额交给下一个等待者
+                        self._wake_waiters()
+                raise
+
+    def release(self, started: float, outcome: str = "ok", kind: Hashable = None) -> None:
+        """
+        释放名额并根据请求结果调整上限
+
+        Args:
+            started: acquire 返回的时间
+            outcome: "ok" 成功；"overload" 限流或超时；"error" 其他错误（不调整上限）
+            kind: 请求类型，延迟按类型分别与各自的基线比较
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            # 上一次降低之前发出的请求反映的是降低前的并发水平，不再参与调整
+            stale = started < self._last_decrease
+            if outcome == "overload":
+                self._overloads += 1
+                if not stale:
+                    self._decrease(now)
+            elif outcome == "ok":
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                self._peak_limit = max(self._peak_limit, int(self._limit))
+                if not stale:
+                    self._record_latency(kind, now - started, now)
+            self._wake_waiters()
+
+    def _record_latency(self, kind: Hashable, latency: float, now: float) -> None:
+        """调用方需持有锁；每凑满一个窗口计算一次p95并与基线比较"""
+        window = self._latencies[kind]
+        window.append(latency)
+        if len(window) < self.latency_window:
+            return
+        window.sort()
+        p95 = window[min(len(window) - 1, int(len(window) * 0.95))]
+        window.clear()
+
+        baseline = self._baseline_p95.get(kind)
+        if baseline is None or p95 <= baseline:
+            self._baseline_p95[kind] = p95
+        elif p95 > baseline * self.latency_tolerance:
+            self._latency_decreases += 1
+            self._decrease(now)
+            # 基线缓慢上移，服务商整体变慢时不会把上限一直压在下限
+            self._baseline_p95[kind] = baseline * 1.1
+
+    def _decrease(self, now: float) -> None:
+        """调用方需持有锁"""
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self._decreases += 1
+        for window in self._latencies.values():
+            window.clear()
+
+    def _wake_waiters(self) -> None:
+        """调用方需持有锁；唤醒可以占用空闲名额的等待者"""
+        free = int(self._limit) - self._in_flight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        while free > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+            free -= 1
+
+    @contextmanager
+    def slot(self, kind: Hashable = None):
+        """在名额内执行一次请求，并按是否成功、是否过载调整上限"""
+        started = self.acquire()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = "overload" if is_overload_error(e) else "error"
+            raise
+        finally:
+            self.release(started, outcome, kind)
+
+    @asynccontextmanager
+    async def async_slot(self, kind: Hashable = None):
+        """slot 的 asyncio 版本"""
+        started = await self.acquire_async()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException as e:
+            outcome = "overload" if is_overload_error(e) else "error"
+            raise
+        finally:
+            self.release(started, outcome, kind)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回并发控制统计
+
+        Returns:
+            limit: 当前并发上限
+            peak_limit: 本次运行达到的最高上限
+            overloads: 限流或超时的请求数
+            latency_decreases: 因延迟升高降低上限的次数
+            decreases: 降低上限的总次数
+        """
+        with self._lock:
+            return {
+                "limit": int(self._limit),
+                "peak_limit": self._peak_limit,
+                "overloads": self._overloads,
+                "latency_decreases": self._latency_decreases,
+                "decreases": self._decreases,
+            }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
@@ -138,7 +138,8 @@ class ParallelPaperAnalyzer:
             return None
         finally:
             # 步骤 3: 删除 PDF (提交到 I/O 线程池，发射后不管)
-            if pdf_path: # Only attempt to delete if a path was obtained
+            # 启用PDF缓存时 download_paper 返回的是缓存文件的副本，同样归调用方所有
+            if pdf_path:
                 self.io_executor.submit(self._delete_pdf_task, pdf_path)
             logger.debug(f"[AI Worker {ai_worker_id}] Finished lifecycle for: {paper.title[:40]}...")
 
@@ -7,12 +7,17 @@ AI提示词管理模块
 import logging
 import re
 import json
-from typing import Dict, List, Any
+from typing import List
 
 
-import arxiv
 import tiktoken
 
+from ..data.sections import (
+    ABSTRACT, CONCLUSION, DEFAULT_DROPPED_KINDS, EXPERIMENTS, FRONT, INTRODUCTION, METHOD, OTHER,
+    parse_sections,
+)
+from ..data.paper import Paper
+
 logger = logging.getLogger(__name__)
 
 class PromptManager:
@@ -21,6 +26,12 @@ class PromptManager:
     # 为Tokenizer创建一个类级别的缓存
     _tokenizer = None
 
+    # 结构化全文按章节分配token预算时各类章节的权重；章节较短用不完的预算会分给其他章节
+    SECTION_WEIGHTS = {
+        FRONT: 0.5, ABSTRACT: 0.5, INTRODUCTION: 1.5, METHOD: 3.0,
+        EXPERIMENTS: 3.0, CONCLUSION: 1.0, OTHER: 0.5,
+    }
+
     @classmethod
     def _get_tokenizer(cls):
         """获取或创建tiktoken的tokenizer实例"""
@@ -33,6 +44,93 @@ class PromptManager:
                 cls._tokenizer = None
         return cls._tokenizer
 
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """估算文本的token数；tokenizer不可用时按字符数计（偏高，适合用作上限）"""
+        tokenizer = PromptManager._get_tokenizer()
+        return len(tokenizer.encode(text)) if tokenizer else len(text)
+
+    @staticmethod
+    def fit_content_to_budget(content: str, max_tokens: int, max_chars: int = None,
+                              dropped_kinds=DEFAULT_DROPPED_KINDS) -> str:
+        """
+        将论文内容控制在token预算之内。
+
+        按章节提取的结构化全文会先去掉参考文献、附录等章节，再按 SECTION_WEIGHTS 把预算分给各章节，
+        每个章节各自截断；普通全文或摘要直接截断开头的 max_tokens 个token。
+
+        Args:
+            content: 论文内容
+            max_tokens: token预算
+            max_chars: tokenizer不可用时按字符截断的上限，默认按每token约4个字符估算
+            dropped_kinds: 结构化全文中要丢弃的章节类型
+
+        Returns:
+            不超过预算的内容
+        """
+        max_chars = max_chars or max_tokens * 4
+        tokenizer = PromptManager._get_tokenizer()
+        sections = parse_sections(content) if content else None
+
+        if sections is None:
+            # 使用tokenizer进行精确截断
+            if tokenizer:
+                tokens = tokenizer.encode(content)
+                if len(tokens) > max_tokens:
+                    content = tokenizer.decode(tokens[:max_tokens], errors='ignore') + "\n... (内容已截断)"
+            elif len(content) > max_chars:  # 如果tokenizer加载失败，回退到基于字符的截断
+                content = content[:max_chars] + "\n... (内容已截断)"
+            return content
+
+        kept = [sec for sec in sections if sec.kind not in dropped_kinds and sec.text]
+        dropped = [sec.title for sec in sections if sec.kind in dropped_kinds and sec.title]
+
+        if tokenizer:
+            encoded = [tokenizer.encode(sec.text) for sec in kept]
+            sizes = [len(tokens) for tokens in encoded]
+            budget = max_tokens
+        else:
+            sizes = [len(sec.text) for sec in kept]
+            budget = max_chars
+        weights = [PromptManager.SECTION_WEIGHTS.get(sec.kind, 0.5) for sec in kept]
+        allocations = PromptManager._allocate_budget(sizes, weights, budget)
+
+        parts = []
+        for i, (sec, allocation) in enumerate(zip(kept, allocations)):
+            if allocation <= 0:
+                continue
+            text = sec.text
+            if sizes[i] > allocation:
+                text = (tokenizer.decode(encoded[i][:allocation], errors='ignore') if tokenizer else text[:allocation]) + " ...(本节已截断)"
+            parts.append(f"## {sec.title}\n{text}" if sec.title else text)
+        if dropped:
+            parts.append(f"(已省略: {', '.join(dropped)})")
+
+        logger.debug(f"按章节分配token预算: 保留 {len(kept)} 节，省略 {len(dropped)} 节，原始 {sum(sizes)} / 预算 {budget}")
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def _allocate_budget(sizes: List[int], weights: List[float], budget: int) -> List[int]:
+        """
+        按权重分配预算（注水法）：需求小于按权重分得份额的章节全额保留，
+        剩余预算继续在其余章节之间按权重分配
+        """
+        allocations = [0] * len(sizes)
+        remaining = set(range(len(sizes)))
+        left = budget
+        while remaining and left > 0:
+            total_weight = sum(weights[i] for i in remaining)
+            satisfied = [i for i in remaining if sizes[i] <= left * weights[i] / total_weight]
+            if not satisfied:
+                for i in remaining:
+                    allocations[i] = int(left * weights[i] / total_weight)
+                break
+            for i in satisfied:
+                allocations[i] = sizes[i]
+                left -= sizes[i]
+                remaining.discard(i)
+        return allocations
+
     @staticmethod
     def get_system_prompt() -> str:
         """
@@ -70,24 +168,19 @@ class PromptManager:
 4. 总长500-700字，语言专业严谨，体现顶级会议reviewer标准"""
 
     @staticmethod
-    def get_user_prompt(paper: arxiv.Result) -> str:
+    def get_user_prompt(paper: Paper) -> str:
         """获取单个论文分析的用户提示词"""
         authors_str = '未知'
-        if hasattr(paper, 'authors') and paper.authors:
-            try:
-                author_names = [author.name for author in paper.authors]
-                authors_str = ', '.join(author_names[:5])
-                if len(author_names) > 5:
-                    authors_str += f" 等{len(author_names)}人"
-            except AttributeError as e:
-                logger.warning(f"Abnormal author object structure: {e}")
-                authors_str = "作者信息异常"
+        if paper.authors:
+            authors_str = ', '.join(paper.authors[:5])
+            if len(paper.authors) > 5:
+                authors_str += f" 等{len(paper.authors)}人"
         
         published_date = '未知'
-        if hasattr(paper, 'published') and paper.published:
+        if paper.published:
             published_date = paper.published.strftime('%Y年%m月%d日')
 
-        summary = paper.summary.strip().replace("\n", " ")
+        summary = paper.abstract.strip().replace("\n", " ")
         if len(summary) > 1500:
             summary = summary[:1500] + "..."
 
@@ -102,40 +195,32 @@ class PromptManager:
 请基于以上信息，按照系统提示的结构进行深度分析。"""
 
     @staticmethod
-    def format_batch_analysis_prompt(papers: list[Dict[str, Any]]) -> str:
+    def format_batch_analysis_prompt(papers: List[Paper], dropped_kinds=DEFAULT_DROPPED_KINDS) -> str:
         """
         格式化深度批量分析的用户提示词。
         如果提供了全文，则使用全文；否则回退到使用摘要。
-        使用tiktoken进行精确的token截断。
+        使用tiktoken进行精确的token截断，按章节提取的全文按章节分配预算。
         """
         paper_texts = []
         # 为分析内容设定一个安全的最大token数，为其他提示词部分留出余量
         MAX_CONTENT_TOKENS = 7500 
-        tokenizer = PromptManager._get_tokenizer()
 
         for paper in papers:
             content_key = "Full Text"
-            content_value = paper.get('full_text')
+            content_value = paper.full_text
             
             if not content_value:
                 content_key = "Abstract"
-                content_value = paper.get('abstract', 'N/A')
+                content_value = paper.abstract or 'N/A'
             
-            # 使用tokenizer进行精确截断
-            if tokenizer:
-                tokens = tokenizer.encode(content_value)
-                if len(tokens) > MAX_CONTENT_TOKENS:
-                    truncated_tokens = tokens[:MAX_CONTENT_TOKENS]
-                    content_value = tokenizer.decode(truncated_tokens, errors='ignore') + "\n... (内容已截断)"
-            else:
-                # 如果tokenizer加载失败，回退到基于字符的截断
-                if len(content_value) > 25000: # 粗略估算
-                    content_value = content_value[:25000] + "\n... (内容已截断)"
+            content_value = PromptManager.fit_content_to_budget(
+                content_value, MAX_CONTENT_TOKENS, max_chars=25000, dropped_kinds=dropped_kinds
+            )
 
             paper_texts.append(
 f"""---
-**Paper ID**: {paper['paper_id']}
-**Title**: {paper['title']}
+**Paper ID**: {paper.paper_id}
+**Title**: {paper.title}
 **{content_key}**:
 {content_value.replace('{', '{{').replace('}', '}}')}
 ---"""
@@ -172,16 +257,16 @@ f"""---
 """
 
     @staticmethod
-    def format_stage1_ranking_prompt(papers: list[Dict[str, Any]]) -> str:
+    def format_stage1_ranking_prompt(papers: List[Paper]) -> str:
         """格式化第一阶段排名的用户提示词"""
         paper_texts = []
         for paper in papers:
             # 使用 json.dumps 来安全地处理摘要和标题中的特殊字符（如引号）
-            abstract = json.dumps(paper.get('abstract', '').replace("\n", " "))
-            title = json.dumps(paper.get('title', ''))
+            abstract = json.dumps(paper.abstract.replace("\n", " "))
+            title = json.dumps(paper.title)
             paper_texts.append(
 f"""    {{
-        "paper_id": "{paper.get('paper_id', 'N/A')}",
+        "paper_id": "{paper.paper_id}",
         "title": {title},
         "abstract": {abstract}
     }}"""
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+LLM服务商池模块
+同时配置了多个服务商（Qwen、智谱GLM、DeepSeek）时按权重分摊请求，单次请求失败或超时时换下一个服务商重试，
+每个服务商各有一个熔断器：连续失败达到阈值后暂停使用，冷却后放行一个探测请求，成功即恢复
+"""
+
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+import openai
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# 智谱GLM的OpenAI兼容接口（异步分析器通过它使用 AsyncOpenAI）
+GLM_OPENAI_BASE_URL = "https://open.bigmodel.cn/api/paas/v4/"
+
+# 服务商名称 -> (密钥配置项, 模型配置项, 默认模型, OpenAI兼容接口地址)，顺序即未配置 LLM_PROVIDERS 时的优先级
+PROVIDER_SETTINGS = {
+    "qwen": ("QWEN_API_KEY", "QWEN_MODEL", "qwen3-max", "https://dashscope.aliyuncs.com/compatible-mode/v1"),
+    "glm": ("GLM_API_KEY", "GLM_MODEL", "glm-4.6", GLM_OPENAI_BASE_URL),
+    "deepseek": ("DEEPSEEK_API_KEY", "DEEPSEEK_MODEL", "deepseek-chat", "https://api.deepseek.com/v1"),
+}
+
+
+class CircuitBreaker:
+    """
+    单个服务商的熔断器
+
+    closed: 正常放行；连续失败 failure_threshold 次后转为 open，暂停放行；
+    open 状态经过 recovery_seconds 后转为 half_open，只放行一个探测请求，成功则恢复 closed，失败则重新 open；
+    探测请求没有结果（例如被取消）时，再过 recovery_seconds 放行下一个探测请求
+    """
+
+    def __init__(self, failure_threshold: int = 3, recovery_seconds: float = 60.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_seconds = recovery_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """占用一次发出请求的机会（冷却结束后第一个调用者获得探测机会）"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.recovery_seconds:
+                self.state = "half_open"
+                self._opened_at = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> bool:
+        """记录一次失败，返回本次是否触发熔断"""
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+
+@dataclass(eq=False)
+class LLMProvider:
+    """服务商池中的一个服务商"""
+
+    name: str
+    model: str
+    api_key: str
+    base_url: str
+    weight: float
+    client: Any                       # 同步客户端（GLM使用ZhipuAI SDK，其余使用openai.OpenAI）
+    breaker: CircuitBreaker
+    successes: int = 0
+    failures: int = 0
+
+    def request_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """去掉该服务商不支持的请求参数（智谱GLM不支持response_format和timeout等参数）"""
+        return {} if self.name == "glm" else kwargs
+
+
+def _counts_against_provider(exc: Exception) -> bool:
+    """请求本身有误（400/413等）不是服务商的问题，仍换服务商重试，但不计入熔断"""
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+class ProviderPool:
+    """按权重分摊请求、逐个故障转移的服务商池"""
+
+    def __init__(self, providers: List[LLMProvider]):
+        if not providers:
+            raise ValueError("未找到有效的API密钥。请配置 QWEN_API_KEY、GLM_API_KEY 或 DEEPSEEK_API_KEY")
+        self.providers = providers
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ProviderPool":
+        """
+        按配置创建服务商池
+
+        配置了 LLM_PROVIDERS（如 "qwen:3,deepseek:1"）时使用其中已配置密钥的服务商，冒号后为权重（默认1）；
+        未配置时只使用按优先级找到的第一个服务商，与单服务商时的行为一致
+        """
+        if config.LLM_PROVIDERS:
+            weights = {}
+            for item in config.LLM_PROVIDERS.split(","):
+                name, _, weight = item.strip().partition(":")
+                name = name.strip().lower()
+                if name not in PROVIDER_SETTINGS:
+                    logger.warning(f"LLM_PROVIDERS 中的未知服务商已忽略: {name}")
+                    continue
+                weights[name] = float(weight) if weight.strip() else 1.0
+        else:
+            weights = {name: 1.0 for name in PROVIDER_SETTINGS}
+
+        providers = []
+        for name, weight in weights.items():
+            key_name, model_name, default_model, base_url = PROVIDER_SETTINGS[name]
+            api_key = getattr(config, key_name)
+            if not api_key or weight <= 0:
+                continue
+            providers.append(LLMProvider(
+                name=name,
+                model=getattr(config, model_name) or default_model,
+                api_key=api_key,
+                base_url=base_url,
+                weight=weight,
+                client=_create_client(name, api_key, base_url),
+                breaker=CircuitBreaker(config.PROVIDER_FAILURE_THRESHOLD, config.PROVIDER_RECOVERY_SECONDS),
+            ))
+            if not config.LLM_PROVIDERS:
+                break
+        return cls(providers)
+
+    @property
+    def name(self) -> str:
+        """用于日志的服务商名称"""
+        return "+".join(p.name for p in self.providers)
+
+    def candidates(self) -> Iterator[LLMProvider]:
+        """
+        依次产出本次请求要尝试的服务商，上一个失败后再取下一个
+
+        服务商按权重随机排序（权重越大越可能排在前面），请求因此按权重分摊；熔断中的服务商跳过，
+        轮到冷却结束的服务商时才占用其探测机会。只有一个服务商时不经过熔断器，失败由调用方的重试处理
+        """
+        if len(self.providers) == 1:
+            yield self.providers[0]
+            return
+        # 加权随机排列：按 u^(1/w) 降序
+        ordered = sorted(self.providers, key=lambda p: random.random() ** (1 / p.weight), reverse=True)
+        for provider in ordered:
+            if provider.breaker.allow():
+                yield provider
+
+    def record_success(self, provider: LLMProvider) -> None:
+        provider.breaker.record_success()
+        with self._lock:
+            provider.successes += 1
+
+    def record_failure(self, provider: LLMProvider, exc: Exception) -> None:
+        with self._lock:
+            provider.failures += 1
+        if _counts_against_provider(exc) and provider.breaker.record_failure():
+            if len(self.providers) > 1:
+                logger.warning(
+                    f"服务商 {provider.name} 连续失败，暂停使用 {provider.breaker.recovery_seconds:.0f}s 后再探测"
+                )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        返回各服务商的调用统计
+
+        Returns:
+            服务商名称 -> {successes: 成功次数, failures: 失败次数, trips: 熔断次数, state: 熔断器状态}
+        """
+        with self._lock:
+            return {
+                p.name: {"successes": p.successes, "failures": p.failures,
+                         "trips": p.breaker.trips, "state": p.breaker.state}
+                for p in self.providers
+            }
+
+
+def _create_client(name: str, api_key: str, base_url: str) -> Any:
+    if name == "glm":
+        from zhipuai import ZhipuAI
+        return ZhipuAI(api_key=api_key)
+    return openai.OpenAI(api_key=api_key, base_url=base_url)
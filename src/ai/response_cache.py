@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+LLM响应缓存模块
+以 (provider, 模型, 消息, 生成参数) 的哈希为键，把模型输出保存在SQLite中；
+重试和重复运行遇到完全相同的请求时直接返回缓存的输出，不再消耗token
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 只影响传输、不影响输出内容的参数，不参与缓存键
+_TRANSPORT_KWARGS = ("timeout", "stream")
+
+
+class LLMResponseCache:
+    """LLM响应的磁盘缓存，超过有效期的条目视为未命中，超过容量上限时按最近使用时间淘汰"""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at);
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: int = 7 * 24 * 3600, max_bytes: int = 200 * 1024 * 1024,
+                 bypass: bool = False):
+        """
+        初始化缓存，必要时创建数据库文件
+
+        Args:
+            db_path: SQLite数据库文件路径
+            ttl_seconds: 缓存有效期（秒），0 表示不过期
+            max_bytes: 缓存容量上限（按响应文本的UTF-8字节数计），0 表示不限制
+            bypass: 跳过读取缓存，总是调用模型，新的输出仍会写入缓存（用于强制刷新）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = 0
+
+        # 分析阶段在线程池中并发读写，使用同一连接并以锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+        self.evict()
+
+    @staticmethod
+    def make_key(provider: str, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                 temperature: float, **kwargs) -> str:
+        """计算请求的缓存键（response_format 等生成参数参与计算，timeout 等传输参数不参与）"""
+        params = {k: v for k, v in kwargs.items() if k not in _TRANSPORT_KWARGS}
+        payload = json.dumps(
+            [provider, model, messages, max_tokens, temperature, params],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的输出
+
+        Returns:
+            缓存的模型输出，未命中、已过期或处于 bypass 模式时返回None
+        """
+        return self.get_first([key])
+
+    def get_first(self, keys: List[str]) -> Optional[str]:
+        """
+        依次查找多个缓存键（例如同一请求在各服务商下的键），返回第一个命中的输出，只计一次命中或未命中
+        """
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and self.ttl_seconds and now - row[1] >= self.ttl_seconds:
+                    row = None
+                if row is not None:
+                    break
+            else:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return row[0]
+
+    def put(self, key: str, provider: str, model: str, response: str) -> None:
+        """保存模型输出，超过容量上限时淘汰最久未使用的条目"""
+        size = len(response.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._conn:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, provider, model, response, size, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, provider, model, response, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def discard(self, key: str) -> None:
+        """删除一条缓存（例如输出无法解析，不应在重试时再次返回）"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= row[0]
+
+    def evict(self) -> int:
+        """
+        删除过期条目，并在超过容量上限时按最近使用时间淘汰到上限的90%
+
+        Returns:
+            删除的条目数量
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if self.ttl_seconds:
+                removed += self._conn.execute(
+                    "DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+            self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                stale = []
+                for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used_at"):
+                    if self._total_bytes <= self.max_bytes * 0.9:
+                        break
+                    stale.append((key,))
+                    self._total_bytes -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+                removed += len(stale)
+        if removed:
+            logger.info(f"LLM响应缓存: 淘汰 {removed} 条过期或超出容量的记录")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+LLM用量与费用统计模块
+从每次模型调用返回的 usage 中记录输入、输出以及命中服务商上下文缓存的token数，
+按阶段、论文和模型汇总，按价格表折算费用，并为第二阶段提供单次运行的费用预算
+"""
+
+import asyncio
+import logging
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 各阶段在统计中的名称
+STAGE_LABELS = {
+    "stage1": "第一阶段排名",
+    "stage2": "第二阶段深度分析",
+    "batch": "批量分析",
+    "other": "其他",
+}
+
+# 当前调用所属的 (阶段, 论文ID)；线程池中的任务和 asyncio 任务各自独立
+_current_scope: ContextVar[Tuple[str, Tuple[str, ...]]] = ContextVar("llm_usage_scope", default=("other", ()))
+
+
+class BudgetExceededError(RuntimeError):
+    """运行预算不足，调用未发出"""
+
+
+@dataclass
+class TokenUsage:
+    """一组调用的累计用量（按论文分摊时可能出现小数）"""
+
+    calls: float = 0
+    prompt_tokens: float = 0
+    completion_tokens: float = 0
+    cached_tokens: float = 0          # prompt_tokens 中命中服务商上下文缓存的部分
+    cost: float = 0.0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int, cost: float,
+            share: float = 1.0) -> None:
+        self.calls += share
+        self.prompt_tokens += prompt_tokens * share
+        self.completion_tokens += completion_tokens * share
+        self.cached_tokens += cached_tokens * share
+        self.cost += cost * share
+
+    @property
+    def total_tokens(self) -> float:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def usage_counts(usage: Any) -> Tuple[int, int, int]:
+    """
+    从响应的 usage 中读取 (输入token, 输出token, 命中缓存的输入token)
+
+    OpenAI兼容接口（Qwen等）在 prompt_tokens_details.cached_tokens 中给出缓存命中数，
+    DeepSeek 使用 prompt_cache_hit_tokens
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) if details else None
+    if cached_tokens is None:
+        cached_tokens = getattr(usage, "prompt_cache_hit_tokens", 0)
+    return prompt_tokens, completion_tokens, cached_tokens or 0
+
+
+class UsageMeter:
+    """线程安全的用量计量器，同时负责运行预算的预留与释放"""
+
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None, budget: float = 0.0):
+        """
+        初始化计量器
+
+        Args:
+            prices: 模型名 -> {input, cached_input, output}，单位为元/百万token；
+                cached_input 缺省时按 input 计价，价格表中没有的模型费用记为0
+            budget: 单次运行的费用上限（元），0 表示不限制
+        """
+        self.prices = prices or {}
+        self.budget = budget
+        self._lock = threading.Lock()
+        # 预留结算时唤醒等待预算的调用方
+        self._settled = threading.Condition(self._lock)
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._total = TokenUsage()
+        self._by_stage: Dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._by_model: Dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._by_paper: Dict[str, TokenUsage] = defaultdict(TokenUsage)
+        self._reserved = 0.0
+        self._unpriced = set()
+        self.skipped_for_budget = 0
+
+    @staticmethod
+    @contextmanager
+    def scope(stage: str, paper_ids: Iterable[str]):
+        """在上下文内发出的模型调用记入指定阶段，并平均分摊到给定的论文"""
+        token = _current_scope.set((stage, tuple(paper_ids)))
+        try:
+            yield
+        finally:
+            _current_scope.reset(token)
+
+    def price(self, model: str, prompt_tokens: float, completion_tokens: float, cached_tokens: float = 0) -> float:
+        """按价格表计算费用（元）"""
+        table = self.prices.get(model)
+        if not table:
+            if model not in self._unpriced:
+                self._unpriced.add(model)
+                logger.warning(f"价格表 LLM_PRICES 中没有模型 {model}，其费用按0计算")
+            return 0.0
+        input_price = table.get("input", 0.0)
+        cached_price = table.get("cached_input", input_price)
+        return ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_price
+                + completion_tokens * table.get("output", 0.0)) / 1_000_000
+
+    def record(self, provider: str, model: str, usage: Any) -> None:
+        """记录一次模型调用的用量，归入当前的阶段和论文"""
+        if usage is None:
+            return
+        prompt_tokens, completion_tokens, cached_tokens = usage_counts(usage)
+        cost = self.price(model, prompt_tokens, completion_tokens, cached_tokens)
+        stage, paper_ids = _current_scope.get()
+        with self._lock:
+            for bucket in (self._total, self._by_stage[stage], self._by_model[f"{provider}/{model}"]):
+                bucket.add(prompt_tokens, completion_tokens, cached_tokens, cost)
+            # 排名请求一次覆盖一个窗口的论文，用量平均分摊
+            for paper_id in paper_ids:
+                self._by_paper[paper_id].add(prompt_tokens, completion_tokens, cached_tokens, cost,
+                                             share=1 / len(paper_ids))
+
+    @property
+    def spent(self) -> float:
+        """已记录的费用（元）"""
+        with self._lock:
+            return self._total.cost
+
+    def affordable(self, amount: float) -> bool:
+        """
+        判断费用下限为 amount 的调用是否还有可能在预算内完成，不预留
+
+        已用费用只增不减，已用费用加上下限超过预算时这次调用无论如何都无法进行，计入因预算跳过的论文
+
+        Returns:
+            未设置预算或已用费用与 amount 之和不超过预算时返回True
+        """
+        if not self.budget:
+            return True
+        with self._lock:
+            if self._total.cost + amount > self.budget:
+                self.skipped_for_budget += 1
+                return False
+            return True
+
+    def reserve(self, amount: float) -> bool:
+        """
+        为一次即将发出的调用预留预算，必要时阻塞等待
+
+        其他调用的预留尚未结算、剩余额度暂时不够时，等到有预留释放后按实际费用重新判断；
+        只有没有进行中的预留、已用费用与本次预留之和仍超过预算时才放弃
+
+        Returns:
+            预留成功返回True；预算不足返回False；未设置预算时总是True
+        """
+        if not self.budget:
+            return True
+        with self._settled:
+            while (reserved := self._try_reserve(amount)) is None:
+                self._settled.wait()
+            return reserved
+
+    async def reserve_async(self, amount: float) -> bool:
+        """reserve 的 asyncio 版本，等待期间不阻塞事件循环，也不占用线程"""
+        if not self.budget:
+            return True
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                reserved = self._try_reserve(amount)
+                if reserved is not None:
+                    return reserved
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                raise
+
+    def _try_reserve(self, amount: float) -> Optional[bool]:
+        """调用方需持有锁；返回None表示需要等待在途的预留结算"""
+        if self._total.cost + self._reserved + amount <= self.budget:
+            self._reserved += amount
+            return True
+        if not self._reserved:
+            self.skipped_for_budget += 1
+            return False
+        return None
+
+    def release(self, amount: float) -> None:
+        """调用结束（实际费用已记录）后释放预留，并唤醒等待预算的调用方"""
+        if not self.budget:
+            return
+        with self._settled:
+            self._reserved -= amount
+            # 浮点误差不应让等待者误以为仍有预留在途
+            if self._reserved < 1e-12:
+                self._reserved = 0.0
+            self._settled.notify_all()
+            waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = list(self._async_waiters)
+            self._async_waiters.clear()
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        返回用量汇总
+
+        Returns:
+            total: 总用量；stages: 阶段 -> 用量；models: 服务商/模型 -> 用量；papers: 论文ID -> 用量；
+            budget: 预算（0 表示不限制）；skipped_for_budget: 因预算不足未进入深度分析的论文数
+        """
+        with self._lock:
+            return {
+                "total": asdict(self._total),
+                "stages": {stage: asdict(usage) for stage, usage in self._by_stage.items()},
+                "models": {model: asdict(usage) for model, usage in self._by_model.items()},
+                "papers": {paper_id: asdict(usage) for paper_id, usage in self._by_paper.items()},
+                "budget": self.budget,
+                "skipped_for_budget": self.skipped_for_budget,
+            }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def format_usage(usage: Dict[str, float]) -> str:
+    """把 summary() 中的一项用量格式化为一行文字"""
+    return (
+        f"{usage['calls']:.0f} 次调用，输入 {usage['prompt_tokens']:,.0f} tokens"
+        f"（缓存命中 {usage['cached_tokens']:,.0f}），输出 {usage['completion_tokens']:,.0f} tokens，"
+        f"费用约 ¥{usage['cost']:.4f}"
+    )
@@ -4,6 +4,7 @@
 集中管理所有配置项，便于维护和扩展
 """
 
+import json
 import os
 import yaml
 from pathlib import Path
@@ -88,6 +89,11 @@ class Config:
         self.HTML_REPORT_FILE = self.BASE_DIR / "storage" / "report.html"
         self.TEMPLATES_DIR = self.BASE_DIR / "src" / "output" / "templates"
         self.DB_PATH = self.BASE_DIR / "storage" / "papers.db"
+        self.HTTP_CACHE_DIR = self.BASE_DIR / "storage" / "http_cache"
+        self.TEXT_CACHE_DIR = self.BASE_DIR / "storage" / "text_cache"
+        # PDF缓存使用独立目录，不与 PAPERS_DIR 中调用方自行管理的临时PDF混在一起
+        self.PDF_CACHE_DIR = self.BASE_DIR / "storage" / "pdf_cache"
+        self.LLM_CACHE_PATH = self.BASE_DIR / "storage" / "llm_cache.db"
         self.LOGS_DIR = self.BASE_DIR / "storage" / "logs"
 
     def __getattr__(self, name: str) -> Any:
@@ -96,8 +102,28 @@ class Config:
         key = name.upper()
         
         # 特殊处理布尔值
-        if key == "ENABLE_PARALLEL":
-            value = self.get(key, "true")
+        bool_keys = {
+            "ENABLE_PARALLEL": "true",
+            "ENABLE_PAPER_STORE": "true",
+            "INCREMENTAL_FETCH": "false",
+            "SHARDED_FETCH": "false",
+            "STREAMING_FETCH": "false",
+            "FAST_ATOM_PARSER": "false",
+            "ARXIV_HTTP_CACHE": "false",
+            "ARXIV_HTTP_CACHE_REPLAY_ONLY": "false",
+            "ENABLE_PDF_CACHE": "true",
+            "ASYNC_PDF_FETCH": "false",
+            "ENABLE_TEXT_CACHE": "true",
+            "SECTION_AWARE_EXTRACTION": "false",
+            "SECTION_KEEP_BACKMATTER": "false",
+            "IN_MEMORY_PDF": "false",
+            "ENABLE_LLM_CACHE": "true",
+            "LLM_CACHE_BYPASS": "false",
+            "ASYNC_LLM": "false",
+            "ADAPTIVE_CONCURRENCY": "false",
+        }
+        if key in bool_keys:
+            value = self.get(key, bool_keys[key])
             return str(value).lower() == "true"
             
         # 特殊处理列表
@@ -113,13 +139,31 @@ class Config:
         numeric_keys = [
             "MAX_PAPERS", "SEARCH_DAYS", "API_RETRY_TIMES", "API_DELAY",
             "API_TIMEOUT", "SMTP_PORT", "MAX_WORKERS", "BATCH_SIZE",
-            "ARXIV_CLIENT_NUM_RETRIES"
+            "ARXIV_CLIENT_NUM_RETRIES", "ARXIV_HTTP_CACHE_TTL",
+            "PDF_CACHE_MAX_MB", "PDF_MAX_MB", "PDF_FETCH_PER_HOST",
+            "ARXIV_RATE_BURST", "PDF_EXTRACT_WORKERS", "TEXT_CACHE_MAX_MB",
+            "SECTION_TOKEN_BUDGET", "PDF_MEMORY_MAX_MB", "EXTRACT_CHAR_BUDGET",
+            "PDF_EXTRACT_TIMEOUT", "PDF_EXTRACT_MEMORY_MB", "REVISION_REUSE_THRESHOLD",
+            "LLM_CACHE_TTL", "LLM_CACHE_MAX_MB", "LLM_MAX_CONCURRENCY",
+            "LLM_CONCURRENCY_INITIAL", "LLM_CONCURRENCY_MIN", "LLM_CONCURRENCY_MAX",
+            "LLM_LATENCY_TOLERANCE", "PROVIDER_FAILURE_THRESHOLD", "PROVIDER_RECOVERY_SECONDS"
         ]
         if key in numeric_keys:
             default_map = {
                 "MAX_PAPERS": "50", "SEARCH_DAYS": "2", "API_RETRY_TIMES": "3",
                 "API_DELAY": "2", "API_TIMEOUT": "60", "SMTP_PORT": "587",
-                "MAX_WORKERS": "0", "BATCH_SIZE": "20", "ARXIV_CLIENT_NUM_RETRIES": "3"
+                "MAX_WORKERS": "0", "BATCH_SIZE": "20", "ARXIV_CLIENT_NUM_RETRIES": "3",
+                "ARXIV_HTTP_CACHE_TTL": "3600", "PDF_CACHE_MAX_MB": "500",
+                "PDF_MAX_MB": "100", "PDF_FETCH_PER_HOST": "4",
+                "ARXIV_RATE_BURST": "1", "PDF_EXTRACT_WORKERS": "2",
+                "TEXT_CACHE_MAX_MB": "200", "SECTION_TOKEN_BUDGET": "12000",
+                "PDF_MEMORY_MAX_MB": "32", "EXTRACT_CHAR_BUDGET": "90000",
+                "PDF_EXTRACT_TIMEOUT": "120", "PDF_EXTRACT_MEMORY_MB": "2048",
+                "REVISION_REUSE_THRESHOLD": "10", "LLM_CACHE_TTL": "604800",
+                "LLM_CACHE_MAX_MB": "200", "LLM_MAX_CONCURRENCY": "64",
+                "LLM_CONCURRENCY_INITIAL": "4", "LLM_CONCURRENCY_MIN": "1",
+                "LLM_CONCURRENCY_MAX": "32", "LLM_LATENCY_TOLERANCE": "150",
+                "PROVIDER_FAILURE_THRESHOLD": "3", "PROVIDER_RECOVERY_SECONDS": "60"
             }
             value = self.get(key, default_map.get(key))
             return self._safe_int(value, default_map.get(key))
@@ -127,6 +171,14 @@ class Config:
         # 处理需要是浮点数的数字
         if key == "ARXIV_CLIENT_DELAY_SECONDS":
              return float(self.get(key, "5.0"))
+
+        if key == "LLM_RUN_BUDGET":
+            return float(self.get(key, "0") or 0)
+
+        # 模型价格表：YAML中为映射，通过环境变量设置时为JSON字符串
+        if key == "LLM_PRICES":
+            value = self.get(key) or {}
+            return json.loads(value) if isinstance(value, str) else value
              
         # 对于其他所有字符串值
         return self.get(name.upper())
@@ -150,7 +202,9 @@ class Config:
             return False
 
         # 显示使用的模型
-        if self.QWEN_API_KEY:
+        if self.LLM_PROVIDERS:
+            print(f"✅ 配置验证通过！使用多个服务商: {self.LLM_PROVIDERS}")
+        elif self.QWEN_API_KEY:
             print(f"✅ 配置验证通过！使用Qwen模型: {self.QWEN_MODEL or 'qwen3-max'}")
         elif self.GLM_API_KEY:
             print(f"✅ 配置验证通过！使用智谱GLM模型: {self.GLM_MODEL or 'glm-4.6'}")
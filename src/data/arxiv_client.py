@@ -4,81 +4,120 @@ ArXiv客户端模块
 负责论文搜索和下载功能，不再进行质量筛选，改为在AI分析阶段进行质量评估
 """
 
+import concurrent.futures
 import datetime
+import heapq
+import os
+import queue
+import shutil
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import arxiv
 import requests # 确保导入 requests 以捕获其异常
-import fitz  # PyMuPDF
 
+from .atom_feed import FastArxivClient
+from .http_cache import CachedSession, HttpResponseCache
+from .keyword_filter import KeywordFilter
+from .paper import Paper
+from .pdf_cache import PdfCache
+from .pdf_downloader import PdfDownloader, PdfTooLargeError
+from .pdf_extractor import ExtractionResult, PdfExtractionError, PdfTextExtractor
+from .rate_limiter import RateLimiter, RateLimitedSession
+from .text_cache import TextCache
 from ..utils.logger import logger
 
 
 class ArxivClient:
     """ArXiv客户端类"""
 
-    def __init__(self, categories: List[str], max_papers: int = 50, search_days: int = 2, num_retries: int = 3, delay_seconds: float = 3.0):
+    def __init__(self, categories: List[str], max_papers: int = 50, search_days: int = 2, num_retries: int = 3, delay_seconds: float = 3.0, sharded: bool = False, fast_parser: bool = False, http_cache: Optional[HttpResponseCache] = None, pdf_cache: Optional[PdfCache] = None, pdf_downloader: Optional[PdfDownloader] = None, rate_limiter: Optional[RateLimiter] = None, text_extractor: Optional[PdfTextExtractor] = None, text_cache: Optional[TextCache] = None, pdf_memory_limit: int = 0):
         """
         初始化ArXiv客户端
 
         Args:
             categories: 论文类别列表
-            max_papers: 最大论文数量
+            max_papers: 最大论文数量（分片模式下为每个类别的配额）
             search_days: 搜索最近几天的论文
             num_retries: arxiv.Client 请求的重试次数
-            delay_seconds: arxiv.Client 请求之间的延迟秒数 (用于分页和重试)
+            delay_seconds: 未提供 rate_limiter 时，新建节流器的请求间隔秒数 (用于分页和重试)
+            sharded: 是否按类别分片并发查询
+            fast_parser: 是否使用内置的轻量Atom解析客户端代替 arxiv.Client
+            http_cache: 可选的API响应磁盘缓存
+            pdf_cache: 可选的PDF缓存，启用后下载的PDF不再用完即删
+            pdf_downloader: 可选的PDF下载器，未提供时使用默认配置创建
+            rate_limiter: 进程内共享的arXiv节流器，查询分页和PDF下载都经过它
+            text_extractor: 可选的PDF文本提取器，未提供时在调用线程中直接提取
+            text_cache: 可选的全文缓存，键中包含提取器版本
+            pdf_memory_limit: 大于0时启用内存模式，PDF下载到该大小（字节）的内存缓冲区直接解析，不落盘
         """
         self.categories = categories
         self.max_papers = max_papers
         self.search_days = search_days
+        self.num_retries = num_retries
+        self.sharded = sharded
+        self.fast_parser = fast_parser
+        self.http_cache = http_cache
+        self.pdf_cache = pdf_cache
+
+        # 所有arXiv请求（各分片的查询分页、PDF下载）共用一个令牌桶节流器
+        self.rate_limiter = rate_limiter or RateLimiter(delay_seconds)
+        self.pdf_downloader = pdf_downloader or PdfDownloader(num_retries=num_retries, limiter=self.rate_limiter)
+        self.text_extractor = text_extractor or PdfTextExtractor(max_workers=0)
+        self.text_cache = text_cache
+        self.pdf_memory_limit = pdf_memory_limit
         
-        # 初始化 arxiv.py 库的客户端，并配置重试和延迟
-        # arxiv.Client 会在内部处理分页请求之间的延迟 (delay_seconds)
-        # 以及在请求失败时的重试 (num_retries)
-        logger.info(f"Initializing arxiv.Client with num_retries={num_retries}, delay_seconds={delay_seconds}")
-        self.arxiv_sdk_client = arxiv.Client(
-            num_retries=num_retries,
-            delay_seconds=delay_seconds
-        )
-
-    def get_recent_papers(self) -> List[arxiv.Result]:
+        # 初始化 arxiv.py 库的客户端，并配置重试
+        # 请求间隔由会话上的共享节流器保证（命中缓存的页面无需等待），客户端自身不再额外延迟
+        logger.info(f"Initializing {'FastArxivClient' if fast_parser else 'arxiv.Client'} with num_retries={num_retries}, min_interval={self.rate_limiter.min_interval}, burst={self.rate_limiter.burst}")
+        self.arxiv_sdk_client = self._create_sdk_client(0, session=self._create_session())
+
+    def _create_session(self) -> requests.Session:
+        """创建经过共享节流器（以及可选的响应缓存）的会话"""
+        if self.http_cache:
+            return CachedSession(self.http_cache, self.rate_limiter)
+        return RateLimitedSession(self.rate_limiter)
+
+    def _create_sdk_client(self, delay_seconds: float, session: Optional[requests.Session] = None):
+        """创建执行查询的客户端，二者都提供 results(search) 分页接口"""
+        if self.fast_parser:
+            return FastArxivClient(num_retries=self.num_retries, delay_seconds=delay_seconds, session=session)
+        client = arxiv.Client(num_retries=self.num_retries, delay_seconds=delay_seconds)
+        if session is not None:
+            client._session = session
+        return client
+
+    def get_recent_papers(self, watermark: Optional[Dict[str, Any]] = None) -> List[Paper]:
         """
         获取最近几天内发布的指定类别的论文
 
+        Args:
+            watermark: 增量模式下上次抓取到的最新论文 {"published": ISO时间, "entry_id": ...}。
+                提供时只查询比它更新的论文，一直翻页到水位线，再按上限保留其中最早的一批；
+                为空时使用 search_days 窗口。
+
         Returns:
             论文列表，按发布时间倒序排列
         """
-        logger.info(f"ArxivClient: Initiating get_recent_papers. search_days = {self.search_days}")
-        # 计算日期范围
-        today_utc = datetime.datetime.now(datetime.UTC)  # 使用 timezone-aware UTC 时间
-        start_date_utc = today_utc - datetime.timedelta(days=self.search_days)
+        logger.info(f"ArxivClient: Initiating get_recent_papers. search_days = {self.search_days}, watermark = {watermark}")
+        date_range = self._build_date_range(watermark)
 
-        # 格式化ArXiv查询的日期
-        start_date_str = start_date_utc.strftime("%Y%m%d")
-        end_date_str = today_utc.strftime("%Y%m%d")
-        logger.info(f"ArxivClient: Calculated date range for query: start_date_str = {start_date_str}, end_date_str = {end_date_str}")
+        if self.sharded:
+            results = self._get_recent_papers_sharded(date_range, watermark)
+            return self._cap_incremental(results, self.max_papers * len(self.categories)) if watermark else results
 
         # 创建查询字符串
         category_query = " OR ".join([f"cat:{cat}" for cat in self.categories])
-        date_range = f"submittedDate:[{start_date_str}000000 TO {end_date_str}235959]"
         query = f"({category_query}) AND {date_range}"
 
         logger.info(f"正在搜索论文，查询条件: {query}")
 
-        # 搜索ArXiv
-        search = arxiv.Search(
-            query=query,
-            max_results=self.max_papers,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending,
-        )
-
         # 使用配置好的 arxiv.Client 实例获取结果
         try:
-            results = list(self.arxiv_sdk_client.results(search))
+            results = list(self._iter_results(self.arxiv_sdk_client, query, watermark))
             logger.info(f"找到{len(results)}篇符合条件的论文，将进行AI质量评估")
-            return results
+            return self._cap_incremental(results, self.max_papers) if watermark else results
         except requests.exceptions.ConnectionError as e:
             logger.error(f"ArXiv连接错误 (Query: {query}): {e}")
             raise
@@ -86,48 +125,332 @@ class ArxivClient:
             logger.error(f"从ArXiv获取论文时发生未知错误 (Query: {query}): {e}")
             raise
 
-    def download_paper(self, paper: arxiv.Result, output_dir: Path) -> Optional[Path]:
+    def iter_recent_papers(self, watermark: Optional[Dict[str, Any]] = None) -> Iterator[Paper]:
+        """
+        get_recent_papers 的流式版本：每抓到一页就逐篇产出，下游可以边抓取边处理
+
+        Args:
+            watermark: 增量抓取水位线，含义同 get_recent_papers
+
+        Yields:
+            论文对象。单查询模式下按提交时间倒序；分片模式下按到达顺序（已去重）
+        """
+        if watermark:
+            # 增量模式需要先翻页到水位线才能确定按上限保留哪些论文，无法边抓取边产出
+            yield from self.get_recent_papers(watermark=watermark)
+            return
+
+        logger.info(f"ArxivClient: Initiating iter_recent_papers. search_days = {self.search_days}, watermark = {watermark}")
+        date_range = self._build_date_range(watermark)
+
+        if self.sharded:
+            yield from self._iter_recent_papers_sharded(date_range, watermark)
+            return
+
+        category_query = " OR ".join([f"cat:{cat}" for cat in self.categories])
+        query = f"({category_query}) AND {date_range}"
+        logger.info(f"正在流式搜索论文，查询条件: {query}")
+
+        count = 0
+        try:
+            for paper in self._iter_results(self.arxiv_sdk_client, query, watermark):
+                count += 1
+                yield paper
+        except requests.exceptions.ConnectionError as e:
+            logger.error(f"ArXiv连接错误 (Query: {query}): {e}")
+            raise
+        except Exception as e:
+            logger.error(f"从ArXiv获取论文时发生未知错误 (Query: {query}): {e}")
+            raise
+        logger.info(f"流式抓取共找到{count}篇符合条件的论文")
+
+    def _build_date_range(self, watermark: Optional[Dict[str, Any]]) -> str:
+        """根据水位线或 search_days 构建 submittedDate 查询条件"""
+        # 计算日期范围
+        today_utc = datetime.datetime.now(datetime.UTC)  # 使用 timezone-aware UTC 时间
+        if watermark:
+            watermark_dt = datetime.datetime.fromisoformat(watermark["published"])
+            # 查询从水位线所在的分钟开始（arXiv 日期查询精度为分钟），重叠部分在翻页时逐条过滤
+            start_date_str = watermark_dt.strftime("%Y%m%d%H%M")
+            end_date_str = today_utc.strftime("%Y%m%d%H%M")
+        else:
+            start_date_utc = today_utc - datetime.timedelta(days=self.search_days)
+            # 格式化ArXiv查询的日期
+            start_date_str = start_date_utc.strftime("%Y%m%d") + "0000"
+            end_date_str = today_utc.strftime("%Y%m%d") + "2359"
+        logger.info(f"ArxivClient: Calculated date range for query: start_date_str = {start_date_str}, end_date_str = {end_date_str}")
+        return f"submittedDate:[{start_date_str} TO {end_date_str}]"
+
+    def _cap_incremental(self, papers: List[Paper], limit: int) -> List[Paper]:
+        """
+        增量模式下按上限保留紧接水位线的最早一批论文
+
+        水位线随后只推进到保留论文中最新的一篇，更新的论文留给下一次运行，不会被跳过
+
+        Args:
+            papers: 水位线之后的全部论文，按发布时间倒序排列
+            limit: 本次最多保留的论文数
+
+        Returns:
+            保留的论文，按发布时间倒序排列
+        """
+        if len(papers) <= limit:
+            return papers
+        logger.warning(f"水位线之后共有 {len(papers)} 篇新论文，超过上限 {limit}；本次处理最早的 {limit} 篇，其余留到下次运行")
+        return papers[-limit:]
+
+    def _iter_results(self, client: arxiv.Client, query: str, watermark: Optional[Dict[str, Any]]) -> Iterator[Paper]:
+        """
+        按提交时间倒序惰性翻页，提供水位线时不限数量，一直翻页到水位线为止
+
+        Args:
+            client: 用于执行查询的 arxiv.Client
+            query: 查询字符串
+            watermark: 增量抓取水位线
+
+        Yields:
+            论文对象
+        """
+        search = arxiv.Search(
+            query=query,
+            # 增量模式的上限在到达水位线后由 _cap_incremental 统一施加
+            max_results=None if watermark else self.max_papers,
+            sort_by=arxiv.SortCriterion.SubmittedDate,
+            sort_order=arxiv.SortOrder.Descending,
+        )
+
+        # 结果在这里统一转换为 Paper，之后各层不再重复转换
+        if not watermark:
+            for result in client.results(search):
+                yield Paper.from_result(result)
+            return
+
+        watermark_dt = datetime.datetime.fromisoformat(watermark["published"])
+        # 与水位线同一时刻提交的论文可能排在水位线论文之后，只跳过上次已抓取的，不停止翻页；
+        # 旧格式的水位线只记录了一个 entry_id
+        fetched_ids = set(watermark.get("entry_ids") or [watermark.get("entry_id")])
+        # results() 是惰性分页的生成器，遇到早于水位线的论文后停止迭代即不再请求后续页面
+        for result in client.results(search):
+            if result.published < watermark_dt:
+                logger.info(f"已到达水位线 ({watermark['published']})，停止翻页")
+                return
+            if result.published == watermark_dt and result.entry_id in fetched_ids:
+                continue
+            yield Paper.from_result(result)
+
+    def _get_recent_papers_sharded(self, date_range: str, watermark: Optional[Dict[str, Any]]) -> List[Paper]:
+        """
+        每个类别一个查询并发执行，按类别配额抓取后合并为去重的、按提交时间倒序的列表
+
+        Args:
+            date_range: submittedDate 查询条件
+            watermark: 增量抓取水位线
+
+        Returns:
+            论文列表，按发布时间倒序排列
+        """
+        if watermark:
+            logger.info(f"分片抓取 {len(self.categories)} 个类别，各自翻页到水位线")
+        else:
+            logger.info(f"分片抓取 {len(self.categories)} 个类别，每个类别最多 {self.max_papers} 篇")
+
+        shard_results: List[List[Paper]] = []
+        first_error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self.categories))) as executor:
+            future_to_category = {
+                executor.submit(self._fetch_category, category, date_range, watermark): category
+                for category in self.categories
+            }
+            for future in concurrent.futures.as_completed(future_to_category):
+                category = future_to_category[future]
+                try:
+                    shard_results.append(future.result())
+                except Exception as e:
+                    logger.error(f"从ArXiv获取类别 {category} 的论文时出错: {e}")
+                    first_error = first_error or e
+
+        # 任一分片失败都视为本次抓取失败，避免增量模式下水位线越过未抓取的论文
+        if first_error:
+            raise first_error
+
+        # 各分片已按提交时间倒序，归并后跳过跨类别重复出现的论文
+        results = []
+        seen_ids = set()
+        for paper in heapq.merge(*shard_results, key=lambda p: p.published, reverse=True):
+            if paper.entry_id in seen_ids:
+                continue
+            seen_ids.add(paper.entry_id)
+            results.append(paper)
+
+        logger.info(f"分片抓取共找到{len(results)}篇不重复的论文，将进行AI质量评估")
+        return results
+
+    def _iter_recent_papers_sharded(self, date_range: str, watermark: Optional[Dict[str, Any]]) -> Iterator[Paper]:
+        """
+        分片抓取的流式版本：各类别在线程中并发翻页，论文到达后立即去重产出
+
+        Args:
+            date_range: submittedDate 查询条件
+            watermark: 增量抓取水位线
+
+        Yields:
+            论文对象，按到达顺序
+        """
+        logger.info(f"流式分片抓取 {len(self.categories)} 个类别，每个类别最多 {self.max_papers} 篇")
+        paper_queue: queue.Queue = queue.Queue()
+        stop_event = threading.Event()
+        shard_done = object()
+
+        def produce(category: str) -> None:
+            try:
+                for paper in self._iter_category(category, date_range, watermark):
+                    if stop_event.is_set():
+                        break
+                    paper_queue.put(paper)
+                paper_queue.put(shard_done)
+            except Exception as e:
+                logger.error(f"从ArXiv获取类别 {category} 的论文时出错: {e}")
+                paper_queue.put(e)
+
+        seen_ids = set()
+        first_error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self.categories))) as executor:
+            for category in self.categories:
+                executor.submit(produce, category)
+            try:
+                pending = len(self.categories)
+                while pending:
+                    item = paper_queue.get()
+                    if item is shard_done or isinstance(item, Exception):
+                        pending -= 1
+                        if isinstance(item, Exception):
+                            first_error = first_error or item
+                        continue
+                    if item.entry_id in seen_ids:
+                        continue
+                    seen_ids.add(item.entry_id)
+                    yield item
+            finally:
+                # 下游提前停止消费时通知各分片尽快结束
+                stop_event.set()
+
+        if first_error:
+            raise first_error
+        logger.info(f"流式分片抓取共找到{len(seen_ids)}篇不重复的论文")
+
+    def _fetch_category(self, category: str, date_range: str, watermark: Optional[Dict[str, Any]]) -> List[Paper]:
+        """抓取单个类别的论文，在分片线程池中运行"""
+        results = list(self._iter_category(category, date_range, watermark))
+        logger.info(f"类别 {category} 找到{len(results)}篇论文")
+        return results
+
+    def _iter_category(self, category: str, date_range: str, watermark: Optional[Dict[str, Any]]) -> Iterator[Paper]:
+        """惰性抓取单个类别的论文"""
+        query = f"cat:{category} AND {date_range}"
+        logger.info(f"正在搜索论文，查询条件: {query}")
+
+        # 请求间隔由共享节流器负责，单个客户端不再额外等待
+        client = self._create_sdk_client(0, session=self._create_session())
+
+        yield from self._iter_results(client, query, watermark)
+
+    @staticmethod
+    def compute_watermark(papers: List[Paper]) -> Optional[Dict[str, Any]]:
+        """
+        计算一批论文的水位线，即其中提交时间最新的一篇，并记录与它同一时刻提交的全部论文
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            {"published": ISO时间, "entry_id": ..., "entry_ids": [...]}，论文列表为空时返回None
+        """
+        if not papers:
+            return None
+        newest = max(papers, key=lambda p: p.published)
+        tied_ids = sorted({p.entry_id for p in papers if p.published == newest.published})
+        return {"published": newest.published.isoformat(), "entry_id": newest.entry_id, "entry_ids": tied_ids}
+
+    def download_paper(self, paper: Paper, output_dir: Path) -> Optional[Path]:
         """
         下载论文PDF到指定目录
 
+        启用PDF缓存时从缓存取得文件（必要时下载），在锁定期间复制到 output_dir：
+        调用方拿到的文件归自己所有，不会被缓存淘汰，删除它也不影响缓存
+
         Args:
             paper: 论文对象
             output_dir: 输出目录
 
         Returns:
             PDF文件路径，下载失败返回None
+
+        Raises:
+            ValueError: 启用PDF缓存时 output_dir 就是缓存目录（副本会覆盖缓存中的文件）
         """
         pdf_path = output_dir / f"{paper.get_short_id().replace('/', '_')}.pdf"
 
+        if self.pdf_cache:
+            if Path(output_dir).resolve() == self.pdf_cache.cache_dir.resolve():
+                raise ValueError(f"download_paper 的输出目录不能是PDF缓存目录: {output_dir}")
+            with self.pdf_cache.lease(paper.get_short_id(), lambda dest: self._download_pdf(paper, dest)) as cached_path:
+                if not cached_path:
+                    return None
+                output_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path = pdf_path.with_name(f"{pdf_path.name}.{threading.get_ident()}.tmp")
+                try:
+                    shutil.copyfile(cached_path, tmp_path)
+                    os.replace(tmp_path, pdf_path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+            return pdf_path
+
         if pdf_path.exists():
             logger.info(f"论文已下载: {pdf_path}")
             return pdf_path
 
+        return self._download_pdf(paper, pdf_path)
+
+    def _download_pdf(self, paper: Paper, pdf_path: Path) -> Optional[Path]:
+        """
+        将论文PDF下载到指定路径
+
+        Args:
+            paper: 论文对象
+            pdf_path: 目标文件路径
+
+        Returns:
+            PDF文件路径，下载失败返回None
+        """
+        pdf_url = PdfDownloader.pdf_url_for(paper)
+        if not pdf_url:
+            logger.error(f"论文没有可用的PDF地址: {paper.title}")
+            return None
+
         try:
             logger.info(f"正在下载: {paper.title}")
-            # 在 Result.download_pdf() 之前确保目录存在
-            output_dir.mkdir(parents=True, exist_ok=True)
-            # 下载操作也应该使用配置好的客户端，但 download_pdf 是 Result 对象的方法，
-            # 它内部应该会复用 Client 的 session (如果设计合理) 或创建新的。
-            # arxiv.py 的 Result.download_pdf() 似乎会创建一个临时的 Client(page_size=1, delay_seconds=0.0, num_retries=0)
-            # 如果要让下载也享受重试，需要更深入的修改或手动下载。
-            # 目前，我们将保持 Result.download_pdf() 的默认行为。
-            paper.download_pdf(filename=str(pdf_path))
+            # 使用共享连接池的下载器（带重试、断点续传和大小上限），
+            # 而不是 Result.download_pdf() 每次新建的无重试连接
+            self.pdf_downloader.download(pdf_url, pdf_path)
             logger.info(f"已下载到 {pdf_path}")
             return pdf_path
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"下载论文失败 (ConnectionError) {paper.title}: {e}")
+        except PdfTooLargeError as e:
+            logger.error(f"下载论文失败 (PdfTooLargeError) {paper.title}: {e}")
             return None
-        except arxiv.arxiv.ArxivError as e:
-            logger.error(f"下载论文失败 (ArxivError) {paper.title}: {e}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"下载论文失败 ({e.__class__.__name__}) {paper.title}: {e}")
             return None
         except Exception as e:
             logger.error(f"下载论文失败 (Unknown Error) {paper.title}: {e.__class__.__name__} - {e}")
             return None
 
-    def get_full_text(self, paper: arxiv.Result, output_dir: Path) -> Optional[str]:
+    def get_full_text(self, paper: Paper, output_dir: Path) -> Optional[str]:
         """
-        下载PDF，提取全文，然后删除PDF。
+        下载PDF并提取全文。
+
+        启用全文缓存时先查缓存，命中则既不下载也不解析；
+        内存模式下PDF只下载到内存缓冲区，不落盘；
+        启用PDF缓存时PDF保留在缓存中供重试和后续运行复用；否则提取后删除PDF。
 
         Args:
             paper: 论文对象
@@ -136,6 +459,27 @@ class ArxivClient:
         Returns:
             论文全文的字符串，如果失败则返回None。
         """
+        if self.has_cached_text(paper):
+            cached_text = self.text_cache.get(paper.get_short_id())
+            if cached_text is not None:
+                logger.info(f"全文缓存命中: {paper.get_short_id()} ({len(cached_text)} 字符)")
+                return cached_text
+
+        if self.pdf_memory_limit:
+            return self._get_full_text_in_memory(paper)
+
+        if self.pdf_cache:
+            logger.info(f"开始为论文 '{paper.title}' 提取全文...")
+            try:
+                with self.pdf_cache.lease(paper.get_short_id(), lambda dest: self._download_pdf(paper, dest)) as pdf_path:
+                    if not pdf_path:
+                        logger.error(f"下载失败，无法提取文本: {paper.get_short_id()}")
+                        return None
+                    return self._extract_text(paper, pdf_path)
+            except Exception as e:
+                logger.error(f"从PDF提取文本时出错: {e}", exc_info=True)
+                return None
+
         pdf_path = None
         try:
             logger.info(f"开始为论文 '{paper.title}' 提取全文...")
@@ -145,16 +489,7 @@ class ArxivClient:
                 logger.error(f"下载失败或未找到PDF文件，无法提取文本: {pdf_path}")
                 return None
 
-            logger.info(f"从 {pdf_path} 提取文本...")
-            full_text = ""
-            with fitz.open(pdf_path) as doc:
-                for page in doc:
-                    full_text += page.get_text()
-            
-            # 对提取的文本进行一些基本清理
-            full_text = ' '.join(full_text.split())
-            logger.info(f"成功为论文 '{paper.title}' 提取了 {len(full_text)} 字符的文本。")
-            return full_text
+            return self._extract_text(paper, pdf_path)
 
         except Exception as e:
             logger.error(f"从PDF提取文本时出错: {e}", exc_info=True)
@@ -164,6 +499,105 @@ class ArxivClient:
             if pdf_path:
                 self.delete_pdf(pdf_path)
 
+    def get_full_text_from_bytes(self, paper: Paper, pdf_bytes: bytes) -> Optional[str]:
+        """
+        从已下载到内存的PDF中提取全文（供异步批量下载使用）
+
+        启用PDF缓存时同时写入缓存，供重试和后续运行复用
+
+        Args:
+            paper: 论文对象
+            pdf_bytes: PDF文件内容
+
+        Returns:
+            论文全文的字符串，如果失败则返回None。
+        """
+        if self.pdf_cache:
+            try:
+                self.pdf_cache.store(paper.get_short_id(), pdf_bytes)
+            except OSError as e:
+                logger.warning(f"写入PDF缓存失败 {paper.get_short_id()}: {e}")
+
+        try:
+            return self._extract_bytes(paper, pdf_bytes)
+        except Exception as e:
+            logger.error(f"从PDF提取文本时出错: {e}", exc_info=True)
+            return None
+
+    def _get_full_text_in_memory(self, paper: Paper) -> Optional[str]:
+        """
+        内存模式：PDF下载到有上限的内存缓冲区后直接解析
+
+        超过上限的PDF溢出到系统临时目录，解析后立即删除；存储目录中不会留下任何PDF
+        """
+        pdf_url = PdfDownloader.pdf_url_for(paper)
+        if not pdf_url:
+            logger.error(f"论文没有可用的PDF地址: {paper.title}")
+            return None
+
+        logger.info(f"开始为论文 '{paper.title}' 提取全文（内存模式）...")
+        try:
+            with self.pdf_downloader.download_to_buffer(pdf_url, self.pdf_memory_limit) as buffer:
+                source = buffer.source
+                if isinstance(source, Path):
+                    logger.info(f"PDF超过内存缓冲上限，已溢出到临时文件: {source}")
+                    return self._extract_text(paper, source)
+                return self._extract_bytes(paper, source)
+        except PdfTooLargeError as e:
+            logger.error(f"下载论文失败 (PdfTooLargeError) {paper.title}: {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"下载论文失败 ({e.__class__.__name__}) {paper.title}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"从PDF提取文本时出错: {e}", exc_info=True)
+            return None
+
+    def _extract_bytes(self, paper: Paper, pdf_bytes: bytes) -> Optional[str]:
+        """从内存中的PDF提取并清理全文"""
+        logger.info(f"从内存中的PDF ({len(pdf_bytes)} 字节) 提取文本...")
+        try:
+            result = self.text_extractor.extract_bytes(pdf_bytes)
+        except PdfExtractionError as e:
+            logger.warning(f"提取论文 {paper.get_short_id()} 全文失败，将仅使用摘要进行分析: {e}")
+            return None
+        return self._finish_extraction(paper, result)
+
+    def _extract_text(self, paper: Paper, pdf_path: Path) -> Optional[str]:
+        """从PDF文件中提取并清理全文"""
+        logger.info(f"从 {pdf_path} 提取文本...")
+        try:
+            result = self.text_extractor.extract(pdf_path)
+        except PdfExtractionError as e:
+            logger.warning(f"提取论文 {paper.get_short_id()} 全文失败，将仅使用摘要进行分析: {e}")
+            return None
+        return self._finish_extraction(paper, result)
+
+    def _finish_extraction(self, paper: Paper, result: ExtractionResult) -> str:
+        """记录提取情况（包括因字符预算跳过的页面）并写入全文缓存"""
+        full_text = result.text
+        logger.info(f"成功为论文 '{paper.title}' 提取了 {len(full_text)} 字符的文本。")
+        if result.skipped_pages:
+            logger.info(
+                f"已达到字符预算，跳过 {paper.get_short_id()} 的后 {result.skipped_pages}/{result.page_count} 页"
+                f"（约 {result.estimated_skipped_chars} 字符）"
+            )
+        self._cache_text(paper, full_text)
+        return full_text
+
+    def has_cached_text(self, paper: Paper) -> bool:
+        """该论文的全文是否已在全文缓存中"""
+        return bool(self.text_cache) and self.text_cache.contains(paper.get_short_id())
+
+    def _cache_text(self, paper: Paper, full_text: str) -> None:
+        """将提取出的全文写入全文缓存（空文本不缓存）"""
+        if not self.text_cache or not full_text:
+            return
+        try:
+            self.text_cache.put(paper.get_short_id(), full_text)
+        except OSError as e:
+            logger.warning(f"写入全文缓存失败 {paper.get_short_id()}: {e}")
+
     def delete_pdf(self, pdf_path: Path) -> None:
         """
         删除PDF文件
@@ -181,30 +615,25 @@ class ArxivClient:
             logger.error(f"删除PDF文件失败 {pdf_path}: {str(e)}")
 
     def filter_papers_by_keywords(
-        self, papers: List[arxiv.Result], keywords: List[str] = None
-    ) -> List[arxiv.Result]:
+        self, papers: List[Paper], keywords: List[str] = None
+    ) -> List[Paper]:
         """
-        根据关键词过滤论文
+        根据关键词过滤论文（标题或摘要中出现任一关键词即保留，不区分大小写；关键词从词首开始匹配，
+        最后一个词按前缀匹配，复数等词形变化仍能命中）
 
         Args:
             papers: 论文列表
-            keywords: 关键词列表
+            keywords: 关键词列表；需要布尔组合、指定字段时使用 KeywordFilter 检索式
 
         Returns:
             过滤后的论文列表
         """
+        keywords = [kw for kw in (keywords or ()) if kw.strip()]
         if not keywords:
             return papers
 
-        filtered_papers = []
-        keywords_lower = [kw.lower() for kw in keywords]
-
-        for paper in papers:
-            title_lower = paper.title.lower()
-            summary_lower = paper.summary.lower()
-
-            if any(kw in title_lower or kw in summary_lower for kw in keywords_lower):
-                filtered_papers.append(paper)
+        # 所有关键词编译为一个匹配器，每篇论文的标题和摘要各扫描一次
+        filtered_papers = list(KeywordFilter.any_of(keywords).filter(papers))
 
         logger.info(f"关键词过滤后剩余{len(filtered_papers)}篇论文")
         return filtered_papers
\ No newline at end of file
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+异步PDF抓取模块
+在单独的事件循环线程中用 httpx 并发下载多篇论文的PDF（按主机限制并发数），
+每下载完成一篇就交给调用方，下载不再占用分析线程
+"""
+
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from .pdf_downloader import PdfDownloader
+from .rate_limiter import RateLimiter
+from ..utils.logger import logger
+
+
+class AsyncPdfFetcher:
+    """基于 asyncio 的批量PDF下载器"""
+
+    def __init__(self, per_host_limit: int = 4, max_connections: int = 32, num_retries: int = 3,
+                 backoff_seconds: float = 2.0, max_bytes: int = 100 * 1024 * 1024, timeout: float = 60.0,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        初始化抓取器
+
+        Args:
+            per_host_limit: 同一主机的最大并发下载数
+            max_connections: 连接池的总连接数上限
+            num_retries: 失败后的重试次数
+            backoff_seconds: 首次重试前的等待秒数，之后每次翻倍
+            max_bytes: 单个PDF的大小上限（字节）
+            timeout: 连接和读取超时秒数
+            limiter: 可选的共享节流器，每次请求（包括重试）前获取令牌
+        """
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_connections = max_connections
+        self.num_retries = num_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.limiter = limiter
+
+    def fetch(self, items: Iterable[Tuple[Any, str]]) -> Iterator[Tuple[Any, Optional[bytes]]]:
+        """
+        并发下载所有PDF，按完成顺序逐个产出
+
+        下载在后台事件循环线程中进行，调用方可以边接收边处理
+
+        Args:
+            items: (调用方的标识对象, PDF地址) 列表
+
+        Yields:
+            (标识对象, PDF内容)，下载失败时内容为None
+        """
+        items = list(items)
+        if not items:
+            return
+
+        results: "queue.Queue[Tuple[Any, Optional[bytes]]]" = queue.Queue()
+        errors = []
+
+        def run_loop() -> None:
+            try:
+                asyncio.run(self._fetch_all(items, results))
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                results.put(_DONE)
+
+        thread = threading.Thread(target=run_loop, name="async-pdf-fetcher", daemon=True)
+        thread.start()
+
+        received = 0
+        while True:
+            result = results.get()
+            if result is _DONE:
+                break
+            received += 1
+            yield result
+
+        thread.join()
+        if errors:
+            raise errors[0]
+        if received < len(items):
+            logger.warning(f"异步下载提前结束: {received}/{len(items)}")
+
+    async def _fetch_all(self, items, results: queue.Queue) -> None:
+        host_limits: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.per_host_limit))
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        headers = {"user-agent": PdfDownloader.user_agent}
+
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, headers=headers, follow_redirects=True) as client:
+            async def fetch_one(key: Any, url: str) -> None:
+                async with host_limits[urlparse(url).netloc]:
+                    data = await self._download(client, url)
+                results.put((key, data))
+
+            await asyncio.gather(*(fetch_one(key, url) for key, url in items))
+
+    async def _download(self, client: httpx.AsyncClient, url: str) -> Optional[bytes]:
+        """下载单个PDF，按需重试；失败或超过大小上限时返回None"""
+        for try_index in range(self.num_retries + 1):
+            if self.limiter:
+                await self.limiter.acquire_async()
+            try:
+                async with client.stream("GET", url) as resp:
+                    resp.raise_for_status()
+                    content_length = resp.headers.get("Content-Length")
+                    if content_length and int(content_length) > self.max_bytes:
+                        logger.error(f"PDF超过大小上限 {self.max_bytes} 字节，放弃下载: {url}")
+                        return None
+
+                    buffer = bytearray()
+                    async for chunk in resp.aiter_bytes():
+                        buffer += chunk
+                        if len(buffer) > self.max_bytes:
+                            logger.error(f"PDF超过大小上限 {self.max_bytes} 字节，放弃下载: {url}")
+                            return None
+                logger.info(f"异步下载完成 ({len(buffer)} 字节): {url}")
+                return bytes(buffer)
+            except httpx.HTTPError as e:
+                if try_index >= self.num_retries or not self._is_retryable(e):
+                    logger.error(f"异步下载失败 {url}: {e}")
+                    return None
+                wait = self._retry_after(e) or self.backoff_seconds * (2 ** try_index)
+                logger.info(f"异步下载 {url} 出错 (try {try_index}): {e}，{wait:.1f}s 后重试")
+                await asyncio.sleep(wait)
+        return None
+
+    @staticmethod
+    def _is_retryable(error: httpx.HTTPError) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status in (408, 429) or status >= 500
+        return True
+
+    @staticmethod
+    def _retry_after(error: httpx.HTTPError) -> Optional[float]:
+        if isinstance(error, httpx.HTTPStatusError):
+            value = error.response.headers.get("Retry-After")
+            if value and value.isdigit():
+                return float(value)
+        return None
+
+
+_DONE = object()
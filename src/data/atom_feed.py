@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+轻量级arXiv Atom源解析模块
+直接请求export API的Atom XML，并用iterparse增量解析为轻量记录，
+绕开 feedparser 与 arxiv.Result 的解析和内存开销
+"""
+
+import datetime
+import io
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlencode, urlparse
+from urllib.request import urlretrieve
+
+import arxiv
+import requests
+
+from ..utils.logger import logger
+
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+_ENTRY = _ATOM + "entry"
+_TOTAL_RESULTS = _OPENSEARCH + "totalResults"
+
+
+class AtomAuthor(NamedTuple):
+    """论文作者，与 arxiv.Result.Author 一样通过 .name 访问姓名"""
+    name: str
+
+
+class AtomEntry:
+    """
+    Atom源中的一篇论文
+
+    保留流程中用到的 arxiv.Result 属性和方法，可以直接替代 arxiv.Result 使用
+    """
+
+    __slots__ = (
+        "entry_id", "updated", "published", "title", "authors", "summary",
+        "comment", "journal_ref", "doi", "primary_category", "categories", "pdf_url",
+    )
+
+    def __init__(self, entry_id: str, updated: datetime.datetime, published: datetime.datetime,
+                 title: str, authors: List[AtomAuthor], summary: str, comment: Optional[str],
+                 journal_ref: Optional[str], doi: Optional[str], primary_category: Optional[str],
+                 categories: List[str], pdf_url: Optional[str]):
+        self.entry_id = entry_id
+        self.updated = updated
+        self.published = published
+        self.title = title
+        self.authors = authors
+        self.summary = summary
+        self.comment = comment
+        self.journal_ref = journal_ref
+        self.doi = doi
+        self.primary_category = primary_category
+        self.categories = categories
+        self.pdf_url = pdf_url
+
+    def __repr__(self) -> str:
+        return f"AtomEntry(entry_id={self.entry_id!r}, title={self.title!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AtomEntry, arxiv.Result)):
+            return self.entry_id == other.entry_id
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self.entry_id)
+
+    def get_short_id(self) -> str:
+        """返回带版本号的短ID，例如 2107.05580v1"""
+        return self.entry_id.split("arxiv.org/abs/")[-1]
+
+    def download_pdf(self, dirpath: str = "./", filename: str = "", download_domain: str = "export.arxiv.org") -> str:
+        """下载PDF，行为与 arxiv.Result.download_pdf 一致"""
+        if not filename:
+            filename = f"{self.get_short_id().replace('/', '_')}.pdf"
+        path = os.path.join(dirpath, filename)
+        pdf_url = urlparse(self.pdf_url)._replace(netloc=download_domain).geturl()
+        written_path, _ = urlretrieve(pdf_url, path)
+        return written_path
+
+
+def _parse_datetime(text: Optional[str]) -> Optional[datetime.datetime]:
+    if not text:
+        return None
+    return datetime.datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+
+
+def _text(elem: ET.Element, tag: str) -> Optional[str]:
+    child = elem.find(tag)
+    return child.text if child is not None else None
+
+
+def _entry_from_element(elem: ET.Element) -> AtomEntry:
+    """将一个 <entry> 元素转换为 AtomEntry"""
+    pdf_url = None
+    for link in elem.iterfind(_ATOM + "link"):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href")
+            break
+
+    primary = elem.find(_ARXIV + "primary_category")
+    title = _text(elem, _ATOM + "title") or "0"
+
+    return AtomEntry(
+        entry_id=_text(elem, _ATOM + "id"),
+        updated=_parse_datetime(_text(elem, _ATOM + "updated")),
+        published=_parse_datetime(_text(elem, _ATOM + "published")),
+        title=" ".join(title.split()),
+        authors=[AtomAuthor(name.text or "") for name in elem.iterfind(f"{_ATOM}author/{_ATOM}name")],
+        summary=(_text(elem, _ATOM + "summary") or "").strip(),
+        comment=_text(elem, _ARXIV + "comment"),
+        journal_ref=_text(elem, _ARXIV + "journal_ref"),
+        doi=_text(elem, _ARXIV + "doi"),
+        primary_category=primary.get("term") if primary is not None else None,
+        categories=[cat.get("term") for cat in elem.iterfind(_ATOM + "category")],
+        pdf_url=pdf_url,
+    )
+
+
+def iter_atom_entries(source: Any, feed_info: Optional[Dict[str, int]] = None) -> Iterator[AtomEntry]:
+    """
+    增量解析Atom XML，逐条产出论文记录
+
+    每解析完一个 <entry> 就释放其元素树，内存占用与源大小无关
+
+    Args:
+        source: 文件路径或二进制文件对象
+        feed_info: 可选，解析到 opensearch:totalResults 时写入 feed_info["total_results"]
+
+    Yields:
+        AtomEntry 记录
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == _ENTRY:
+            if elem.find(_ATOM + "id") is None:
+                logger.warning("Skipping partial Atom entry without id")
+            else:
+                yield _entry_from_element(elem)
+            # 已处理的条目从根节点上移除，避免整棵树驻留内存
+            root.clear()
+        elif elem.tag == _TOTAL_RESULTS and feed_info is not None:
+            feed_info["total_results"] = int(elem.text or 0)
+
+
+class FastArxivClient:
+    """
+    arxiv.Client 的轻量替代实现
+
+    提供相同的 results(search) 分页接口，但返回 AtomEntry 而非 arxiv.Result
+    """
+
+    query_url_format = "https://export.arxiv.org/api/query?{}"
+
+    def __init__(self, page_size: int = 100, delay_seconds: float = 3.0, num_retries: int = 3,
+                 session: Optional[requests.Session] = None):
+        """
+        初始化客户端
+
+        Args:
+            page_size: 每页请求的条目数
+            delay_seconds: 相邻两次请求之间的最小间隔秒数
+            num_retries: 请求失败或遇到意外空页时的重试次数
+            session: 可选的 requests.Session（例如带共享节流的会话）
+        """
+        self.page_size = page_size
+        self.delay_seconds = delay_seconds
+        self.num_retries = num_retries
+        self._session = session or requests.Session()
+        self._last_request = None
+
+    def results(self, search: arxiv.Search, offset: int = 0) -> Iterator[AtomEntry]:
+        """
+        逐页抓取并产出搜索结果，直到达到 max_results 或没有更多结果
+
+        Args:
+            search: arxiv.Search 查询
+            offset: 跳过的前导结果数
+
+        Yields:
+            AtomEntry 记录
+        """
+        limit = search.max_results
+        yielded = 0
+        start = offset
+        total_results = None
+
+        while limit is None or yielded < limit:
+            page_size = self.page_size if limit is None else min(self.page_size, limit - yielded)
+            entries, total = self._fetch_page(search, start, page_size, first_page=total_results is None)
+            if total_results is None:
+                total_results = total
+                logger.info(f"Got first page: {len(entries)} of {total_results} total results")
+            if not entries:
+                return
+
+            for entry in entries:
+                yield entry
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+
+            start += len(entries)
+            if start >= total_results:
+                return
+
+    def _format_url(self, search: arxiv.Search, start: int, page_size: int) -> str:
+        url_args = {
+            "search_query": search.query,
+            "id_list": ",".join(search.id_list),
+            "sortBy": search.sort_by.value,
+            "sortOrder": search.sort_order.value,
+            "start": start,
+            "max_results": page_size,
+        }
+        return self.query_url_format.format(urlencode(url_args))
+
+    def _fetch_page(self, search: arxiv.Search, start: int, page_size: int, first_page: bool):
+        """请求并解析一页结果，失败时按 num_retries 重试"""
+        url = self._format_url(search, start, page_size)
+        for try_index in range(self.num_retries + 1):
+            try:
+                return self._try_fetch_page(url, first_page, try_index)
+            except (arxiv.HTTPError, arxiv.UnexpectedEmptyPageError, requests.exceptions.ConnectionError) as e:
+                if try_index >= self.num_retries:
+                    logger.debug(f"Giving up (try {try_index}): {e}")
+                    raise
+                logger.debug(f"Got error (try {try_index}): {e}")
+
+    def _try_fetch_page(self, url: str, first_page: bool, try_index: int):
+        if self._last_request is not None and self.delay_seconds > 0:
+            to_sleep = self.delay_seconds - (time.monotonic() - self._last_request)
+            if to_sleep > 0:
+                time.sleep(to_sleep)
+
+        logger.info(f"Requesting page (first: {first_page}, try: {try_index}): {url}")
+        resp = self._session.get(url, headers={"user-agent": "hermes4arxiv"})
+        self._last_request = time.monotonic()
+        if resp.status_code != requests.codes.OK:
+            raise arxiv.HTTPError(url, try_index, resp.status_code)
+
+        feed_info: Dict[str, int] = {}
+        entries = list(iter_atom_entries(io.BytesIO(resp.content), feed_info))
+        if not entries and not first_page:
+            raise arxiv.UnexpectedEmptyPageError(url, try_index, None)
+        return entries, feed_info.get("total_results", 0)
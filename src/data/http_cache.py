@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+arXiv API响应缓存模块
+将查询页面的原始响应压缩保存到磁盘，重复运行和重试时直接复用，
+过期后利用 ETag/Last-Modified 进行条件请求
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .rate_limiter import RateLimiter, RateLimitedSession
+from ..utils.logger import logger
+
+
+class HttpResponseCache:
+    """以规范化后的请求URL（查询条件 + 起始偏移）为键的磁盘缓存"""
+
+    def __init__(self, cache_dir: Path, ttl_seconds: int = 3600, replay_only: bool = False):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 服务器未提供验证信息时缓存的有效期（秒）
+            replay_only: 离线回放模式，只使用缓存，不发出任何网络请求
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.replay_only = replay_only
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """规范化URL：丢弃空参数并按参数名排序，保证同一查询得到同一个键"""
+        parsed = urlparse(url)
+        params = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if v != "")
+        return f"{parsed.netloc}{parsed.path}?{urlencode(params)}"
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(self.normalize_url(url).encode("utf-8")).hexdigest()
+        subdir = self.cache_dir / key[:2]
+        return subdir / f"{key}.json", subdir / f"{key}.xml.gz"
+
+    def load(self, url: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """
+        读取缓存
+
+        Returns:
+            (元数据, 原始响应体)，未命中时返回None
+        """
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = gzip.decompress(body_path.read_bytes())
+            return meta, body
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取API缓存失败，将忽略该缓存 ({url}): {e}")
+            return None
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """缓存是否仍在有效期内"""
+        return time.time() - meta.get("fetched_at", 0) < self.ttl_seconds
+
+    def store(self, url: str, resp: requests.Response) -> None:
+        """压缩保存响应体及其验证信息（ETag/Last-Modified）"""
+        meta_path, body_path = self._paths(url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": self.normalize_url(url),
+            "fetched_at": time.time(),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "content_type": resp.headers.get("Content-Type"),
+        }
+        # 先写临时文件再原子替换，避免并发分片读到写了一半的缓存
+        self._atomic_write(body_path, gzip.compress(resp.content))
+        self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def touch(self, url: str, meta: Dict[str, Any]) -> None:
+        """服务器返回304时刷新缓存时间"""
+        meta_path, _ = self._paths(url)
+        meta["fetched_at"] = time.time()
+        self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        # 分片抓取的多个线程可能同时写同一个URL的缓存，临时文件名同时区分进程和线程
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
+class CachedSession(RateLimitedSession):
+    """
+    带响应缓存的 requests.Session
+
+    命中缓存时不经过节流器；只有真正发出的网络请求才占用请求间隔
+    """
+
+    def __init__(self, cache: HttpResponseCache, limiter: Optional[RateLimiter] = None):
+        super().__init__(limiter or RateLimiter(0))
+        self.cache = cache
+
+    def request(self, method, url, *args, **kwargs):
+        if method.upper() != "GET":
+            return super().request(method, url, *args, **kwargs)
+
+        cached = self.cache.load(url)
+        if self.cache.replay_only:
+            if cached is None:
+                raise requests.exceptions.ConnectionError(f"离线回放模式下未找到缓存的响应: {url}")
+            logger.info(f"回放缓存的API响应: {url}")
+            return self._build_response(url, *cached)
+
+        if cached is not None and self.cache.is_fresh(cached[0]):
+            logger.info(f"命中API缓存: {url}")
+            return self._build_response(url, *cached)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached is not None:
+            meta = cached[0]
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = super().request(method, url, *args, headers=headers, **kwargs)
+
+        if resp.status_code == requests.codes.not_modified and cached is not None:
+            logger.info(f"API缓存经服务器验证仍有效: {url}")
+            self.cache.touch(url, cached[0])
+            return self._build_response(url, *cached)
+
+        # 只缓存包含条目的成功响应；意外的空页需要留给客户端重试
+        if resp.status_code == requests.codes.ok and b"<entry>" in resp.content:
+            self.cache.store(url, resp)
+        return resp
+
+    @staticmethod
+    def _build_response(url: str, meta: Dict[str, Any], body: bytes) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = requests.codes.ok
+        resp._content = body
+        resp.url = url
+        resp.encoding = "utf-8"
+        resp.headers = CaseInsensitiveDict({"Content-Type": meta.get("content_type") or "application/atom+xml"})
+        return resp
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+关键词过滤模块
+把布尔检索式编译为按字段划分的多模式匹配器，在送入LLM之前过滤论文；
+所有检索词一次编译、每篇论文每个字段只切分和扫描一次，不再逐个关键词在全文上做子串查找
+
+检索式语法：
+    diffusion                     单个词（默认同时匹配标题和摘要）
+    "large language model"        短语，词之间可以是任意空白或标点
+    reinforce*                    前缀匹配
+    title:agent  abstract:"in-context learning"  author:hinton
+                                  只匹配指定字段（title / abstract / author）
+    A AND B, A OR B, NOT A, (...)
+                                  布尔运算，运算符须大写；相邻的条件之间默认是 AND，
+                                  优先级 NOT > AND > OR
+
+匹配不区分大小写，按整词匹配（"model" 不会匹配 "remodel" 或 "models"，需要时用 model*）；
+标点视为词之间的分隔，"in-context" 与 "in context" 等价
+"""
+
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .paper import Paper
+
+FIELDS = ("title", "abstract", "author")
+_DEFAULT_FIELDS = ("title", "abstract")
+
+_WORD_RE = re.compile(r"\w+")
+# 插入在两位作者的姓名之间，不会与任何词相等，保证短语不会跨越两位作者
+_AUTHOR_SEPARATOR = ""
+
+_TOKEN_RE = re.compile(
+    r'\s*(?:(?P<lparen>\()|(?P<rparen>\))|(?:(?P<field>[A-Za-z]+):)?(?:"(?P<phrase>[^"]*)"|(?P<word>[^\s()"]+)))'
+)
+_OPERATORS = ("AND", "OR", "NOT")
+
+
+class KeywordQueryError(ValueError):
+    """检索式语法错误"""
+
+
+class _Term(NamedTuple):
+    field: str
+    words: Tuple[str, ...]  # 小写后切分出的词，单个词或短语
+    prefix: bool            # 最后一个词是否为前缀匹配（以 * 结尾）
+
+
+class _Token(NamedTuple):
+    kind: str         # "(", ")", "op", "term"
+    value: object
+
+
+def _tokenize(query: str) -> List[_Token]:
+    tokens = []
+    pos = 0
+    query = query.rstrip()
+    while pos < len(query):
+        match = _TOKEN_RE.match(query, pos)
+        if not match or match.end() == pos:
+            raise KeywordQueryError(f"无法解析检索式（位置 {pos}）: {query!r}")
+        pos = match.end()
+        if match.group("lparen"):
+            tokens.append(_Token("(", None))
+        elif match.group("rparen"):
+            tokens.append(_Token(")", None))
+        else:
+            field = match.group("field")
+            phrase = match.group("phrase")
+            word = match.group("word")
+            if field is None and phrase is None and word in _OPERATORS:
+                tokens.append(_Token("op", word))
+                continue
+            if field is not None and field.lower() not in FIELDS:
+                raise KeywordQueryError(f"未知的字段 {field!r}，可用字段: {', '.join(FIELDS)}")
+            text = phrase if phrase is not None else word
+            words = tuple(_WORD_RE.findall(text.lower()))
+            if not words:
+                raise KeywordQueryError(f"空的检索词: {text!r}")
+            tokens.append(_Token("term", (field.lower() if field else None, words, text.endswith("*"))))
+    if not tokens:
+        raise KeywordQueryError("检索式为空")
+    return tokens
+
+
+class _Parser:
+    """递归下降解析，生成 ("or"|"and", [子节点]) / ("not", 子节点) / ("term", 检索词序号集合) 形式的语法树"""
+
+    def __init__(self, tokens: List[_Token], terms: List[_Term], term_ids: Dict[_Term, int]):
+        self.tokens = tokens
+        self.pos = 0
+        self.terms = terms
+        self.term_ids = term_ids
+
+    def parse(self):
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise KeywordQueryError(f"检索式中有多余的 {self.tokens[self.pos].value or self.tokens[self.pos].kind!r}")
+        return node
+
+    def _peek(self) -> Optional[_Token]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or(self):
+        children = [self._and()]
+        while self._peek() == _Token("op", "OR"):
+            self.pos += 1
+            children.append(self._and())
+        # 并列的检索词合并为一个节点，求值时只做一次集合判断（关键词列表展开后有数百个 OR 分支）
+        term_ids = frozenset(term_id for kind, value in children if kind == "term" for term_id in value)
+        others = [child for child in children if child[0] != "term"]
+        if term_ids:
+            others.append(("term", term_ids))
+        return others[0] if len(others) == 1 else ("or", others)
+
+    def _and(self):
+        children = [self._not()]
+        while True:
+            token = self._peek()
+            if token == _Token("op", "AND"):
+                self.pos += 1
+            elif token is None or token.kind == ")" or token == _Token("op", "OR"):
+                break
+            children.append(self._not())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def _not(self):
+        if self._peek() == _Token("op", "NOT"):
+            self.pos += 1
+            return ("not", self._not())
+        return self._atom()
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise KeywordQueryError("检索式不完整")
+        self.pos += 1
+        if token.kind == "(":
+            node = self._or()
+            if self._peek() is None or self._peek().kind != ")":
+                raise KeywordQueryError("括号不匹配")
+            self.pos += 1
+            return node
+        if token.kind != "term":
+            raise KeywordQueryError(f"此处需要检索词，实际为 {token.value or token.kind!r}")
+
+        field, words, prefix = token.value
+        ids = []
+        for target in (field,) if field else _DEFAULT_FIELDS:
+            term = _Term(target, words, prefix)
+            if term not in self.term_ids:
+                self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+            ids.append(self.term_ids[term])
+        return ("term", frozenset(ids))
+
+
+class _FieldMatcher:
+    """
+    单个字段上所有检索词的匹配器
+
+    文本切分为词后先与各检索词的首词做一次集合求交（C实现），只有首词出现的短语才回到词序列中核对后续的词，
+    每篇论文的开销与检索词数量基本无关
+    """
+
+    def __init__(self, terms: List[Tuple[int, _Term]]):
+        # 首词为完整单词的检索词，按首词索引
+        self.by_first_word: Dict[str, List[Tuple[int, _Term]]] = defaultdict(list)
+        # 单个词的前缀检索词，按前缀长度分组
+        self.by_prefix: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        for term_id, term in terms:
+            if len(term.words) == 1 and term.prefix:
+                stem = term.words[0]
+                self.by_prefix[len(stem)][stem].append(term_id)
+            else:
+                self.by_first_word[term.words[0]].append((term_id, term))
+        # 所有前缀共同长度的开头，先用它筛掉绝大多数不可能命中任何前缀的词
+        self.head_length = min(self.by_prefix, default=0)
+        self.prefix_heads = {stem[:self.head_length] for stems in self.by_prefix.values() for stem in stems}
+
+    def scan(self, tokens: List[str], matched: Set[int]) -> None:
+        """扫描词序列，把命中的检索词序号加入 matched"""
+        vocabulary = set(tokens)
+        for word in vocabulary.intersection(self.by_first_word):
+            for term_id, term in self.by_first_word[word]:
+                if len(term.words) == 1 or self._contains_phrase(tokens, term):
+                    matched.add(term_id)
+        if not self.by_prefix:
+            return
+        head_length, prefix_heads = self.head_length, self.prefix_heads
+        for token in vocabulary:
+            if token[:head_length] not in prefix_heads:
+                continue
+            for length, stems in self.by_prefix.items():
+                term_ids = stems.get(token[:length])
+                if term_ids:
+                    matched.update(term_ids)
+
+    @staticmethod
+    def _contains_phrase(tokens: List[str], term: _Term) -> bool:
+        words = term.words
+        last = len(words) - 1
+        start = 0
+        while True:
+            try:
+                i = tokens.index(words[0], start)
+            except ValueError:
+                return False
+            window = tokens[i:i + len(words)]
+            if len(window) == len(words) and all(window[k] == words[k] for k in range(1, last)):
+                tail = window[last]
+                if tail.startswith(words[last]) if term.prefix else tail == words[last]:
+                    return True
+            start = i + 1
+
+
+class KeywordFilter:
+    """编译后的布尔关键词过滤器"""
+
+    def __init__(self, query: str):
+        """
+        编译检索式
+
+        Args:
+            query: 检索式，语法见模块说明
+
+        Raises:
+            KeywordQueryError: 检索式语法错误
+        """
+        self.query = query
+        self._terms: List[_Term] = []
+        self._tree = _Parser(_tokenize(query), self._terms, {}).parse()
+
+        by_field: Dict[str, List[Tuple[int, _Term]]] = defaultdict(list)
+        for term_id, term in enumerate(self._terms):
+            by_field[term.field].append((term_id, term))
+        self._matchers = {field: _FieldMatcher(terms) for field, terms in by_field.items()}
+
+    @classmethod
+    def any_of(cls, keywords: Iterable[str]) -> "KeywordFilter":
+        """
+        由关键词列表构造过滤器：标题或摘要中出现任一关键词（按短语匹配）即通过
+
+        每个关键词的最后一个词按前缀匹配（"language model" 也匹配 "language models"），
+        保持旧的子串匹配对复数和词形变化的召回
+        """
+        phrases = [" ".join(kw.replace('"', " ").replace("*", " ").split()) for kw in keywords]
+        return cls(" OR ".join(f'"{phrase}*"' for phrase in phrases if phrase))
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """检索式用到的字段"""
+        return tuple(field for field in FIELDS if field in self._matchers)
+
+    def matches(self, paper: Paper) -> bool:
+        """论文是否满足检索式"""
+        matched: Set[int] = set()
+        for field, matcher in self._matchers.items():
+            matcher.scan(self._field_tokens(paper, field), matched)
+        return self._evaluate(self._tree, matched)
+
+    def filter(self, papers: Iterable[Paper]) -> Iterator[Paper]:
+        """惰性过滤论文（可用于论文流）"""
+        return (paper for paper in papers if self.matches(paper))
+
+    @staticmethod
+    def _field_tokens(paper: Paper, field: str) -> List[str]:
+        if field == "title":
+            return _WORD_RE.findall(paper.title.lower())
+        if field == "abstract":
+            return _WORD_RE.findall(paper.abstract.lower())
+        tokens = []
+        for author in paper.authors:
+            tokens.extend(_WORD_RE.findall(author.lower()))
+            tokens.append(_AUTHOR_SEPARATOR)
+        return tokens
+
+    def _evaluate(self, node, matched: Set[int]) -> bool:
+        kind, value = node
+        if kind == "term":
+            return not matched.isdisjoint(value)
+        if kind == "not":
+            return not self._evaluate(value, matched)
+        if kind == "and":
+            return all(self._evaluate(child, matched) for child in value)
+        return any(self._evaluate(child, matched) for child in value)
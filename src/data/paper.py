@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+论文记录模块
+抓取到的论文在进入流程时转换为紧凑的 Paper 记录，此后抓取、存储、分析和输出各层都使用同一个对象，
+分析过程中产生的评分、全文和分析结果直接附加在记录上
+"""
+
+import datetime
+import sys
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(slots=True, eq=False)
+class Paper:
+    """一篇论文（使用 __slots__，不为每个实例分配 __dict__）"""
+
+    paper_id: str                     # 带版本号的短ID，例如 2107.05580v1
+    entry_id: str
+    title: str
+    authors: Tuple[str, ...]
+    abstract: str
+    categories: Tuple[str, ...]
+    primary_category: Optional[str]
+    published: datetime.datetime
+    updated: Optional[datetime.datetime] = None
+    pdf_url: Optional[str] = None
+
+    # 以下字段在分析过程中逐步填充
+    stage1_score: float = 0.0
+    full_text: Optional[str] = None
+    analysis: Optional[str] = None
+    html_analysis: Optional[str] = None
+    # 沿用了旧版本分析结果时，记录旧版本的短ID
+    revised_from: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, result) -> "Paper":
+        """
+        由 arxiv.Result（或 atom_feed.AtomEntry）构造论文记录
+
+        类别字符串在大量论文间高度重复，统一驻留以共享同一个字符串对象
+        """
+        primary_category = getattr(result, "primary_category", None)
+        return cls(
+            paper_id=result.get_short_id(),
+            entry_id=result.entry_id,
+            title=result.title,
+            authors=tuple(author.name for author in (result.authors or ())),
+            abstract=result.summary,
+            categories=tuple(sys.intern(category) for category in result.categories),
+            primary_category=sys.intern(primary_category) if primary_category else None,
+            published=result.published,
+            updated=getattr(result, "updated", None),
+            pdf_url=getattr(result, "pdf_url", None),
+        )
+
+    def get_short_id(self) -> str:
+        """返回带版本号的短ID（与 arxiv.Result.get_short_id 相同）"""
+        return self.paper_id
+
+    @property
+    def abs_url(self) -> str:
+        """论文摘要页地址"""
+        return f"https://arxiv.org/abs/{self.paper_id}"
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+论文索引模块
+一次运行中抓取到的全部论文集中登记在 PaperRegistry 中，各阶段按ID、类别或提交日期直接查找，
+不再在论文列表上线性扫描或反复重建映射
+"""
+
+import datetime
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .paper import Paper
+from .paper_store import split_versioned_id
+
+
+class PaperRegistry:
+    """
+    运行期论文索引
+
+    主索引为带版本号的短ID；同一论文的不同版本共享一个基础ID，按基础ID查找时返回最新版本。
+    另外维护按类别和按提交日期（UTC）的二级索引。登记可以在抓取线程和分析线程中并发进行
+    """
+
+    def __init__(self, papers: Iterable[Paper] = ()):
+        self._by_id: Dict[str, Paper] = {}
+        self._by_base_id: Dict[str, Paper] = {}
+        self._by_category: Dict[str, List[Paper]] = defaultdict(list)
+        self._by_date: Dict[datetime.date, List[Paper]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self.extend(papers)
+
+    def add(self, paper: Paper) -> bool:
+        """
+        登记一篇论文
+
+        Returns:
+            是否为新登记的论文；相同版本已登记过时返回False
+        """
+        with self._lock:
+            if paper.paper_id in self._by_id:
+                return False
+            self._by_id[paper.paper_id] = paper
+
+            base_id, version = split_versioned_id(paper.paper_id)
+            current = self._by_base_id.get(base_id)
+            if current is None or split_versioned_id(current.paper_id)[1] < version:
+                self._by_base_id[base_id] = paper
+
+            for category in paper.categories:
+                self._by_category[category].append(paper)
+            if paper.published:
+                self._by_date[paper.published.astimezone(datetime.UTC).date()].append(paper)
+            return True
+
+    def extend(self, papers: Iterable[Paper]) -> int:
+        """登记多篇论文，返回新登记的数量"""
+        return sum(self.add(paper) for paper in papers)
+
+    def get(self, paper_id: str) -> Optional[Paper]:
+        """
+        按ID查找论文
+
+        Args:
+            paper_id: 带版本号的短ID，或不带版本号的基础ID（返回已登记的最新版本）
+        """
+        # 排名结果中的ID来自LLM输出，可能带空白或省略版本号
+        paper_id = paper_id.strip()
+        paper = self._by_id.get(paper_id)
+        if paper is None:
+            paper = self._by_base_id.get(paper_id)
+        return paper
+
+    def by_category(self, category: str) -> List[Paper]:
+        """某个类别（含交叉列出）下的论文，按登记顺序"""
+        return list(self._by_category.get(category, ()))
+
+    def by_date(self, date: datetime.date) -> List[Paper]:
+        """某一天（UTC）提交的论文，按登记顺序"""
+        return list(self._by_date.get(date, ()))
+
+    def category_counts(self) -> Dict[str, int]:
+        """各类别的论文数量"""
+        return {category: len(papers) for category, papers in self._by_category.items()}
+
+    def __contains__(self, paper_id: str) -> bool:
+        return self.get(paper_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Paper]:
+        return iter(list(self._by_id.values()))
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+论文持久化存储模块
+使用SQLite保存每次抓取到的论文及其各阶段分析结果，实现跨运行去重
+"""
+
+import datetime
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .paper import Paper
+from ..utils.logger import logger
+
+
+_VERSIONED_ID_RE = re.compile(r"^(?P<base>.+?)v(?P<version>\d+)$")
+
+
+def split_versioned_id(short_id: str) -> Tuple[str, int]:
+    """
+    将带版本号的短ID拆分为 (基础ID, 版本号)
+
+    Args:
+        short_id: 例如 "2401.00001v2" 或 "quant-ph/0201082v1"
+
+    Returns:
+        (基础ID, 版本号)，没有版本号时按第1版处理
+    """
+    match = _VERSIONED_ID_RE.match(short_id)
+    if not match:
+        return short_id, 1
+    return match.group("base"), int(match.group("version"))
+
+
+def _utc_now() -> str:
+    return datetime.datetime.now(datetime.UTC).isoformat()
+
+
+def _to_iso(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+class PaperStore:
+    """论文存储类，以 (论文ID, 版本号) 为主键"""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS papers (
+            paper_id TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            entry_id TEXT NOT NULL,
+            title TEXT,
+            summary TEXT,
+            authors TEXT,
+            categories TEXT,
+            primary_category TEXT,
+            published TEXT,
+            updated TEXT,
+            pdf_url TEXT,
+            fetched_at TEXT NOT NULL,
+            stage1_score REAL,
+            stage1_at TEXT,
+            analysis TEXT,
+            html_analysis TEXT,
+            analyzed_at TEXT,
+            PRIMARY KEY (paper_id, version)
+        );
+        CREATE TABLE IF NOT EXISTS fetch_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化存储，必要时创建数据库文件和表结构
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 分析阶段在线程池中并行写入，使用同一连接并以锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self._SCHEMA)
+        logger.info(f"论文存储已打开: {self.db_path}")
+
+    def save_papers(self, papers: Iterable[Paper]) -> int:
+        """
+        写入（或更新）抓取到的论文元数据，不会覆盖已有的分析结果
+
+        Args:
+            papers: 论文列表
+
+        Returns:
+            写入的论文数量
+        """
+        now = _utc_now()
+        rows = []
+        for paper in papers:
+            paper_id, version = split_versioned_id(paper.paper_id)
+            rows.append((
+                paper_id,
+                version,
+                paper.entry_id,
+                paper.title,
+                paper.abstract,
+                json.dumps(list(paper.authors), ensure_ascii=False),
+                json.dumps(list(paper.categories), ensure_ascii=False),
+                paper.primary_category,
+                _to_iso(paper.published),
+                _to_iso(paper.updated),
+                paper.pdf_url,
+                now,
+            ))
+
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO papers (
+                    paper_id, version, entry_id, title, summary, authors, categories,
+                    primary_category, published, updated, pdf_url, fetched_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(paper_id, version) DO UPDATE SET
+                    entry_id = excluded.entry_id,
+                    title = excluded.title,
+                    summary = excluded.summary,
+                    authors = excluded.authors,
+                    categories = excluded.categories,
+                    primary_category = excluded.primary_category,
+                    published = excluded.published,
+                    updated = excluded.updated,
+                    pdf_url = excluded.pdf_url,
+                    fetched_at = excluded.fetched_at
+                """,
+                rows,
+            )
+        # 流式抓取时逐篇写入，单篇写入只记调试日志
+        if len(rows) > 1:
+            logger.info(f"已将 {len(rows)} 篇论文写入存储")
+        else:
+            logger.debug(f"已将论文 {rows[0][0]}v{rows[0][1]} 写入存储")
+        return len(rows)
+
+    def get_processed_ids(self, short_ids: Iterable[str], promotion_threshold: Optional[float] = None) -> Set[str]:
+        """
+        查询在之前的运行中已处理完毕、无需再分析的论文：已完成深度分析，
+        或第一阶段分数低于晋级分数线（不会进入第二阶段）
+
+        第一阶段已晋级但深度分析未完成（运行中途失败、因预算跳过等）的论文不算已处理，
+        见 get_pending_stage1_scores
+
+        Args:
+            short_ids: 带版本号的短ID列表
+            promotion_threshold: 第二阶段的晋级分数线，None 表示只把完成深度分析的论文视为已处理
+
+        Returns:
+            已处理过的短ID集合（版本号必须一致）
+        """
+        processed = set()
+        for short_id, stage1_score, analyzed in self._prior_results(short_ids):
+            below_threshold = (promotion_threshold is not None and stage1_score is not None
+                               and stage1_score < promotion_threshold)
+            if analyzed or below_threshold:
+                processed.add(short_id)
+        return processed
+
+    def get_pending_stage1_scores(self, short_ids: Iterable[str], promotion_threshold: float) -> Dict[str, float]:
+        """
+        查询第一阶段已达到晋级分数线、但尚未完成深度分析的论文，这些论文可以直接进入第二阶段
+
+        Args:
+            short_ids: 带版本号的短ID列表
+            promotion_threshold: 第二阶段的晋级分数线
+
+        Returns:
+            短ID到已保存的第一阶段分数的映射
+        """
+        return {
+            short_id: stage1_score
+            for short_id, stage1_score, analyzed in self._prior_results(short_ids)
+            if not analyzed and stage1_score is not None and stage1_score >= promotion_threshold
+        }
+
+    def _prior_results(self, short_ids: Iterable[str]) -> List[Tuple[str, Optional[float], bool]]:
+        """读取论文在之前运行中的 (短ID, 第一阶段分数, 是否已完成深度分析)，只返回存储中有记录的论文"""
+        results = []
+        with self._lock:
+            for short_id in short_ids:
+                paper_id, version = split_versioned_id(short_id)
+                row = self._conn.execute(
+                    """
+                    SELECT stage1_score, stage1_at, analyzed_at FROM papers
+                    WHERE paper_id = ? AND version = ?
+                    """,
+                    (paper_id, version),
+                ).fetchone()
+                if row:
+                    score = row["stage1_score"] if row["stage1_at"] is not None else None
+                    results.append((short_id, score, row["analyzed_at"] is not None))
+        return results
+
+    def save_stage1_scores(self, scores: Dict[str, float]) -> None:
+        """
+        保存第一阶段排名分数
+
+        Args:
+            scores: 短ID到分数的映射，只应包含确实拿到评分的论文
+        """
+        if not scores:
+            return
+        now = _utc_now()
+        rows = []
+        for short_id, score in scores.items():
+            paper_id, version = split_versioned_id(short_id)
+            rows.append((score, now, paper_id, version))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE papers SET stage1_score = ?, stage1_at = ? WHERE paper_id = ? AND version = ?",
+                rows,
+            )
+
+    def save_analysis(self, paper: Paper) -> None:
+        """
+        保存单篇论文的深度分析结果
+
+        Args:
+            paper: 已附加 analysis/html_analysis 的论文
+        """
+        analysis = paper.analysis
+        if not analysis:
+            return
+        html_analysis = paper.html_analysis
+        paper_id, version = split_versioned_id(paper.paper_id)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE papers SET analysis = ?, html_analysis = ?, analyzed_at = ?
+                WHERE paper_id = ? AND version = ?
+                """,
+                (analysis, html_analysis, _utc_now(), paper_id, version),
+            )
+
+    def get_paper(self, short_id: str) -> Dict[str, Any]:
+        """
+        读取单篇论文的存储记录
+
+        Args:
+            short_id: 带版本号的短ID
+
+        Returns:
+            记录字典，不存在时返回空字典
+        """
+        paper_id, version = split_versioned_id(short_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM papers WHERE paper_id = ? AND version = ?",
+                (paper_id, version),
+            ).fetchone()
+        if not row:
+            return {}
+        record = dict(row)
+        record["authors"] = json.loads(record["authors"] or "[]")
+        record["categories"] = json.loads(record["categories"] or "[]")
+        return record
+
+    def get_previous_analysis(self, short_id: str) -> Dict[str, Any]:
+        """
+        读取同一论文更早版本中最新的分析结果，以及实际产生该结果的版本
+
+        修订版沿用旧分析时会把同一份结果写入新版本，这里回溯到最早带有该结果的版本，
+        使后续修订始终与真正被分析过的文本比较，小改动不会逐版累积
+
+        Args:
+            short_id: 带版本号的短ID
+
+        Returns:
+            记录字典（含 version、title、summary、analysis、html_analysis），没有时返回空字典
+        """
+        paper_id, version = split_versioned_id(short_id)
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT version, title, summary, analysis, html_analysis FROM papers
+                WHERE paper_id = ? AND version < ? AND analysis IS NOT NULL
+                ORDER BY version DESC LIMIT 1
+                """,
+                (paper_id, version),
+            ).fetchone()
+            if not row:
+                return {}
+            origin = self._conn.execute(
+                """
+                SELECT version, title, summary FROM papers
+                WHERE paper_id = ? AND analysis = ?
+                ORDER BY version LIMIT 1
+                """,
+                (paper_id, row["analysis"]),
+            ).fetchone()
+        return {**dict(row), **dict(origin)}
+
+    def get_state(self, key: str) -> Optional[Any]:
+        """
+        读取抓取状态（如增量抓取的水位线）
+
+        Args:
+            key: 状态键
+
+        Returns:
+            反序列化后的状态值，不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM fetch_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else None
+
+    def set_state(self, key: str, value: Any) -> None:
+        """
+        保存抓取状态
+
+        Args:
+            key: 状态键
+            value: 可JSON序列化的状态值
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO fetch_state (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+                """,
+                (key, json.dumps(value, ensure_ascii=False), _utc_now()),
+            )
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+PDF缓存模块
+以带版本号的arXiv短ID为键（同一版本内容不变）缓存下载的PDF，
+按最近使用时间淘汰以控制总大小，并在线程之间共享正在进行的下载
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+from ..utils.logger import logger
+
+
+class PdfCache:
+    """容量受限的PDF缓存，LRU淘汰"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self._pins: Dict[Path, int] = {}
+
+    def path_for(self, short_id: str) -> Path:
+        """返回论文PDF在缓存中的路径"""
+        return self.cache_dir / f"{short_id.replace('/', '_')}.pdf"
+
+    @contextmanager
+    def lease(self, short_id: str, download_fn: Callable[[Path], Optional[Path]]) -> Iterator[Optional[Path]]:
+        """
+        获取论文PDF（未缓存时下载），并在 with 块内锁定该文件，保证使用期间不会被淘汰
+
+        同一篇论文同时只会下载一次，其他线程等待这次下载完成后直接复用结果；
+        路径只在 with 块内有效，离开后文件可能随时被淘汰
+
+        Args:
+            short_id: 带版本号的短ID
+            download_fn: 下载函数，接收目标路径并原子写入，成功时返回该路径，失败返回None
+
+        Yields:
+            缓存中的PDF路径，下载失败时为None
+        """
+        pdf_path = self._acquire(short_id, download_fn)
+        try:
+            yield pdf_path
+        finally:
+            if pdf_path:
+                self._unpin(pdf_path)
+
+    def _acquire(self, short_id: str, download_fn: Callable[[Path], Optional[Path]]) -> Optional[Path]:
+        pdf_path = self.path_for(short_id)
+
+        with self._lock:
+            if pdf_path.exists():
+                self._pin(pdf_path)
+                self._touch(pdf_path)
+                logger.info(f"PDF缓存命中: {pdf_path}")
+                return pdf_path
+            event = self._inflight.get(short_id)
+            is_owner = event is None
+            if is_owner:
+                event = threading.Event()
+                self._inflight[short_id] = event
+
+        if not is_owner:
+            logger.info(f"等待其他线程完成 {short_id} 的PDF下载...")
+            event.wait()
+            with self._lock:
+                if pdf_path.exists():
+                    self._pin(pdf_path)
+                    self._touch(pdf_path)
+                    return pdf_path
+            return None
+
+        # download_fn 负责原子写入（先写 .part 再改名），其他线程不会读到不完整的PDF，
+        # 失败时留下的 .part 文件可供下次断点续传
+        try:
+            result = download_fn(pdf_path)
+            with self._lock:
+                downloaded = bool(result) and pdf_path.exists()
+                if downloaded:
+                    self._pin(pdf_path)
+        finally:
+            with self._lock:
+                del self._inflight[short_id]
+            event.set()
+
+        if not downloaded:
+            return None
+        self.evict()
+        return pdf_path
+
+    def store(self, short_id: str, data: bytes) -> Path:
+        """
+        将已下载到内存的PDF写入缓存（先写临时文件再原子改名）
+
+        Args:
+            short_id: 带版本号的短ID
+            data: PDF文件内容
+
+        Returns:
+            缓存中的PDF路径
+        """
+        pdf_path = self.path_for(short_id)
+        tmp_path = pdf_path.with_name(f"{pdf_path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, pdf_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self.evict()
+        return pdf_path
+
+    def evict(self) -> int:
+        """
+        按最近使用时间淘汰文件，直到缓存总大小不超过上限；使用中的文件不会被淘汰
+
+        Returns:
+            释放的字节数
+        """
+        with self._lock:
+            files = []
+            total = 0
+            for path in self.cache_dir.glob("*.pdf"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            freed = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if self._pins.get(path):
+                    continue
+                path.unlink(missing_ok=True)
+                total -= size
+                freed += size
+                logger.info(f"PDF缓存已满，淘汰: {path.name}")
+        return freed
+
+    def _pin(self, path: Path) -> None:
+        self._pins[path] = self._pins.get(path, 0) + 1
+
+    def _unpin(self, path: Path) -> None:
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+            else:
+                self._pins.pop(path, None)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        # 以修改时间记录最近使用时间，供LRU淘汰使用
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+PDF下载模块
+使用共享的 keep-alive 连接池下载论文PDF，支持失败重试、断点续传和大小上限，
+下载完成后才原子改名为目标文件
+"""
+
+import os
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .rate_limiter import RateLimiter, RateLimitedSession
+from ..utils.logger import logger
+
+
+class PdfTooLargeError(Exception):
+    """PDF超过允许的大小上限"""
+
+
+class PdfDownloader:
+    """可复用连接的PDF下载器，替代 arxiv.Result.download_pdf"""
+
+    download_domain = "export.arxiv.org"
+    user_agent = "hermes4arxiv"
+
+    def __init__(self, session: Optional[requests.Session] = None, num_retries: int = 3,
+                 backoff_seconds: float = 2.0, max_bytes: int = 100 * 1024 * 1024,
+                 pool_size: int = 10, timeout: float = 60.0, chunk_size: int = 64 * 1024,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        初始化下载器
+
+        Args:
+            session: 可选的 requests.Session，未提供时新建（提供 limiter 时新建的会话经过该节流器）
+            num_retries: 失败后的重试次数
+            backoff_seconds: 首次重试前的等待秒数，之后每次翻倍
+            max_bytes: 单个PDF的大小上限（字节）
+            pool_size: 连接池大小，应不小于并发下载的线程数
+            timeout: 连接和读取超时秒数
+            chunk_size: 流式写入的块大小
+            limiter: 可选的共享节流器，每次请求（包括重试和续传）前获取令牌
+        """
+        self.num_retries = num_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        self.session = session or (RateLimitedSession(limiter) if limiter else requests.Session())
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def pdf_url_for(cls, paper) -> Optional[str]:
+        """返回论文PDF的下载地址（与 arxiv.Result.download_pdf 一样改用 export 镜像）"""
+        pdf_url = getattr(paper, "pdf_url", None)
+        if not pdf_url:
+            entry_id = getattr(paper, "entry_id", None)
+            if not entry_id:
+                return None
+            pdf_url = entry_id.replace("/abs/", "/pdf/")
+        return urlparse(pdf_url)._replace(netloc=cls.download_domain).geturl()
+
+    def download(self, url: str, dest: Path) -> Path:
+        """
+        下载文件到 dest
+
+        数据先写入同目录下的 .part 文件，完成后原子改名；失败时保留 .part，
+        下次下载同一目标时通过 Range 请求从断点继续
+
+        Args:
+            url: 下载地址
+            dest: 目标路径
+
+        Returns:
+            目标路径
+
+        Raises:
+            PdfTooLargeError: 文件超过大小上限
+            requests.exceptions.RequestException: 重试耗尽后仍然失败
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part_path = dest.with_name(dest.name + ".part")
+
+        try:
+            self._download_with_retries(url, _PartFile(part_path))
+        except PdfTooLargeError:
+            part_path.unlink(missing_ok=True)
+            raise
+        os.replace(part_path, dest)
+        return dest
+
+    def download_to_buffer(self, url: str, max_memory_bytes: int) -> "PdfBuffer":
+        """
+        将PDF下载到内存缓冲区，不在存储目录中留下文件
+
+        超过 max_memory_bytes 时溢出到系统临时目录中的临时文件，关闭缓冲区时删除；
+        重试时同样通过 Range 请求从已收到的位置继续
+
+        Args:
+            url: 下载地址
+            max_memory_bytes: 内存缓冲区上限（字节）
+
+        Returns:
+            PdfBuffer，调用方负责关闭（可用 with 语句）
+
+        Raises:
+            PdfTooLargeError: 文件超过大小上限
+            requests.exceptions.RequestException: 重试耗尽后仍然失败
+        """
+        buffer = PdfBuffer(max_memory_bytes)
+        try:
+            self._download_with_retries(url, buffer)
+        except BaseException:
+            buffer.close()
+            raise
+        return buffer
+
+    def _download_with_retries(self, url: str, sink) -> None:
+        for try_index in range(self.num_retries + 1):
+            try:
+                self._try_download(url, sink)
+                return
+            except requests.exceptions.RequestException as e:
+                if try_index >= self.num_retries or not self._is_retryable(e):
+                    logger.warning(f"下载 {url} 失败，已重试 {try_index} 次: {e}")
+                    raise
+                wait = self._retry_after(e) or self.backoff_seconds * (2 ** try_index)
+                logger.info(f"下载 {url} 出错 (try {try_index}): {e}，{wait:.1f}s 后重试")
+                time.sleep(wait)
+
+    def _try_download(self, url: str, sink) -> None:
+        offset = sink.size
+        headers = {"user-agent": self.user_agent}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+            if resp.status_code == requests.codes.requested_range_not_satisfiable:
+                # 断点数据与服务器上的文件不一致，丢弃后重新下载
+                sink.reset()
+                raise requests.exceptions.HTTPError(f"Range not satisfiable for {url}", response=resp)
+            resp.raise_for_status()
+
+            if resp.status_code == requests.codes.partial_content:
+                logger.info(f"从 {offset} 字节处续传: {url}")
+            else:
+                offset = 0
+                sink.reset()
+
+            content_length = resp.headers.get("Content-Length")
+            if content_length and offset + int(content_length) > self.max_bytes:
+                raise PdfTooLargeError(f"{url} 大小 {offset + int(content_length)} 字节，超过上限 {self.max_bytes} 字节")
+
+            written = offset
+            with sink.open() as f:
+                for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        raise PdfTooLargeError(f"{url} 超过大小上限 {self.max_bytes} 字节")
+                    f.write(chunk)
+
+            if content_length and written != offset + int(content_length):
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"{url} 连接提前关闭: 收到 {written} 字节，应为 {offset + int(content_length)} 字节"
+                )
+
+    @staticmethod
+    def _is_retryable(error: requests.exceptions.RequestException) -> bool:
+        """网络错误、超时、429 和 5xx 值得重试；404 等客户端错误直接放弃"""
+        resp = getattr(error, "response", None)
+        if resp is None:
+            return True
+        return resp.status_code in (408, 416, 429) or resp.status_code >= 500
+
+    @staticmethod
+    def _retry_after(error: requests.exceptions.RequestException) -> Optional[float]:
+        """429/503 响应中服务器要求的等待秒数"""
+        resp = getattr(error, "response", None)
+        if resp is None:
+            return None
+        value = resp.headers.get("Retry-After")
+        if value and value.isdigit():
+            return float(value)
+        return None
+
+
+class _PartFile:
+    """下载中的 .part 文件，追加写入以支持断点续传"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def open(self):
+        return open(self.path, "ab")
+
+
+class PdfBuffer:
+    """
+    下载到内存的PDF
+
+    数据超过 max_memory_bytes 时整体溢出到系统临时目录中的临时文件；
+    close() 时删除该临时文件，存储目录中不会留下任何PDF
+    """
+
+    def __init__(self, max_memory_bytes: int):
+        self.max_memory_bytes = max_memory_bytes
+        self._memory = bytearray()
+        self._file = None
+        self.path: Optional[Path] = None
+
+    @property
+    def size(self) -> int:
+        if self._file is not None:
+            return self._file.tell()
+        return len(self._memory)
+
+    @property
+    def source(self) -> Union[bytes, Path]:
+        """未溢出时为PDF内容，溢出后为临时文件路径"""
+        if self._file is not None:
+            self._file.flush()
+            return self.path
+        return bytes(self._memory)
+
+    def reset(self) -> None:
+        self._memory = bytearray()
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+
+    def open(self):
+        return nullcontext(self)
+
+    def write(self, chunk: bytes) -> None:
+        if self._file is None and len(self._memory) + len(chunk) > self.max_memory_bytes:
+            self._file = tempfile.NamedTemporaryFile(prefix="arxiv-", suffix=".pdf", delete=False)
+            self.path = Path(self._file.name)
+            self._file.write(self._memory)
+            self._memory = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._memory += chunk
+
+    def close(self) -> None:
+        """释放内存并删除溢出的临时文件"""
+        self._memory = bytearray()
+        if self._file is not None:
+            self._file.close()
+            self.path.unlink(missing_ok=True)
+            self._file = None
+
+    def __enter__(self) -> "PdfBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+PDF全文提取模块
+在隔离的工作进程中运行 PyMuPDF（不占用分析线程的GIL，并限制单次提取的耗时和内存），
+大文件按页分段并行提取，并在一次线性遍历中完成拼接和空白归一化；可设置字符预算，读够后不再解析后续页面
+"""
+
+import concurrent.futures
+import multiprocessing
+import queue
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, List, NamedTuple, Optional, Union
+
+import fitz  # PyMuPDF
+
+from .sections import format_sections, split_sections
+from ..utils.logger import logger
+
+try:
+    import resource
+except ImportError:  # Windows 上无法限制工作进程的内存
+    resource = None
+
+PdfSource = Union[str, bytes]
+
+# 提取结果的格式版本，提取或归一化逻辑变化时递增，使全文缓存中的旧结果失效
+EXTRACTOR_VERSION = "1"
+
+
+def normalize_text(pages: Iterable[str]) -> str:
+    """
+    拼接各页文本并将连续空白压缩为单个空格
+
+    只遍历一次输入，避免逐页 += 拼接的平方级复制以及拼接后再 split/join 的额外整份拷贝
+    """
+    return " ".join(word for page in pages for word in page.split())
+
+
+def _open(source: PdfSource) -> fitz.Document:
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+class ExtractionResult(NamedTuple):
+    """提取结果及提前停止时跳过的部分"""
+    text: str
+    pages_read: int
+    page_count: int
+    chars_read: int
+
+    @property
+    def skipped_pages(self) -> int:
+        return self.page_count - self.pages_read
+
+    @property
+    def estimated_skipped_chars(self) -> int:
+        """按已读页面的平均字符数估算跳过的字符数"""
+        if not self.pages_read:
+            return 0
+        return self.chars_read * self.skipped_pages // self.pages_read
+
+
+class PdfExtractionError(Exception):
+    """提取超时、超出内存上限或工作进程崩溃"""
+
+
+def _page_count(source: PdfSource) -> int:
+    with _open(source) as doc:
+        return doc.page_count
+
+
+def _extract_pages(source: PdfSource, start: int, stop: int) -> List[str]:
+    """提取 [start, stop) 页的文本（在工作进程中运行）"""
+    with _open(source) as doc:
+        return [doc[i].get_text() for i in range(start, min(stop, doc.page_count))]
+
+
+def _assemble(pages: Iterable[str], structured: bool) -> str:
+    """拼接各页文本：普通模式压缩为单行，结构化模式按章节输出"""
+    if structured:
+        return format_sections(split_sections(pages))
+    return normalize_text(pages)
+
+
+def _extract_all(source: PdfSource, structured: bool = False, max_chars: int = 0) -> ExtractionResult:
+    """
+    逐页提取文档并拼接（在工作进程中运行）
+
+    max_chars 大于0时，累计的原始字符数达到该值后不再读取后续页面
+    """
+    pages = []
+    chars = 0
+    with _open(source) as doc:
+        page_count = doc.page_count
+        for page in doc:
+            text = page.get_text()
+            pages.append(text)
+            chars += len(text)
+            if max_chars and chars >= max_chars:
+                break
+    return ExtractionResult(_assemble(pages, structured), len(pages), page_count, chars)
+
+
+def _worker_main(conn, memory_limit: int) -> None:
+    """工作进程主循环：逐个执行父进程发来的任务"""
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args = task
+        try:
+            reply = (True, fn(*args))
+        except MemoryError:
+            # 内存耗尽后进程状态不可信，通知父进程后退出，由父进程换一个新的工作进程
+            try:
+                conn.send((False, PdfExtractionError("PDF提取超出内存上限")))
+            except (MemoryError, OSError):
+                pass
+            return
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # 异常对象无法序列化时只回传描述
+            conn.send((False, RuntimeError(f"{reply[1]!r} ({e})")))
+
+
+class _Worker:
+    """一个提取工作进程及其管道"""
+
+    def __init__(self, context, memory_limit: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, fn: Callable, args: tuple, timeout: Optional[float]) -> Any:
+        """
+        在工作进程中执行任务
+
+        Raises:
+            PdfExtractionError: 超时或工作进程退出（崩溃、超出内存上限），此后该工作进程不可再用
+        """
+        try:
+            self.conn.send((fn, args))
+            if not self.conn.poll(timeout):
+                raise PdfExtractionError("PDF提取超时")
+            ok, value = self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            raise PdfExtractionError(f"PDF提取进程异常退出 (exitcode={self.process.exitcode})")
+        if not ok:
+            raise value
+        return value
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class _IsolatedPool:
+    """
+    可以强制终止单个任务的进程池
+
+    每个工作进程由父进程中的一个调度线程驱动，一次只执行一个任务；任务超时或进程崩溃时只杀掉该进程，
+    由调度线程换上新的进程，其他任务不受影响（ProcessPoolExecutor 无法取消正在运行的任务，
+    一个进程崩溃还会导致整个进程池不可用）
+    """
+
+    def __init__(self, max_workers: int, timeout: Optional[float], memory_limit: int):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.recycled_workers = 0
+        # 多个调度线程都会更换进程并累加 recycled_workers
+        self._lock = threading.Lock()
+        # 主进程中有多个线程，使用 spawn 避免 fork 继承到被其他线程持有的锁
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks: "queue.Queue" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._dispatch, name=f"pdf-extract-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, deadline: Optional[float] = None) -> concurrent.futures.Future:
+        """
+        提交任务
+
+        Args:
+            deadline: 任务所属提取的截止时间（time.monotonic()），任务最多运行到该时间；
+                为None时按 timeout 限制单个任务
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._tasks.put((future, fn, args, deadline))
+        return future
+
+    def _dispatch(self) -> None:
+        worker = None
+        while True:
+            item = self._tasks.get()
+            if item is None:
+                break
+            future, fn, args, deadline = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            timeout = self.timeout
+            if deadline is not None:
+                # 同一份PDF的各个任务共享一个截止时间，排队期间已经过期的任务不再执行
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    future.set_exception(PdfExtractionError("PDF提取超时"))
+                    continue
+            if worker is None:
+                worker = _Worker(self._context, self.memory_limit)
+            try:
+                future.set_result(worker.run(fn, args, timeout))
+            except PdfExtractionError as e:
+                worker.kill()
+                worker = None
+                with self._lock:
+                    self.recycled_workers += 1
+                logger.warning(f"{e}，已终止并更换提取进程")
+                future.set_exception(e)
+            except Exception as e:
+                future.set_exception(e)
+        if worker is not None:
+            worker.stop()
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            self._tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+
+
+class PdfTextExtractor:
+    """
+    PDF文本提取器
+
+    max_workers 大于0时在隔离的工作进程中提取，超时、超出内存上限或崩溃的提取会抛出 PdfExtractionError；
+    为0时在调用线程中直接提取，不受超时和内存上限约束
+    """
+
+    def __init__(self, max_workers: int = 2, pages_per_task: int = 32, parallel_min_pages: int = 64,
+                 structured: bool = False, max_chars: int = 0, timeout: Optional[float] = 120.0,
+                 memory_limit: int = 2048 * 1024 * 1024):
+        """
+        初始化提取器
+
+        Args:
+            max_workers: 提取进程数，0 表示不使用进程池
+            pages_per_task: 按页并行时每个任务提取的页数
+            parallel_min_pages: 页数达到该值的文档才拆分为多个任务并行提取
+            structured: 是否按章节输出（章节标题单独成行），供按章节分配token预算
+            max_chars: 字符预算，读到的原始字符数达到该值后停止读取后续页面；0 表示读取全文
+            timeout: 单份PDF提取的最长耗时（秒），包括排队、读取页数和各页段任务，
+                到期后取消尚未开始的任务并终止仍在运行的工作进程；None 表示不限制
+            memory_limit: 每个工作进程的地址空间上限（字节），0 表示不限制
+        """
+        self.max_workers = max(0, max_workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.parallel_min_pages = parallel_min_pages
+        self.structured = structured
+        self.max_chars = max(0, max_chars)
+        self.timeout = timeout
+        self.memory_limit = max(0, memory_limit)
+        # 不同模式和预算下的输出不同，分别缓存
+        self.version = EXTRACTOR_VERSION
+        if structured:
+            self.version += "-sections"
+        if self.max_chars:
+            self.version += f"-max{self.max_chars}"
+        self.recycled_workers = 0
+        self._pool: Optional[_IsolatedPool] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> _IsolatedPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = _IsolatedPool(self.max_workers, self.timeout, self.memory_limit)
+            return self._pool
+
+    def extract(self, pdf_path: Path) -> ExtractionResult:
+        """提取PDF文件的全文"""
+        return self._extract(str(pdf_path))
+
+    def extract_bytes(self, pdf_bytes: bytes) -> ExtractionResult:
+        """提取内存中PDF的全文"""
+        return self._extract(pdf_bytes)
+
+    def _extract(self, source: PdfSource) -> ExtractionResult:
+        if not self.max_workers:
+            return _extract_all(source, self.structured, self.max_chars)
+
+        pool = self._get_pool()
+        # 整份PDF的所有任务共用一个截止时间
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        # 打开文档本身也可能卡住，页数同样在工作进程中读取
+        page_count = self._result(pool.submit(_page_count, source, deadline=deadline), deadline)
+        if page_count < self.parallel_min_pages:
+            future = pool.submit(_extract_all, source, self.structured, self.max_chars, deadline=deadline)
+            return self._result(future, deadline)
+
+        if isinstance(source, bytes):
+            # 多个任务各自打开文档，先落盘避免把整份PDF重复传给每个工作进程
+            with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+                tmp.write(source)
+                tmp.flush()
+                return self._extract_parallel(pool, tmp.name, page_count, deadline)
+        return self._extract_parallel(pool, source, page_count, deadline)
+
+    def _result(self, future: concurrent.futures.Future, deadline: Optional[float]) -> Any:
+        """
+        等待任务结果，最多等到截止时间
+
+        Raises:
+            PdfExtractionError: 到期仍未完成；排队中的任务被取消，运行中的任务由调度线程在同一截止时间终止
+        """
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            return future.result(timeout=remaining)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise PdfExtractionError(f"PDF提取超过 {self.timeout}s")
+
+    def _extract_parallel(self, pool: _IsolatedPool, path: str, page_count: int,
+                          deadline: Optional[float]) -> ExtractionResult:
+        """
+        按页段并行提取；任务按页序滚动提交，达到字符预算、某一段失败或到达截止时间后取消尚未开始的页段
+        """
+        starts = iter(range(0, page_count, self.pages_per_task))
+        pending: Deque[concurrent.futures.Future] = deque()
+        pages = []
+        chars = 0
+
+        def submit_next() -> None:
+            start = next(starts, None)
+            if start is not None:
+                pending.append(pool.submit(_extract_pages, path, start, start + self.pages_per_task, deadline=deadline))
+
+        for _ in range(self.max_workers * 2):
+            submit_next()
+
+        # 按页序收集各段结果，最后一次性拼接
+        try:
+            while pending:
+                for text in self._result(pending.popleft(), deadline):
+                    pages.append(text)
+                    chars += len(text)
+                    if self.max_chars and chars >= self.max_chars:
+                        return ExtractionResult(_assemble(pages, self.structured), len(pages), page_count, chars)
+                submit_next()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        return ExtractionResult(_assemble(pages, self.structured), len(pages), page_count, chars)
+
+    def shutdown(self) -> None:
+        """关闭工作进程"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self.recycled_workers += self._pool.recycled_workers
+                self._pool = None
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+请求节流模块
+为访问arXiv的所有请求（查询分页、PDF下载等）提供进程内共享的令牌桶限速，
+并统计等待时间
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+import requests
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶节流器
+
+    平均每 min_interval 秒放行一个请求，空闲时最多积累 burst 个令牌供突发请求立即使用；
+    burst=1 时等价于相邻两次请求至少间隔 min_interval 秒
+    """
+
+    def __init__(self, min_interval: float, burst: int = 1):
+        """
+        初始化节流器
+
+        Args:
+            min_interval: 平均每个请求占用的秒数（速率的倒数）
+            burst: 令牌桶容量，即允许连续立即发出的请求数
+        """
+        self.min_interval = max(0.0, min_interval)
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+        self._requests = 0
+        self._waited_requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数（令牌不足时记为欠账，按先来后到排队）"""
+        with self._lock:
+            self._requests += 1
+            if self.min_interval <= 0:
+                return 0.0
+
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.min_interval)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens * self.min_interval if self._tokens < 0 else 0.0
+
+            if wait > 0:
+                self._waited_requests += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self) -> float:
+        """
+        获取一个令牌，必要时阻塞等待
+
+        Returns:
+            本次等待的秒数
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """acquire 的 asyncio 版本，等待期间不阻塞事件循环"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> Dict[str, float]:
+        """
+        返回节流统计
+
+        Returns:
+            requests: 放行的请求总数
+            waited_requests: 需要等待的请求数
+            total_wait_seconds: 累计等待秒数
+            max_wait_seconds: 单次最长等待秒数
+        """
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "waited_requests": self._waited_requests,
+                "total_wait_seconds": self._total_wait,
+                "max_wait_seconds": self._max_wait,
+            }
+
+
+class RateLimitedSession(requests.Session):
+    """每次发出请求前先经过共享节流器的 requests.Session"""
+
+    def __init__(self, limiter: RateLimiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method, url, *args, **kwargs):
+        self.limiter.acquire()
+        return super().request(method, url, *args, **kwargs)
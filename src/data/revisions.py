@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+论文修订版本处理模块
+arXiv上的 v2/v3 往往只是小幅修改；新版本的标题和摘要与已分析过的旧版本相差不大时，
+直接沿用旧版本的分析结果并在报告中标注为修订版，不再重新走两阶段分析
+"""
+
+import difflib
+from typing import Iterable, List, Tuple
+
+from .paper import Paper
+from .paper_store import PaperStore, split_versioned_id
+from ..utils.logger import logger
+
+
+def text_change_ratio(old: str, new: str) -> float:
+    """
+    按词比较两段文本，返回变化比例（0 表示相同，1 表示完全不同）
+
+    忽略大小写和空白差异
+    """
+    old_words = old.lower().split()
+    new_words = new.lower().split()
+    if not old_words and not new_words:
+        return 0.0
+    return 1.0 - difflib.SequenceMatcher(None, old_words, new_words, autojunk=False).ratio()
+
+
+class RevisionPolicy:
+    """判断修订版论文能否沿用旧版本的分析结果"""
+
+    def __init__(self, paper_store: PaperStore, max_change: float):
+        """
+        Args:
+            paper_store: 论文存储，提供旧版本的摘要和分析结果
+            max_change: 标题和摘要的变化比例低于该值时沿用旧分析（0~1），0 表示总是重新分析
+        """
+        self.paper_store = paper_store
+        self.max_change = max_change
+        self.reused = 0
+
+    def try_reuse(self, paper: Paper) -> bool:
+        """
+        尝试为论文沿用旧版本的分析结果；沿用时把分析结果附加到论文上并写入存储
+
+        Returns:
+            是否沿用了旧版本的分析结果
+        """
+        if self.max_change <= 0 or split_versioned_id(paper.paper_id)[1] <= 1:
+            return False
+        previous = self.paper_store.get_previous_analysis(paper.paper_id)
+        if not previous:
+            return False
+
+        change = text_change_ratio(
+            f"{previous['title'] or ''} {previous['summary'] or ''}", f"{paper.title} {paper.abstract}"
+        )
+        base_id, _ = split_versioned_id(paper.paper_id)
+        previous_id = f"{base_id}v{previous['version']}"
+        if change >= self.max_change:
+            logger.info(f"论文 {paper.paper_id} 相对 {previous_id} 摘要变化 {change:.0%}，重新分析")
+            return False
+
+        paper.analysis = previous["analysis"]
+        paper.html_analysis = previous["html_analysis"]
+        paper.revised_from = previous_id
+        self.paper_store.save_analysis(paper)
+        self.reused += 1
+        logger.info(f"论文 {paper.paper_id} 相对 {previous_id} 摘要变化 {change:.0%}，沿用旧版本的分析结果")
+        return True
+
+    def split(self, papers: Iterable[Paper]) -> Tuple[List[Paper], List[Paper]]:
+        """
+        将论文分为需要分析的和沿用旧分析的两部分
+
+        Returns:
+            (需要分析的论文, 沿用旧分析的论文)
+        """
+        to_analyze, reused = [], []
+        for paper in papers:
+            (reused if self.try_reuse(paper) else to_analyze).append(paper)
+        return to_analyze, reused
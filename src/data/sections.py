@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+论文章节切分模块
+根据PDF文本中的章节标题把全文切分为摘要、引言、方法、实验、结论、参考文献、附录等部分，
+供按章节分配token预算使用
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+# 章节类型
+FRONT = "front"              # 标题、作者等首部信息
+ABSTRACT = "abstract"
+INTRODUCTION = "introduction"
+METHOD = "method"
+EXPERIMENTS = "experiments"
+CONCLUSION = "conclusion"
+OTHER = "other"              # 相关工作、背景等
+BOILERPLATE = "boilerplate"  # 致谢、伦理声明、作者贡献等
+REFERENCES = "references"
+APPENDIX = "appendix"
+
+# 默认不送入LLM的章节
+DEFAULT_DROPPED_KINDS = (REFERENCES, APPENDIX, BOILERPLATE)
+
+# 结构化全文中每个章节以单独一行的标题标记开头
+SECTION_MARKER = "\n## "
+
+_KEYWORDS = (
+    (ABSTRACT, ("abstract",)),
+    (INTRODUCTION, ("introduction",)),
+    (REFERENCES, ("references", "bibliography")),
+    (APPENDIX, ("appendix", "appendices", "supplementary")),
+    (BOILERPLATE, ("acknowledg", "ethic", "broader impact", "impact statement", "author contribution",
+                   "reproducibility statement", "funding")),
+    (OTHER, ("related work", "background", "prior work", "literature")),
+    (CONCLUSION, ("conclusion", "discussion", "limitation", "future work", "summary")),
+    (EXPERIMENTS, ("experiment", "evaluation", "result", "setup", "ablation", "benchmark", "empirical", "analysis")),
+    (METHOD, ("method", "approach", "model", "framework", "architecture", "algorithm", "proposed",
+              "formulation", "design", "preliminar")),
+)
+
+_BARE_HEADING = re.compile(
+    r"^(abstract|introduction|related work|background|conclusions?|discussion|references|bibliography|"
+    r"acknowledge?ments?|appendix(?:\s+[A-Z])?(?:[.:]?\s.*)?|appendices|supplementary materials?)$",
+    re.IGNORECASE,
+)
+_NUMBERED_HEADING = re.compile(r"^(\d{1,2}|[IVX]{1,5})\.?\s+([A-Z][\w ,:&/()'’\-–]{2,70})$")
+_NUMBER_ONLY = re.compile(r"^(\d{1,2}|[IVX]{1,5})\.?$")
+_ROMAN = {"I": 1, "II": 2, "III": 3, "IV": 4, "V": 5, "VI": 6, "VII": 7, "VIII": 8, "IX": 9, "X": 10,
+          "XI": 11, "XII": 12}
+
+
+class Section(NamedTuple):
+    """论文的一个章节"""
+    kind: str
+    title: str
+    text: str
+
+
+def classify_title(title: str) -> Optional[str]:
+    """根据标题关键词判断章节类型，无法判断时返回None"""
+    lowered = title.lower()
+    for kind, keywords in _KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return kind
+    return None
+
+
+def _section_number(token: str) -> Optional[int]:
+    if token.isdigit():
+        return int(token)
+    return _ROMAN.get(token.upper())
+
+
+def _is_next_number(token: str, last_number: int) -> bool:
+    # 允许跳过一个序号（例如引言没有编号、或某一节标题没有被识别出来）
+    number = _section_number(token)
+    return number is not None and last_number < number <= last_number + 2
+
+
+def _assign_kinds(titles: List[str]) -> List[str]:
+    """
+    为章节标题序列确定类型
+
+    关键词无法识别的章节按位置推断：引言之后、实验之前视为方法，实验之后、结论之前视为实验；
+    参考文献之后的章节都视为附录
+    """
+    kinds = []
+    seen_experiments = False
+    seen_intro = False
+    in_backmatter = False
+    for title in titles:
+        kind = classify_title(title)
+        if in_backmatter and kind not in (APPENDIX, BOILERPLATE):
+            kind = APPENDIX
+        elif kind is None:
+            if seen_experiments:
+                kind = EXPERIMENTS
+            elif seen_intro:
+                kind = METHOD
+            else:
+                kind = OTHER
+        if kind == INTRODUCTION:
+            seen_intro = True
+        elif kind == EXPERIMENTS:
+            seen_experiments = True
+        elif kind in (REFERENCES, APPENDIX):
+            in_backmatter = True
+        kinds.append(kind)
+    return kinds
+
+
+def _iter_lines(pages: Iterable[str]) -> Iterable[str]:
+    for page in pages:
+        for line in page.splitlines():
+            line = line.strip()
+            if line:
+                yield line
+
+
+def split_sections(pages: Iterable[str]) -> List[Section]:
+    """
+    将逐页提取的原始文本（保留换行）切分为章节
+
+    只把独占一行的顶层标题当作章节边界：编号标题的序号必须依次递增（1, 2, 3 或 I, II, III，最多跳过一个），
+    以免把以数字开头的正文行误判为标题；无编号的标题只识别摘要、参考文献、附录等常见固定名称
+
+    Returns:
+        按原文顺序排列的章节列表，第一个章节为标题之前的首部信息
+    """
+    titles = [""]
+    bodies: List[List[str]] = [[]]
+    last_number = 0
+    pending_number = None
+
+    for line in _iter_lines(pages):
+        heading = None
+        number_match = _NUMBER_ONLY.match(line)
+        if number_match and _is_next_number(number_match.group(1), last_number):
+            # 序号和标题被拆成两行的情况，先记下序号
+            pending_number = number_match.group(1)
+            continue
+
+        if pending_number is not None:
+            if re.match(r"^[A-Z][\w ,:&/()'’\-–]{2,70}$", line):
+                heading = f"{pending_number} {line}"
+                last_number = _section_number(pending_number)
+            else:
+                bodies[-1].append(pending_number)
+            pending_number = None
+
+        if heading is None:
+            numbered = _NUMBERED_HEADING.match(line)
+            if numbered and _is_next_number(numbered.group(1), last_number) and not line.endswith("."):
+                heading = line
+                last_number = _section_number(numbered.group(1))
+            elif _BARE_HEADING.match(line):
+                heading = line
+
+        if heading is not None:
+            titles.append(heading)
+            bodies.append([])
+        else:
+            bodies[-1].append(line)
+
+    kinds = [FRONT] + _assign_kinds(titles[1:])
+    return [
+        Section(kind, title, " ".join(word for line in body for word in line.split()))
+        for kind, title, body in zip(kinds, titles, bodies)
+        if title or body
+    ]
+
+
+def format_sections(sections: List[Section]) -> str:
+    """将章节序列化为带标题标记的结构化全文"""
+    parts = []
+    for section in sections:
+        if section.title:
+            parts.append(f"{SECTION_MARKER}{section.title}\n{section.text}")
+        else:
+            parts.append(section.text)
+    return "".join(parts).strip()
+
+
+def parse_sections(text: str) -> Optional[List[Section]]:
+    """
+    解析 format_sections 生成的结构化全文
+
+    Returns:
+        章节列表；文本不含章节标记（例如普通模式提取的全文）时返回None
+    """
+    text = "\n" + text
+    if SECTION_MARKER not in text:
+        return None
+    chunks = text.split(SECTION_MARKER)
+    front = chunks[0].strip()
+    titles, bodies = [], []
+    for chunk in chunks[1:]:
+        title, _, body = chunk.partition("\n")
+        titles.append(title.strip())
+        bodies.append(body.strip())
+
+    sections = [Section(FRONT, "", front)] if front else []
+    sections.extend(Section(kind, title, body) for kind, title, body in zip(_assign_kinds(titles), titles, bodies))
+    return sections
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+全文文本缓存模块
+将归一化后的论文全文压缩保存到磁盘，以 带版本号的短ID + 提取器版本 为键，
+命中时既不需要下载PDF也不需要再次解析
+"""
+
+import gzip
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from ..utils.logger import logger
+
+
+class TextCache:
+    """容量受限的全文文本缓存，LRU淘汰"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, extractor_version: str):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（压缩后字节数）
+            extractor_version: 提取器版本，提取逻辑变化后旧缓存自动失效
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.extractor_version = extractor_version
+        self._lock = threading.Lock()
+
+    def path_for(self, short_id: str) -> Path:
+        """返回论文全文在缓存中的路径"""
+        return self.cache_dir / f"{short_id.replace('/', '_')}.{self.extractor_version}.txt.gz"
+
+    def contains(self, short_id: str) -> bool:
+        """是否已缓存该论文的全文"""
+        return self.path_for(short_id).exists()
+
+    def get(self, short_id: str) -> Optional[str]:
+        """
+        读取缓存的全文
+
+        Returns:
+            全文字符串，未命中时返回None
+        """
+        path = self.path_for(short_id)
+        try:
+            text = gzip.decompress(path.read_bytes()).decode("utf-8")
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning(f"读取全文缓存失败，将忽略该缓存 ({path.name}): {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # 以修改时间记录最近使用时间，供LRU淘汰使用
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return text
+
+    def put(self, short_id: str, text: str) -> None:
+        """压缩保存全文（先写临时文件再原子替换），必要时淘汰旧条目"""
+        path = self.path_for(short_id)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(gzip.compress(text.encode("utf-8"), compresslevel=6))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        按最近使用时间淘汰条目，直到缓存总大小不超过上限
+
+        Returns:
+            释放的字节数
+        """
+        with self._lock:
+            files = []
+            total = 0
+            for path in self.cache_dir.glob("*.txt.gz"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            freed = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                freed += size
+                logger.info(f"全文缓存已满，淘汰: {path.name}")
+        return freed
@@ -9,57 +9,28 @@ import traceback
 from pathlib import Path
 
 from src.data.arxiv_client import ArxivClient
+from src.data.http_cache import HttpResponseCache
+from src.data.keyword_filter import KeywordFilter
+from src.data.pdf_cache import PdfCache
+from src.data.pdf_downloader import PdfDownloader
+from src.data.pdf_extractor import PdfTextExtractor
+from src.data.rate_limiter import RateLimiter
+from src.data.text_cache import TextCache
+from src.data.paper_registry import PaperRegistry
+from src.data.paper_store import PaperStore
+from src.data.revisions import RevisionPolicy
 from src.config import Config
 from src.output.email_sender import EmailSender
 from src.output.formatter import OutputFormatter
 from src.ai.analyzer import DeepSeekAnalyzer
+from src.ai.response_cache import LLMResponseCache
+from src.ai.async_coordinator import AsyncBatchCoordinator
 from src.ai.batch_coordinator import BatchCoordinator
+from src.ai.concurrency import AdaptiveConcurrencyLimiter
+from src.ai.usage import STAGE_LABELS, UsageMeter, format_usage
 from src.utils.logger import logger
 
 
-def arxiv_result_to_dict(paper) -> dict:
-    """
-    Convert arxiv.Result object to dictionary format
-
-    Args:
-        paper: arxiv.Result object
-
-    Returns:
-        Dictionary with paper information
-    """
-    # Get author names safely
-    author_names = []
-    if hasattr(paper, 'authors') and paper.authors:
-        try:
-            author_names = [author.name for author in paper.authors]
-        except AttributeError:
-            logger.warning(f"Abnormal author object structure for paper: {paper.title}")
-
-    # Get published date safely
-    published_date = None
-    if hasattr(paper, 'published') and paper.published:
-        published_date = paper.published
-
-    # Get PDF URL safely
-    pdf_url = None
-    if hasattr(paper, 'pdf_url'):
-        pdf_url = paper.pdf_url
-    else:
-        # Derive PDF URL from entry_id
-        pdf_url = paper.entry_id.replace('/abs/', '/pdf/') + '.pdf'
-
-    return {
-        'title': paper.title,
-        'authors': author_names,
-        'categories': paper.categories,
-        'published': published_date,
-        'entry_id': paper.entry_id,
-        'summary': paper.summary,
-        'pdf_url': pdf_url,
-        'paper_id': paper.get_short_id()
-    }
-
-
 class ArxivPaperTracker:
     """ArXiv论文追踪器主类"""
 
@@ -67,7 +38,13 @@ class ArxivPaperTracker:
         """初始化追踪器"""
         self.config = Config()
         self.arxiv_client = None
+        self.paper_store = None
+        self.keyword_filter = None
+        self.revision_policy = None
         self.ai_analyzer = None
+        self.llm_cache = None
+        self.llm_concurrency = None
+        self.usage_meter = None
         self.batch_coordinator = None
         self.output_formatter = None
         self.email_sender = None
@@ -81,15 +58,106 @@ class ArxivPaperTracker:
     def _initialize_components(self):
         """初始化各个组件"""
         try:
-            self.ai_analyzer = DeepSeekAnalyzer(self.config)
+            if self.config.ENABLE_LLM_CACHE:
+                self.llm_cache = LLMResponseCache(
+                    self.config.LLM_CACHE_PATH,
+                    ttl_seconds=self.config.LLM_CACHE_TTL,
+                    max_bytes=self.config.LLM_CACHE_MAX_MB * 1024 * 1024,
+                    bypass=self.config.LLM_CACHE_BYPASS
+                )
+            if self.config.ADAPTIVE_CONCURRENCY:
+                # 排名和深度分析（同步和异步路径）的模型调用共享同一个并发上限
+                self.llm_concurrency = AdaptiveConcurrencyLimiter(
+                    initial=self.config.LLM_CONCURRENCY_INITIAL,
+                    min_limit=self.config.LLM_CONCURRENCY_MIN,
+                    max_limit=self.config.LLM_CONCURRENCY_MAX,
+                    latency_tolerance=self.config.LLM_LATENCY_TOLERANCE / 100
+                )
+                if self.config.MAX_WORKERS > 0:
+                    logger.warning(
+                        f"已启用自适应并发，分析线程池大小取 LLM_CONCURRENCY_MAX={self.config.LLM_CONCURRENCY_MAX}，"
+                        f"MAX_WORKERS={self.config.MAX_WORKERS} 不再生效"
+                    )
+            # token用量和费用统计；设置了运行预算时第二阶段按预算放行论文
+            self.usage_meter = UsageMeter(self.config.LLM_PRICES, budget=self.config.LLM_RUN_BUDGET)
+            self.ai_analyzer = DeepSeekAnalyzer(
+                self.config, response_cache=self.llm_cache, concurrency_limiter=self.llm_concurrency,
+                usage_meter=self.usage_meter
+            )
             
+            http_cache = None
+            if self.config.ARXIV_HTTP_CACHE or self.config.ARXIV_HTTP_CACHE_REPLAY_ONLY:
+                http_cache = HttpResponseCache(
+                    self.config.HTTP_CACHE_DIR,
+                    ttl_seconds=self.config.ARXIV_HTTP_CACHE_TTL,
+                    replay_only=self.config.ARXIV_HTTP_CACHE_REPLAY_ONLY
+                )
+
+            # 进程内共享的arXiv节流器：查询分页、PDF下载（含异步下载）都经过它
+            self.arxiv_rate_limiter = RateLimiter(
+                self.config.ARXIV_CLIENT_DELAY_SECONDS, burst=self.config.ARXIV_RATE_BURST
+            )
+
+            pdf_cache = None
+            # 内存模式下PDF不落盘，PDF缓存不生效
+            if self.config.ENABLE_PDF_CACHE and not self.config.IN_MEMORY_PDF:
+                pdf_cache = PdfCache(self.config.PDF_CACHE_DIR, self.config.PDF_CACHE_MAX_MB * 1024 * 1024)
+
+            # 普通模式下深度分析最多使用全文前80000字符，读够预算后不再解析后续页面；
+            # 按章节提取需要看到结论等靠后的章节，不提前停止
+            extract_char_budget = 0 if self.config.SECTION_AWARE_EXTRACTION else self.config.EXTRACT_CHAR_BUDGET
+            text_extractor = PdfTextExtractor(
+                max_workers=self.config.PDF_EXTRACT_WORKERS,
+                structured=self.config.SECTION_AWARE_EXTRACTION,
+                max_chars=extract_char_budget,
+                timeout=self.config.PDF_EXTRACT_TIMEOUT or None,
+                memory_limit=self.config.PDF_EXTRACT_MEMORY_MB * 1024 * 1024
+            )
+            text_cache = None
+            if self.config.ENABLE_TEXT_CACHE:
+                text_cache = TextCache(
+                    self.config.TEXT_CACHE_DIR, self.config.TEXT_CACHE_MAX_MB * 1024 * 1024, text_extractor.version
+                )
+
             self.arxiv_client = ArxivClient(
                 categories=self.config.CATEGORIES,
                 max_papers=self.config.MAX_PAPERS,
-                search_days=self.config.SEARCH_DAYS
+                search_days=self.config.SEARCH_DAYS,
+                num_retries=self.config.ARXIV_CLIENT_NUM_RETRIES,
+                delay_seconds=self.config.ARXIV_CLIENT_DELAY_SECONDS,
+                sharded=self.config.SHARDED_FETCH,
+                fast_parser=self.config.FAST_ATOM_PARSER,
+                http_cache=http_cache,
+                pdf_cache=pdf_cache,
+                pdf_downloader=PdfDownloader(
+                    num_retries=self.config.ARXIV_CLIENT_NUM_RETRIES,
+                    max_bytes=self.config.PDF_MAX_MB * 1024 * 1024,
+                    limiter=self.arxiv_rate_limiter
+                ),
+                rate_limiter=self.arxiv_rate_limiter,
+                text_extractor=text_extractor,
+                text_cache=text_cache,
+                pdf_memory_limit=self.config.PDF_MEMORY_MAX_MB * 1024 * 1024 if self.config.IN_MEMORY_PDF else 0
             )
             
-            self.batch_coordinator = BatchCoordinator(self.config, self.ai_analyzer, self.arxiv_client)
+            if self.config.ENABLE_PAPER_STORE:
+                self.paper_store = PaperStore(self.config.DB_PATH)
+                # 修订版论文与已分析过的旧版本相差不大时沿用旧分析结果
+                if self.config.REVISION_REUSE_THRESHOLD > 0:
+                    self.revision_policy = RevisionPolicy(
+                        self.paper_store, self.config.REVISION_REUSE_THRESHOLD / 100
+                    )
+
+            # 送入LLM之前的关键词预过滤，检索式在启动时编译，语法错误直接报错
+            if self.config.KEYWORD_FILTER:
+                self.keyword_filter = KeywordFilter(self.config.KEYWORD_FILTER)
+                logger.info(f"已启用关键词过滤: {self.config.KEYWORD_FILTER}")
+
+            # 异步模式下模型请求在事件循环中并发发出，不占用线程池
+            coordinator_class = AsyncBatchCoordinator if self.config.ASYNC_LLM else BatchCoordinator
+            self.batch_coordinator = coordinator_class(
+                self.config, self.ai_analyzer, self.arxiv_client, self.paper_store
+            )
 
             self.output_formatter = OutputFormatter(
                 self.config.TEMPLATES_DIR, 
@@ -112,39 +180,96 @@ class ArxivPaperTracker:
 
             # 1. 从ArXiv获取新论文
             logger.info("Fetching new papers from ArXiv...")
-            new_papers = self.arxiv_client.get_recent_papers()
-            if not new_papers:
-                logger.info("没有找到新的论文，流程结束。")
-                return
-            
-            logger.info(f"成功从ArXiv获取 {len(new_papers)} 篇论文。")
-
-            # 将arxiv.Result对象和其字典形式一起准备，以供后续使用
-            papers_for_analysis = [(p, arxiv_result_to_dict(p)) for p in new_papers]
+            watermark = self._load_watermark()
+
+            if self.config.STREAMING_FETCH:
+                # 流式模式：论文边抓取边进入第一阶段排名，抓取延迟与LLM延迟重叠
+                fetched_papers = []
+                revised_papers = []
+                ranked_papers = []
+                paper_stream = self.arxiv_client.iter_recent_papers(watermark=watermark)
+                papers_for_analysis = self._stream_unprocessed(paper_stream, fetched_papers, ranked_papers)
+                if self.keyword_filter:
+                    papers_for_analysis = self.keyword_filter.filter(papers_for_analysis)
+                if self.revision_policy:
+                    papers_for_analysis = self._divert_revised(papers_for_analysis, revised_papers)
+                new_papers = fetched_papers
+            else:
+                new_papers = self.arxiv_client.get_recent_papers(watermark=watermark)
+                if not new_papers:
+                    logger.info("没有找到新的论文，流程结束。")
+                    return
+                fetched_papers = new_papers
+                
+                logger.info(f"成功从ArXiv获取 {len(new_papers)} 篇论文。")
+
+                # 持久化抓取结果，并跳过之前运行中已处理过的相同版本论文；
+                # 之前已晋级但未完成深度分析的论文带着已保存的分数直接进入第二阶段
+                ranked_papers = []
+                if self.paper_store:
+                    self.paper_store.save_papers(new_papers)
+                    new_papers, ranked_papers, skipped = self._split_prior_results(new_papers)
+                    self._log_prior_results(skipped, len(ranked_papers))
+                    if not new_papers and not ranked_papers:
+                        logger.info("所有论文均已在之前的运行中处理过，流程结束。")
+                        self._save_watermark(fetched_papers)
+                        return
+
+                if self.keyword_filter:
+                    total = len(new_papers)
+                    new_papers = list(self.keyword_filter.filter(new_papers))
+                    logger.info(f"关键词过滤后剩余 {len(new_papers)}/{total} 篇论文。")
+                    if not new_papers and not ranked_papers:
+                        logger.info("没有论文满足关键词过滤条件，流程结束。")
+                        self._save_watermark(fetched_papers)
+                        return
+
+                revised_papers = []
+                if self.revision_policy:
+                    new_papers, revised_papers = self.revision_policy.split(new_papers)
+                    if revised_papers:
+                        logger.info(f"{len(revised_papers)} 篇修订版论文沿用旧版本的分析结果，剩余 {len(new_papers)} 篇需要分析。")
+
+                papers_for_analysis = new_papers
 
             # 2. 使用BatchCoordinator进行分析
-            # BatchCoordinator现在接收(arxiv.Result, dict)的元组列表
-            analyzed_papers_dicts = self.batch_coordinator.run_batch_analysis(papers_for_analysis)
+            # BatchCoordinator接收 Paper 列表或论文流，分析结果直接附加在 Paper 上返回；
+            # 待分析的论文登记在本次运行的索引中，各阶段按ID查找
+            registry = PaperRegistry()
+            analyzed_papers = []
+            if self.config.STREAMING_FETCH or papers_for_analysis or ranked_papers:
+                analyzed_papers = self.batch_coordinator.run_batch_analysis(
+                    papers_for_analysis, registry, ranked_papers=ranked_papers
+                )
+            # 沿用旧分析结果的修订版论文排在本次新分析的论文之后
+            analyzed_papers = analyzed_papers + revised_papers
+            if registry:
+                counts = sorted(registry.category_counts().items(), key=lambda item: item[1], reverse=True)
+                logger.info("待分析论文类别分布: " + ", ".join(f"{category}={count}" for category, count in counts[:10]))
 
-            if not analyzed_papers_dicts:
+            if not fetched_papers:
+                logger.info("没有找到新的论文，流程结束。")
+                return
+
+            if not analyzed_papers:
                 logger.warning("分析流程未产生任何成功分析的论文。")
+                if self.batch_coordinator.analysis_failed:
+                    # 分析因错误没有产出，保留水位线，下次运行重新抓取这些论文（已处理的论文由存储跳过）
+                    logger.warning("分析阶段出错，本次不推进增量抓取水位线。")
+                else:
+                    self._save_watermark(fetched_papers)
                 return
             
-            logger.info(f"成功分析 {len(analyzed_papers_dicts)} 篇论文。")
-            
-            # 将分析结果与原始ArXiv数据重新组合以进行格式化
-            final_results_for_formatting = []
-            for paper_data in analyzed_papers_dicts:
-                # 从原始论文列表中找到匹配的arxiv.Result对象
-                original_paper = next((p for p in new_papers if p.get_short_id() == paper_data.get('paper_id')), None)
-                if original_paper:
-                    final_results_for_formatting.append((original_paper, paper_data))
+            logger.info(f"成功分析 {len(analyzed_papers)} 篇论文。")
 
             # 3. 生成输出
-            self._generate_outputs(final_results_for_formatting)
+            self._generate_outputs(analyzed_papers)
 
             # 4. 发送邮件
-            self._send_email_report(final_results_for_formatting)
+            self._send_email_report(analyzed_papers)
+
+            # 5. 整个流程成功后才推进水位线，失败的运行下次会重新抓取同一批论文
+            self._save_watermark(fetched_papers)
 
             logger.info("ArXiv论文追踪和分析流程成功完成。")
             logger.info("="*50)
@@ -158,6 +283,155 @@ class ArxivPaperTracker:
                     self.config.EMAIL_TO, error_msg
                 )
             raise
+        finally:
+            self.arxiv_client.text_extractor.shutdown()
+            self._log_run_stats()
+
+    def _log_run_stats(self):
+        """输出本次运行的统计信息"""
+        stats = self.arxiv_rate_limiter.stats()
+        logger.info(
+            f"arXiv节流统计: {stats['requests']} 次请求，其中 {stats['waited_requests']} 次需要等待，"
+            f"累计等待 {stats['total_wait_seconds']:.1f}s，单次最长 {stats['max_wait_seconds']:.1f}s"
+        )
+        recycled = self.arxiv_client.text_extractor.recycled_workers
+        if recycled:
+            logger.warning(f"PDF提取: {recycled} 个工作进程因超时、超出内存上限或崩溃被终止并更换")
+        if self.llm_cache:
+            cache_stats = self.llm_cache.stats()
+            logger.info(
+                f"LLM响应缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次，"
+                f"缓存大小 {cache_stats['bytes'] / 1024 / 1024:.1f}MB"
+            )
+        if self.usage_meter:
+            usage = self.usage_meter.summary()
+            logger.info(f"LLM用量: {format_usage(usage['total'])}")
+            for stage, stage_usage in usage['stages'].items():
+                logger.info(f"  {STAGE_LABELS.get(stage, stage)}: {format_usage(stage_usage)}")
+            if len(usage['models']) > 1:
+                for model, model_usage in usage['models'].items():
+                    logger.info(f"  {model}: {format_usage(model_usage)}")
+            if usage['budget']:
+                logger.info(
+                    f"LLM费用预算: 已用 ¥{usage['total']['cost']:.4f} / ¥{usage['budget']:.4f}，"
+                    f"{usage['skipped_for_budget']} 篇论文因预算不足未进行深度分析"
+                )
+        provider_stats = self.ai_analyzer.provider_pool.stats()
+        if len(provider_stats) > 1:
+            logger.info("LLM服务商: " + "，".join(
+                f"{name} 成功 {s['successes']} 次/失败 {s['failures']} 次"
+                + (f"（熔断 {s['trips']} 次，当前 {s['state']}）" if s['trips'] else "")
+                for name, s in provider_stats.items()
+            ))
+        if self.llm_concurrency:
+            concurrency_stats = self.llm_concurrency.stats()
+            logger.info(
+                f"LLM自适应并发: 当前上限 {concurrency_stats['limit']}，本次最高 {concurrency_stats['peak_limit']}，"
+                f"限流/超时 {concurrency_stats['overloads']} 次，降低上限 {concurrency_stats['decreases']} 次"
+                f"（其中 {concurrency_stats['latency_decreases']} 次因延迟升高）"
+            )
+        if self.revision_policy and self.revision_policy.reused:
+            logger.info(f"修订版论文: {self.revision_policy.reused} 篇沿用了旧版本的分析结果，未调用LLM")
+
+    def _split_prior_results(self, papers):
+        """
+        按之前运行的结果拆分论文
+
+        Returns:
+            (需要从第一阶段开始分析的论文, 之前已晋级但未完成深度分析、已附加保存分数的论文, 跳过的论文数)；
+            已完成深度分析或分数低于晋级分数线的论文被跳过
+        """
+        threshold = self.batch_coordinator.promotion_threshold
+        short_ids = [p.paper_id for p in papers]
+        processed_ids = self.paper_store.get_processed_ids(short_ids, threshold)
+        pending_scores = self.paper_store.get_pending_stage1_scores(short_ids, threshold) if threshold is not None else {}
+
+        remaining, ranked = [], []
+        for paper in papers:
+            if paper.paper_id in processed_ids:
+                continue
+            if paper.paper_id in pending_scores:
+                paper.stage1_score = pending_scores[paper.paper_id]
+                ranked.append(paper)
+            else:
+                remaining.append(paper)
+        return remaining, ranked, len(papers) - len(remaining) - len(ranked)
+
+    @staticmethod
+    def _log_prior_results(skipped: int, ranked: int) -> None:
+        if skipped:
+            logger.info(f"跳过 {skipped} 篇在之前运行中已处理过的论文（版本相同）。")
+        if ranked:
+            logger.info(f"{ranked} 篇论文在之前的运行中已晋级但未完成深度分析，直接进入第二阶段。")
+
+    def _stream_unprocessed(self, paper_stream, fetched_papers, ranked_papers):
+        """
+        逐篇持久化流中的论文并跳过之前运行中已处理过的相同版本论文
+
+        Args:
+            paper_stream: 论文流
+            fetched_papers: 用于收集所有抓取到的论文（含被跳过的），供推进水位线使用
+            ranked_papers: 用于收集之前已晋级但未完成深度分析的论文，第一阶段结束后直接进入第二阶段
+
+        Yields:
+            需要分析的论文
+        """
+        # 论文必须在产出前写入存储：下游沿用旧分析结果的修订版论文会立即更新自己的记录
+        skipped = 0
+        for paper in paper_stream:
+            fetched_papers.append(paper)
+            if self.paper_store:
+                self.paper_store.save_papers([paper])
+                remaining, ranked, paper_skipped = self._split_prior_results([paper])
+                ranked_papers.extend(ranked)
+                skipped += paper_skipped
+                yield from remaining
+            else:
+                yield paper
+        logger.info(f"流式抓取共获取 {len(fetched_papers)} 篇论文。")
+        self._log_prior_results(skipped, len(ranked_papers))
+
+    def _divert_revised(self, paper_stream, revised_papers):
+        """
+        从论文流中分出可以沿用旧版本分析结果的修订版论文
+
+        Args:
+            paper_stream: 论文流
+            revised_papers: 用于收集沿用了旧分析结果的论文
+
+        Yields:
+            需要分析的论文
+        """
+        for paper in paper_stream:
+            if self.revision_policy.try_reuse(paper):
+                revised_papers.append(paper)
+            else:
+                yield paper
+
+    def _watermark_key(self) -> str:
+        """增量抓取水位线在存储中的键，按类别组合区分"""
+        return "watermark:" + ",".join(sorted(self.config.CATEGORIES))
+
+    def _load_watermark(self):
+        """读取增量抓取的水位线，未启用增量模式时返回None"""
+        if not self.config.INCREMENTAL_FETCH:
+            return None
+        if not self.paper_store:
+            logger.warning("增量抓取需要启用论文存储 (ENABLE_PAPER_STORE)，回退到 SEARCH_DAYS 窗口。")
+            return None
+        watermark = self.paper_store.get_state(self._watermark_key())
+        if not watermark:
+            logger.info("尚无增量抓取水位线，本次使用 SEARCH_DAYS 窗口。")
+        return watermark
+
+    def _save_watermark(self, fetched_papers):
+        """根据本次抓取到的论文推进水位线"""
+        if not self.config.INCREMENTAL_FETCH or not self.paper_store:
+            return
+        watermark = ArxivClient.compute_watermark(fetched_papers)
+        if watermark:
+            self.paper_store.set_state(self._watermark_key(), watermark)
+            logger.info(f"增量抓取水位线已更新: {watermark['published']} ({watermark['entry_id']})")
 
     def _generate_outputs(self, papers_analyses):
         """生成各种格式的输出"""
@@ -167,12 +441,13 @@ class ArxivPaperTracker:
         try:
             logger.info("正在生成输出报告...")
             # Format and save markdown report to conclusion.md
-            markdown_content = self.output_formatter.format_markdown(papers_analyses)
+            usage_summary = self.usage_meter.summary() if self.usage_meter else None
+            markdown_content = self.output_formatter.format_markdown(papers_analyses, usage_summary=usage_summary)
             with open(self.config.CONCLUSION_FILE, "w", encoding="utf-8") as f:
                 f.write(markdown_content)
 
             # Generate and save HTML report
-            html_content = self.output_formatter.format_html_email(papers_analyses)
+            html_content = self.output_formatter.format_html_email(papers_analyses, usage_summary=usage_summary)
             with open(self.config.HTML_REPORT_FILE, "w", encoding="utf-8") as f:
                 f.write(html_content)
             
@@ -194,7 +469,8 @@ class ArxivPaperTracker:
 
         try:
             logger.info("正在准备并发送邮件报告...")
-            html_content = self.output_formatter.format_html_email(papers_analyses)
+            usage_summary = self.usage_meter.summary() if self.usage_meter else None
+            html_content = self.output_formatter.format_html_email(papers_analyses, usage_summary=usage_summary)
             subject = self.output_formatter.get_email_subject()
             
             self.email_sender.send_email(
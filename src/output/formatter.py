@@ -7,11 +7,12 @@
 import datetime
 import re
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional
 
-import arxiv
 from jinja2 import Environment, FileSystemLoader, Template
 
+from ..ai.usage import format_usage
+from ..data.paper import Paper
 from ..utils.logger import logger
 
 
@@ -30,15 +31,15 @@ class OutputFormatter:
         self.github_repo_url = github_repo_url or "https://github.com/your-username/hermes4arxiv"
         self.env = Environment(loader=FileSystemLoader(str(templates_dir)))
 
-    def format_markdown(
-        self, papers_analyses: List[Tuple[arxiv.Result, Dict[str, Any]]], title: str = None
-    ) -> str:
+    def format_markdown(self, papers_analyses: List[Paper], title: str = None,
+                        usage_summary: Optional[Dict[str, Any]] = None) -> str:
         """
         格式化为Markdown格式
 
         Args:
-            papers_analyses: 论文分析结果列表，每个元素为(paper, analysis_dict)
+            papers_analyses: 已附加分析结果的论文列表
             title: 标题
+            usage_summary: 本次运行的LLM用量汇总（UsageMeter.summary()），None 表示不显示
 
         Returns:
             Markdown格式的内容
@@ -50,33 +51,37 @@ class OutputFormatter:
 
         content = f"# {title}\n\n"
         content += f"**生成时间**: {today}\n"
-        content += f"**论文数量**: {len(papers_analyses)}\n\n"
+        content += f"**论文数量**: {len(papers_analyses)}\n"
+        if usage_summary:
+            content += f"**LLM用量**: {format_usage(usage_summary['total'])}\n"
+        content += "\n"
+        paper_usage = usage_summary['papers'] if usage_summary else {}
 
-        for i, (paper, analysis_result) in enumerate(papers_analyses, 1):
-            author_names = [author.name for author in paper.authors]
-            
-            # 处理分析内容 - 从字典中提取实际分析文本
-            if isinstance(analysis_result, dict):
-                analysis_text = analysis_result.get('analysis', '分析暂时不可用')
-            else:
-                analysis_text = analysis_result or '分析暂时不可用'
+        for i, paper in enumerate(papers_analyses, 1):
+            analysis_text = paper.analysis or '分析暂时不可用'
 
             content += f"## {i}. {paper.title}\n\n"
-            content += f"**👥 作者**: {', '.join(author_names)}\n\n"
+            content += f"**👥 作者**: {', '.join(paper.authors)}\n\n"
             content += f"**🏷️ 类别**: {', '.join(paper.categories)}\n\n"
             content += f"**📅 发布日期**: {paper.published.strftime('%Y-%m-%d')}\n\n"
             content += f"**🔗 链接**: [{paper.entry_id}]({paper.entry_id})\n\n"
+            if paper.revised_from:
+                content += f"**🔄 修订版**: 与 {paper.revised_from} 相比改动较小，沿用其分析结果\n\n"
+            if paper.paper_id in paper_usage:
+                usage = paper_usage[paper.paper_id]
+                content += f"**💰 LLM用量**: {usage['prompt_tokens'] + usage['completion_tokens']:,.0f} tokens，约 ¥{usage['cost']:.4f}\n\n"
             content += f"### 📝 分析结果\n\n{analysis_text}\n\n"
             content += "---\n\n"
 
         return content
 
-    def format_html_email(self, papers_analyses: List[Tuple[arxiv.Result, Dict[str, Any]]]) -> str:
+    def format_html_email(self, papers_analyses: List[Paper], usage_summary: Optional[Dict[str, Any]] = None) -> str:
         """
         格式化为HTML邮件格式
 
         Args:
-            papers_analyses: 论文分析结果列表，每个元素为(paper, analysis_dict)
+            papers_analyses: 已附加分析结果的论文列表
+            usage_summary: 本次运行的LLM用量汇总（UsageMeter.summary()），None 表示不显示
 
         Returns:
             HTML格式的邮件内容
@@ -85,7 +90,7 @@ class OutputFormatter:
             template = self.env.get_template("email_template.html")
         except Exception as e:
             logger.error(f"加载邮件模板失败: {e}")
-            return self._fallback_html_format(papers_analyses)
+            return self._fallback_html_format(papers_analyses, usage_summary)
 
         today = datetime.datetime.now().strftime("%Y年%m月%d日")
 
@@ -93,34 +98,28 @@ class OutputFormatter:
         papers_data = []
         categories_set = set()
 
-        for paper, analysis_result in papers_analyses:
-            author_names = [author.name for author in paper.authors]
+        for paper in papers_analyses:
             categories_set.update(paper.categories)
 
-            # 处理分析内容 - 从字典中提取实际分析文本
-            if isinstance(analysis_result, dict):
-                # 优先使用html_analysis，如果不存在则使用analysis
-                if 'html_analysis' in analysis_result and analysis_result['html_analysis']:
-                    analysis_html = analysis_result['html_analysis']
-                else:
-                    analysis_text = analysis_result.get('analysis', '分析暂时不可用')
-                    analysis_html = self._convert_analysis_to_html(analysis_text)
+            # 优先使用html_analysis，如果不存在则使用analysis
+            if paper.html_analysis:
+                analysis_html = paper.html_analysis
             else:
-                # 兼容旧格式，直接是字符串
-                analysis_html = self._convert_analysis_to_html(analysis_result)
+                analysis_html = self._convert_analysis_to_html(paper.analysis or '分析暂时不可用')
 
             # 生成PDF链接
-            pdf_url = paper.pdf_url if hasattr(paper, 'pdf_url') else paper.entry_id.replace('/abs/', '/pdf/') + '.pdf'
+            pdf_url = paper.pdf_url or paper.entry_id.replace('/abs/', '/pdf/') + '.pdf'
 
             papers_data.append(
                 {
                     "title": paper.title,
-                    "authors": ", ".join(author_names),
+                    "authors": ", ".join(paper.authors),
                     "published": paper.published.strftime("%Y年%m月%d日"),
                     "categories": paper.categories,
                     "url": paper.entry_id,
                     "pdf_url": pdf_url,
                     "analysis": analysis_html,
+                    "revised_from": paper.revised_from,
                 }
             )
 
@@ -130,6 +129,7 @@ class OutputFormatter:
             "categories": ", ".join(sorted(categories_set)),
             "papers": papers_data,
             "github_repo_url": self.github_repo_url,
+            "usage": format_usage(usage_summary['total']) if usage_summary else None,
         }
 
         return template.render(**template_data)
@@ -343,14 +343,13 @@ class OutputFormatter:
         
         return text
 
-    def _fallback_html_format(
-        self, papers_analyses: List[Tuple[arxiv.Result, Dict[str, Any]]]
-    ) -> str:
+    def _fallback_html_format(self, papers_analyses: List[Paper], usage_summary: Optional[Dict[str, Any]] = None) -> str:
         """
         备用HTML格式化方法
 
         Args:
             papers_analyses: 论文分析结果列表
+            usage_summary: 本次运行的LLM用量汇总，None 表示不显示
 
         Returns:
             简单的HTML格式内容
@@ -442,26 +441,22 @@ class OutputFormatter:
             </div>
             <div style="text-align: center; margin-bottom: 30px;">
                 <p><strong>今日共分析 {len(papers_analyses)} 篇论文</strong></p>
+                {f"<p>LLM用量：{format_usage(usage_summary['total'])}</p>" if usage_summary else ""}
             </div>
         """
 
-        for i, (paper, analysis_result) in enumerate(papers_analyses, 1):
-            author_names = [author.name for author in paper.authors]
+        for i, paper in enumerate(papers_analyses, 1):
             pdf_url = paper.entry_id.replace('/abs/', '/pdf/') + '.pdf'
-            
-            # 处理分析内容 - 从字典中提取实际分析文本
-            if isinstance(analysis_result, dict):
-                analysis_text = analysis_result.get('analysis', '分析暂时不可用')
-            else:
-                analysis_text = analysis_result or '分析暂时不可用'
+            analysis_text = paper.analysis or '分析暂时不可用'
 
             html += f"""
             <div class="paper">
                 <div class="paper-title">{i}. {paper.title}</div>
                 <div class="paper-meta">
-                    <strong>👥 作者</strong>: {', '.join(author_names)}<br>
+                    <strong>👥 作者</strong>: {', '.join(paper.authors)}<br>
                     <strong>🏷️ 类别</strong>: {', '.join(paper.categories)}<br>
                     <strong>📅 发布日期</strong>: {paper.published.strftime('%Y年%m月%d日')}<br>
+                    {f"<strong>🔄 修订版</strong>: 沿用 {paper.revised_from} 的分析结果<br>" if paper.revised_from else ""}
                 </div>
                 <div class="analysis">{analysis_text.replace(chr(10), '<br>')}</div>
                 <div>
@@ -507,9 +502,7 @@ class OutputFormatter:
         today = datetime.datetime.now().strftime("%Y年%m月%d日")
         return f"🏛️ Hermes4ArXiv - {today} AI论文分析报告"
 
-    def create_summary_stats(
-        self, papers_analyses: List[Tuple[arxiv.Result, Dict[str, Any]]]
-    ) -> Dict[str, Any]:
+    def create_summary_stats(self, papers_analyses: List[Paper]) -> Dict[str, Any]:
         """
         创建统计摘要
 
@@ -526,14 +519,13 @@ class OutputFormatter:
         authors = set()
         dates = []
 
-        for paper, analysis_result in papers_analyses:
+        for paper in papers_analyses:
             # 统计类别
             for cat in paper.categories:
                 categories[cat] = categories.get(cat, 0) + 1
 
             # 统计作者
-            for author in paper.authors:
-                authors.add(author.name)
+            authors.update(paper.authors)
 
             # 统计日期
             dates.append(paper.published.date())